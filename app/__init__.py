@@ -8,6 +8,9 @@ from app.api.auth import auth_bp
 from app.api.users import users_bp
 from app.api.units import units_bp
 from app.api.rentals import rentals_bp
+from app.api.searches import searches_bp
+from app.api.invoices import invoices_bp
+from app.cli import register_commands
 
 
 def create_app(config_name=None):
@@ -21,9 +24,15 @@ def create_app(config_name=None):
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key')
 
+    # Uploaded images (defaults to storage/images) and thumbnail workers
+    app.config['IMAGE_STORAGE_PATH'] = os.getenv('IMAGE_STORAGE_PATH')
+    app.config['IMAGE_WORKERS'] = int(os.getenv('IMAGE_WORKERS', 2))
+    app.config['MAX_CONTENT_LENGTH'] = 64 * 1024 * 1024
+
     # Configure database
     if config_name == 'testing':
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        app.config['IMAGE_WORKERS'] = 0
     else:
         # Get DATABASE_URL from environment (provided by Render)
         database_url = os.getenv('DATABASE_URL')
@@ -45,6 +54,11 @@ def create_app(config_name=None):
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(units_bp, url_prefix='/api/units')
     app.register_blueprint(rentals_bp, url_prefix='/api/rentals')
+    app.register_blueprint(searches_bp, url_prefix='/api/searches')
+    app.register_blueprint(invoices_bp, url_prefix='/api/invoices')
+
+    # Register maintenance commands
+    register_commands(app)
 
     @app.route('/api/health')
     def health_check():
@@ -1,4 +1,4 @@
 from flask import Blueprint
-from app.api import users, units, auth, rentals
+from app.api import users, units, auth, rentals, searches
 
 api = Blueprint('api', __name__)
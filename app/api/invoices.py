@@ -0,0 +1,24 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify, g
+from app.services.invoice_service import InvoiceService
+from app.api.auth import token_required
+
+invoices_bp = Blueprint('invoices', __name__)
+
+# GET routes
+
+
+@invoices_bp.route('/', methods=['GET'])
+@token_required
+def get_invoices():
+    """Get the current user's invoices, optionally for one period (?period=YYYY-MM)"""
+    period = request.args.get('period')
+    if period:
+        try:
+            parsed = datetime.strptime(period, '%Y-%m')
+        except ValueError:
+            return jsonify({"error": "period must be YYYY-MM"}), 400
+        period = (parsed.year, parsed.month)
+
+    invoices = InvoiceService.get_user_invoices(g.current_user['id'], period)
+    return jsonify(invoices)
@@ -3,19 +3,55 @@ from app.services.rental_service import RentalService
 from app.api.auth import token_required
 from app.schemas.rental import RentalCreateSchema, RentalUpdateSchema, RentalResponseSchema
 from marshmallow import ValidationError
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 rentals_bp = Blueprint('rentals', __name__)
 
+
+def _page_args():
+    """Read the list filters and cursor of a paginated rentals request"""
+    args = {
+        'status': request.args.get('status'),
+        'cursor': request.args.get('cursor'),
+        'limit': min(max(request.args.get(
+            'limit', RentalService.PAGE_SIZE, type=int), 1), 200)
+    }
+    for param, key in (('from', 'start_from'), ('to', 'start_to')):
+        value = request.args.get(param)
+        try:
+            args[key] = date.fromisoformat(value) if value else None
+        except ValueError:
+            raise ValueError(f"{param} must be a date (YYYY-MM-DD)")
+    return args
+
+
+def _paged_response(next_cursor, body):
+    response = jsonify(body)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
 # GET routes
 
 
 @rentals_bp.route('/', methods=['GET'])
 @token_required
 def get_rentals():
-    """Get all rentals for the current user"""
-    rentals = RentalService.get_user_rentals(g.current_user['id'])
-    return jsonify(rentals)
+    """
+    Get a page of the current user's rentals, newest first.
+    Filters: status, from and to (dates the rental starts between).
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
+    try:
+        page_args = _page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result = RentalService.get_user_rentals(g.current_user['id'], **page_args)
+    if "error" in result:
+        return jsonify(result), 400
+
+    return _paged_response(result.pop('next_cursor'), result)
 
 
 @rentals_bp.route('/<int:rental_id>', methods=['GET'])
@@ -28,6 +64,14 @@ def get_rental(rental_id):
     return jsonify(rental)
 
 
+@rentals_bp.route('/shared-with-me', methods=['GET'])
+@token_required
+def get_shared_with_me():
+    """Get rentals other tenants shared with the current user"""
+    rentals = RentalService.get_shared_with_me(g.current_user['id'])
+    return jsonify(rentals)
+
+
 @rentals_bp.route('/statistics', methods=['GET'])
 @token_required
 def get_statistics():
@@ -138,23 +182,36 @@ def extend_rental(rental_id):
         return jsonify({"error": "Invalid extension days value"}), 400
 
 
-@rentals_bp.route('/upcoming-expiration', methods=['GET'])
+@rentals_bp.route('/upcoming-expiration', methods=['GET'], strict_slashes=False)
 @token_required
 def get_upcoming_expirations():
-    """Get rentals expiring in the next 30 days"""
-    rentals = RentalService.get_upcoming_expirations(g.current_user['id'])
+    """Get rentals expiring in the next `days` days (30 by default)"""
+    rentals = RentalService.get_upcoming_expirations(
+        g.current_user['id'],
+        days=min(max(request.args.get('days', 30, type=int), 0), 365),
+        limit=min(max(request.args.get('limit', 100, type=int), 1), 500)
+    )
     return jsonify(rentals)
 
 
 @rentals_bp.route('/history/<string:unit_id>', methods=['GET'])
 @token_required
 def get_rental_history(unit_id):
-    """Get rental history for a specific unit"""
+    """Get a page of the rental history of a unit, filtered like get_rentals"""
+    try:
+        page_args = _page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     history = RentalService.get_rental_history(
         unit_id=unit_id,
-        user_id=g.current_user['id']
+        user_id=g.current_user['id'],
+        **page_args
     )
-    return jsonify(history)
+    if "error" in history:
+        return jsonify(history), 400
+
+    return _paged_response(history['next_cursor'], history['rentals'])
 
 
 @rentals_bp.route('/<int:rental_id>/share', methods=['POST'])
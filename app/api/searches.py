@@ -0,0 +1,80 @@
+from flask import Blueprint, request, jsonify, g
+from app.services.saved_search_service import SavedSearchService
+from app.api.auth import token_required
+from app.schemas.saved_search import SavedSearchCreateSchema
+from marshmallow import ValidationError
+
+searches_bp = Blueprint('searches', __name__)
+
+# GET routes
+
+
+@searches_bp.route('/', methods=['GET'])
+@token_required
+def get_searches():
+    """Get the current user's saved searches"""
+    searches = SavedSearchService.get_user_searches(g.current_user['id'])
+    return jsonify(searches)
+
+
+@searches_bp.route('/notifications', methods=['GET'])
+@token_required
+def get_notifications():
+    """Get units that matched the current user's saved searches"""
+    notifications = SavedSearchService.get_notifications(
+        user_id=g.current_user['id'],
+        unread_only=request.args.get('unread', 'false').lower() == 'true',
+        after_id=request.args.get('after_id', type=int),
+        limit=min(request.args.get('limit', 50, type=int), 200)
+    )
+    return jsonify(notifications)
+
+# POST routes
+
+
+@searches_bp.route('/', methods=['POST'])
+@token_required
+def create_search():
+    """Save a search"""
+    try:
+        schema = SavedSearchCreateSchema()
+        data = schema.load(request.json)
+
+        result = SavedSearchService.create_search(g.current_user['id'], data)
+        if "error" in result:
+            return jsonify(result), 400
+
+        return jsonify(result), 201
+    except ValidationError as e:
+        return jsonify({"error": str(e.messages)}), 400
+
+
+@searches_bp.route('/notifications/read', methods=['POST'])
+@token_required
+def mark_notifications_read():
+    """Mark notifications as read (all of them if no ids are given)"""
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if ids is not None and not isinstance(ids, list):
+        return jsonify({"error": "ids must be a list"}), 400
+
+    result = SavedSearchService.mark_notifications_read(
+        g.current_user['id'], ids)
+    if "error" in result:
+        return jsonify(result), 400
+
+    return jsonify(result)
+
+# DELETE routes
+
+
+@searches_bp.route('/<int:search_id>', methods=['DELETE'])
+@token_required
+def delete_search(search_id):
+    """Delete a saved search"""
+    result = SavedSearchService.delete_search(
+        search_id, g.current_user['id'])
+    if "error" in result:
+        return jsonify(result), 400
+
+    return jsonify(result)
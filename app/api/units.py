@@ -1,17 +1,53 @@
-from flask import Blueprint, request, jsonify, g
+import re
+from functools import wraps
+from flask import Blueprint, request, jsonify, g, send_file
 from app.services.unit_service import UnitService
+from app.services.unit_autocomplete_service import UnitAutocompleteService, TOKEN_KINDS
+from app.services.image_storage_service import ImageStorageService, VARIANTS
 from app.api.auth import token_required
 from app.schemas.unit import UnitCreateSchema, UnitUpdateSchema, UnitResponseSchema
 from marshmallow import ValidationError
+from datetime import date
 
 units_bp = Blueprint('units', __name__)
 
+
+def unit_owner_required(f):
+    """
+    Load the unit in the URL with a primary-key lookup and check that the
+    current user owns it. The entity is left in g.unit for the service,
+    so a write route costs one select and one update.
+    """
+    @wraps(f)
+    def decorated(unit_id, *args, **kwargs):
+        unit = UnitService.get_unit_for_write(unit_id)
+        if not unit:
+            return jsonify({"error": "Unit not found"}), 404
+        if str(unit.user_id) != str(g.current_user['id']):
+            return jsonify({"error": "Unauthorized - not the owner"}), 403
+
+        g.unit = unit
+        return f(unit_id, *args, **kwargs)
+    return decorated
+
 # GET routes
 
 
 @units_bp.route('/', methods=['GET'])
 def get_units():
-    """Get all units with optional filters"""
+    """Get all units with optional filters, or specific units by id"""
+    if 'ids' in request.args:
+        unit_ids = [
+            unit_id.strip()
+            for value in request.args.getlist('ids')
+            for unit_id in value.split(',') if unit_id.strip()
+        ]
+        if not unit_ids:
+            return jsonify({"error": "No unit ids specified"}), 400
+        if len(unit_ids) > UnitService.MAX_BATCH_IDS:
+            return jsonify({"error": f"Cannot fetch more than {UnitService.MAX_BATCH_IDS} units at once"}), 400
+        return jsonify(UnitService.get_units_by_ids(unit_ids))
+
     filters = {
         'city': request.args.get('city'),
         'floor_level': request.args.get('floor_level'),
@@ -22,6 +58,20 @@ def get_units():
         'max_price': request.args.get('max_price', type=float),
         'features': request.args.getlist('features')
     }
+
+    available_from = request.args.get('available_from')
+    available_to = request.args.get('available_to')
+    if available_from or available_to:
+        if not (available_from and available_to):
+            return jsonify({"error": "available_from and available_to must be provided together"}), 400
+        try:
+            filters['available_from'] = date.fromisoformat(available_from)
+            filters['available_to'] = date.fromisoformat(available_to)
+        except ValueError:
+            return jsonify({"error": "Dates must be in YYYY-MM-DD format"}), 400
+        if filters['available_from'] > filters['available_to']:
+            return jsonify({"error": "available_from must not be after available_to"}), 400
+
     units = UnitService.search_units(**filters)
     return jsonify(units)
 
@@ -33,6 +83,21 @@ def get_available_units():
     return jsonify(units)
 
 
+@units_bp.route('/autocomplete', methods=['GET'])
+def autocomplete():
+    """Suggest cities, countries and unit names for a search prefix"""
+    kind = request.args.get('kind')
+    if kind and kind not in TOKEN_KINDS:
+        return jsonify({"error": f"kind must be one of: {', '.join(TOKEN_KINDS)}"}), 400
+
+    completions = UnitAutocompleteService.complete(
+        request.args.get('q', ''),
+        limit=min(request.args.get('limit', 10, type=int), 50),
+        kind=kind
+    )
+    return jsonify(completions)
+
+
 @units_bp.route('/user/<int:user_id>', methods=['GET'])
 @token_required
 def get_user_units(user_id):
@@ -53,7 +118,49 @@ def get_unit(unit_id):
     )
     if not unit:
         return jsonify({"error": "Unit not found"}), 404
-    return jsonify(unit)
+
+    # The version is the ETag; send it back in If-Match when updating
+    response = jsonify(unit)
+    response.set_etag(str(unit['version']))
+    return response
+
+
+@units_bp.route('/<string:unit_id>/similar', methods=['GET'])
+def get_similar_units(unit_id):
+    """Get units similar to a specific unit"""
+    units = UnitService.get_similar_units(
+        unit_id,
+        limit=min(request.args.get('limit', 5, type=int), 20),
+        vacant_only=request.args.get('available', 'false').lower() == 'true'
+    )
+    if units is None:
+        return jsonify({"error": "Unit not found"}), 404
+    return jsonify(units)
+
+
+@units_bp.route('/images/<string:content_hash>/<string:variant>', methods=['GET'])
+def get_image(content_hash, variant):
+    """Serve an uploaded image or one of its variants"""
+    if not re.fullmatch(r'[0-9a-f]{64}', content_hash) or \
+            (variant != 'original' and variant not in VARIANTS):
+        return jsonify({"error": "Image not found"}), 404
+
+    content_type = UnitService.get_image_content_type(content_hash)
+    resolved = ImageStorageService.resolve(
+        content_hash, variant) if content_type else None
+    if not resolved:
+        return jsonify({"error": "Image not found"}), 404
+
+    path, is_final = resolved
+    if is_final and variant != 'original':
+        content_type = 'image/webp' if VARIANTS[variant][1] == 'WEBP' else 'image/jpeg'
+    # Content-addressed files never change; a stand-in original is only
+    # cached briefly so the rendered variant is picked up
+    response = send_file(path, mimetype=content_type,
+                         max_age=31536000 if is_final else 60)
+    if is_final:
+        response.cache_control.immutable = True
+    return response
 
 
 @units_bp.route('/statistics', methods=['GET'])
@@ -83,20 +190,70 @@ def create_unit():
     except ValidationError as e:
         return jsonify({"error": str(e.messages)}), 400
 
+@units_bp.route('/bulk', methods=['POST'])
+@token_required
+def bulk_create_units():
+    """Create many units in one request"""
+    payload = request.json
+    if isinstance(payload, dict):
+        payload = payload.get('units')
+    if not isinstance(payload, list) or not payload:
+        return jsonify({"error": "Expected a non-empty list of units"}), 400
+    if len(payload) > UnitService.MAX_BULK_UNITS:
+        return jsonify({"error": f"Cannot create more than {UnitService.MAX_BULK_UNITS} units at once"}), 400
+
+    schema = UnitCreateSchema(many=True)
+    try:
+        units, errors = schema.load(payload), {}
+    except ValidationError as e:
+        units, errors = e.valid_data, e.messages
+
+    result = UnitService.bulk_create_units(
+        units, int(g.current_user['id']), errors)
+    if "error" in result:
+        return jsonify(result), 400
+    if not result['created']:
+        return jsonify(result), 400
+
+    return jsonify(result), 201
+
+@units_bp.route('/<string:unit_id>/images', methods=['POST'])
+@token_required
+@unit_owner_required
+def upload_unit_images(unit_id):
+    """Upload image files (multipart field "images") for a unit"""
+    files = request.files.getlist('images')
+    if not files:
+        return jsonify({"error": "No images uploaded"}), 400
+
+    result = UnitService.upload_unit_images(
+        unit_id=unit_id,
+        uploads=[file.read() for file in files],
+        user_id=int(g.current_user['id']),
+        unit=g.unit
+    )
+    if "error" in result:
+        return jsonify(result), 400
+
+    return jsonify(result), 201
+
 # PUT/PATCH routes
 
 
 @units_bp.route('/<string:unit_id>', methods=['PUT', 'PATCH'])
 @token_required
+@unit_owner_required
 def update_unit(unit_id):
     """Update a unit"""
     try:
-        # First check if user owns the unit
-        unit = UnitService.get_unit_by_id(unit_id)
-        if not unit:
-            return jsonify({"error": "Unit not found"}), 404
-        if str(unit.get('owner', {}).get('id')) != str(g.current_user['id']):
-            return jsonify({"error": "Unauthorized - not the owner"}), 403
+        expected_version = None
+        if request.if_match and not request.if_match.star_tag:
+            tags = request.if_match.as_set()
+            if len(tags) != 1:
+                return jsonify({"error": "If-Match must name a single version"}), 400
+            tag = tags.pop()
+            # Versions start at 1, so a tag we never issued cannot match
+            expected_version = int(tag) if tag.isdigit() else 0
 
         schema = UnitUpdateSchema()
         data = schema.load(request.json, partial=True)
@@ -104,13 +261,19 @@ def update_unit(unit_id):
         result = UnitService.update_unit(
             unit_id=unit_id,
             data=data,
-            user_id=int(g.current_user['id'])
+            user_id=int(g.current_user['id']),
+            expected_version=expected_version,
+            unit=g.unit
         )
 
+        if result.get('code') == UnitService.VERSION_CONFLICT:
+            return jsonify(result), 412
         if "error" in result:
             return jsonify(result), 400
 
-        return jsonify(result)
+        response = jsonify(result)
+        response.set_etag(str(result['version']))
+        return response
     except ValidationError as e:
         return jsonify({"error": str(e.messages)}), 400
 
@@ -119,23 +282,17 @@ def update_unit(unit_id):
 
 @units_bp.route('/<string:unit_id>', methods=['DELETE'])
 @token_required
+@unit_owner_required
 def delete_unit(unit_id):
     """Delete a unit"""
-    # First check if user owns the unit
-    unit = UnitService.get_unit_by_id(unit_id)
-    if not unit:
-        return jsonify({"error": "Unit not found"}), 404
-
-    if str(unit.get('owner', {}).get('id')) != str(g.current_user['id']):
-        return jsonify({"error": "Unauthorized - not the owner"}), 403
-
     # Check if unit is currently rented
-    if unit.get('tenant_id'):
+    if g.unit.tenant_id:
         return jsonify({"error": "Cannot delete unit while it is rented"}), 400
 
     result = UnitService.delete_unit(
         unit_id=unit_id,
-        user_id=int(g.current_user['id'])
+        user_id=int(g.current_user['id']),
+        unit=g.unit
     )
 
     if "error" in result:
@@ -146,44 +303,43 @@ def delete_unit(unit_id):
 # Bulk operations
 
 
-# @units_bp.route('/bulk/update-rates', methods=['POST'])
-# @token_required
-# def bulk_update_rates():
-#     """Bulk update rates for units in a city"""
-#     try:
-#         data = request.json
-#         if not all(k in data for k in ['city', 'rate_increase']):
-#             return jsonify({"error": "Missing required fields"}), 400
-
-#         result = UnitService.bulk_update_rates(
-#             city=data['city'],
-#             rate_increase=float(data['rate_increase']),
-#             user_id=g.current_user['id']
-#         )
+@units_bp.route('/bulk/update-rates', methods=['POST'])
+@token_required
+def bulk_update_rates():
+    """Bulk update rates for the current user's units in a city"""
+    try:
+        data = request.json or {}
+        if 'rate_increase' in data and 'value' not in data:
+            # Original payload: a percentage increase
+            data = {**data, 'change_type': 'percentage',
+                    'value': data['rate_increase']}
+        if not all(k in data for k in ['city', 'value']):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        result = UnitService.bulk_update_rates(
+            city=data['city'],
+            user_id=int(g.current_user['id']),
+            value=float(data['value']),
+            change_type=data.get('change_type', 'percentage'),
+            dry_run=bool(data.get('dry_run', False))
+        )
 
-#         if "error" in result:
-#             return jsonify(result), 400
+        if "error" in result:
+            return jsonify(result), 400
 
-#         return jsonify(result)
-#     except ValueError:
-#         return jsonify({"error": "Invalid rate increase value"}), 400
+        return jsonify(result)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid rate change value"}), 400
 
 # Security features routes
 
 
 @units_bp.route('/<string:unit_id>/security', methods=['POST'])
 @token_required
+@unit_owner_required
 def add_security_feature(unit_id):
     """Add security features to a unit"""
     try:
-        # First check if user owns the unit
-        unit = UnitService.get_unit_by_id(unit_id)
-        if not unit:
-            return jsonify({"error": "Unit not found"}), 404
-
-        if str(unit.get('owner', {}).get('id')) != str(g.current_user['id']):
-            return jsonify({"error": "Unauthorized - not the owner"}), 403
-
         # Validate request data
         data = request.json
         if not data or 'features' not in data:
@@ -199,7 +355,8 @@ def add_security_feature(unit_id):
         result = UnitService.add_security_features(
             unit_id=unit_id,
             features=data['features'],
-            user_id=int(g.current_user['id'])
+            user_id=int(g.current_user['id']),
+            unit=g.unit
         )
 
         if "error" in result:
@@ -214,17 +371,11 @@ def add_security_feature(unit_id):
 
 @units_bp.route('/<string:unit_id>/security', methods=['DELETE'])
 @token_required
+@unit_owner_required
 def remove_security_features(unit_id):
     """Remove security features from a unit"""
     try:
         data = request.json
-        unit = UnitService.get_unit_by_id(unit_id)
-        if not unit:
-            return jsonify({"error": "Unit not found"}), 404
-
-        if str(unit.get('owner', {}).get('id')) != str(g.current_user['id']):
-            return jsonify({"error": "Unauthorized - not the owner"}), 403
-        
         if not data or 'features' not in data:
             return jsonify({"error": "No features specified"}), 400
 
@@ -237,7 +388,8 @@ def remove_security_features(unit_id):
         result = UnitService.remove_security_features(
             unit_id=unit_id,
             features=data['features'],
-            user_id=int(g.current_user['id'])
+            user_id=int(g.current_user['id']),
+            unit=g.unit
         )
 
         if "error" in result:
@@ -0,0 +1,150 @@
+import click
+from flask.cli import AppGroup
+from app.services.unit_service import UnitService
+from app.services.csv_import_service import CsvImportService
+from app.services.unit_archive_service import UnitArchiveService
+from app.services.rental_service import RentalService
+from app.services.rental_summary_service import RentalSummaryService
+from app.services.invoice_service import InvoiceService
+
+units_cli = AppGroup('units', help='Storage unit maintenance commands')
+import_cli = AppGroup('import', help='Bulk import CSV exports')
+rentals_cli = AppGroup('rentals', help='Rental maintenance commands')
+invoices_cli = AppGroup('invoices', help='Monthly billing commands')
+
+
+@units_cli.command('rebuild-pricing')
+def rebuild_pricing():
+    """Recompute security premiums and base rates from monthly rates"""
+    result = UnitService.rebuild_pricing()
+    if "error" in result:
+        raise click.ClickException(result["error"])
+    click.echo(f"Repriced {result['updated_units']} units")
+
+
+@units_cli.command('archive-deleted')
+@click.option('--retention-days', type=click.IntRange(min=0),
+              default=UnitArchiveService.RETENTION_DAYS, show_default=True,
+              help='Archive units deleted more than this many days ago')
+@click.option('--chunk-size', type=click.IntRange(min=1),
+              default=UnitArchiveService.CHUNK_SIZE, show_default=True)
+def archive_deleted(retention_days, chunk_size):
+    """Move long-deleted units and their features to the archive tables"""
+    result = UnitArchiveService.archive_deleted_units(
+        retention_days, chunk_size)
+    click.echo(
+        f"Archived {result['archived_units']} units and "
+        f"{result['archived_features']} security features")
+    if "error" in result:
+        raise click.ClickException(result["error"])
+
+
+@rentals_cli.command('migrate-shares')
+@click.option('--chunk-size', type=click.IntRange(min=1),
+              default=1000, show_default=True)
+def migrate_shares(chunk_size):
+    """Move legacy shared_user_emails lists into the rental_shares table"""
+    result = RentalService.migrate_shared_emails(chunk_size)
+    click.echo(
+        f"Migrated {result['rentals']} rentals into {result['shares']} shares "
+        f"({result['unknown_emails']} emails without a user skipped)")
+    if "error" in result:
+        raise click.ClickException(result["error"])
+
+
+@rentals_cli.command('expire')
+@click.option('--batch-size', type=click.IntRange(min=1),
+              default=RentalService.SWEEP_BATCH_SIZE, show_default=True)
+def expire_rentals(batch_size):
+    """Expire overdue rentals and free their units; safe to run on a schedule"""
+    result = RentalService.expire_overdue_rentals(batch_size)
+    click.echo(
+        f"Expired {result['expired']} rentals, freed {result['freed_units']} "
+        f"units, started {result['started']} bookings")
+    if "error" in result:
+        raise click.ClickException(result["error"])
+
+
+@rentals_cli.command('reconcile-summary')
+def reconcile_summary():
+    """Rebuild every user's rental summary from the rentals table"""
+    result = RentalSummaryService.rebuild()
+    if "error" in result:
+        raise click.ClickException(result["error"])
+    click.echo(f"Rebuilt rental summaries of {result['users']} users")
+
+
+@rentals_cli.command('statistics')
+def rental_statistics():
+    """Show platform-wide rental counts and average duration"""
+    result = RentalService.get_global_rental_statistics()
+    if "error" in result:
+        raise click.ClickException(result["error"])
+    for key, value in result.items():
+        click.echo(f"{key}: {value}")
+
+
+@invoices_cli.command('run')
+@click.option('--period', required=True, type=click.DateTime(formats=['%Y-%m']),
+              help='Billing month as YYYY-MM')
+@click.option('--chunk-size', type=click.IntRange(min=1),
+              default=InvoiceService.CHUNK_SIZE, show_default=True)
+def run_invoices(period, chunk_size):
+    """Invoice every rental active during a month; safe to re-run"""
+    result = InvoiceService.run_billing(period.year, period.month, chunk_size)
+    click.echo(
+        f"{result['period']}: {result['invoices']} invoices totalling "
+        f"{result['amount']:.2f} from {result['rentals']} rentals in "
+        f"{result['seconds']}s ({result['rentals_per_second']} rentals/s)")
+    if "error" in result:
+        raise click.ClickException(result["error"])
+
+
+@import_cli.command('units')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--city', required=True, help='City of the facility')
+@click.option('--country', required=True, help='Country of the facility')
+@click.option('--address-link', required=True, help='Map link of the facility')
+@click.option('--owner-id', type=int, help='Owner for rows without a user_id')
+@click.option('--currency', help='Currency for rates without a symbol')
+@click.option('--name-prefix', default='Unit', show_default=True,
+              help='Units are named "<prefix> <unit_id>"')
+@click.option('--upsert', is_flag=True, help='Update units that already exist')
+@click.option('--chunk-size', type=click.IntRange(min=1),
+              default=CsvImportService.CHUNK_SIZE, show_default=True)
+def import_units(csv_file, city, country, address_link, owner_id, currency,
+                 name_prefix, upsert, chunk_size):
+    """Import units from an inventory CSV"""
+    _report(CsvImportService.import_units(
+        csv_file, city=city, country=country, address_link=address_link,
+        owner_id=owner_id, currency=currency, name_prefix=name_prefix,
+        upsert=upsert, chunk_size=chunk_size))
+
+
+@import_cli.command('users')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--upsert', is_flag=True, help='Update users whose email exists')
+@click.option('--chunk-size', type=click.IntRange(min=1),
+              default=CsvImportService.CHUNK_SIZE, show_default=True)
+def import_users(csv_file, upsert, chunk_size):
+    """Import users from a CSV with bcrypt password hashes"""
+    _report(CsvImportService.import_users(
+        csv_file, upsert=upsert, chunk_size=chunk_size))
+
+
+def _report(stats):
+    for error in stats['errors']:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(
+        f"{stats['rows']} rows in {stats['seconds']}s "
+        f"({stats['rows_per_second']} rows/s): {stats['inserted']} inserted, "
+        f"{stats['updated']} updated, {stats['skipped']} skipped, "
+        f"{len(stats['errors'])} errors")
+
+
+def register_commands(app):
+    """Attach the maintenance command groups to the app's CLI"""
+    app.cli.add_command(units_cli)
+    app.cli.add_command(import_cli)
+    app.cli.add_command(rentals_cli)
+    app.cli.add_command(invoices_cli)
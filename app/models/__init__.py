@@ -1,3 +1,10 @@
 from app.models.unit import UnitModel
 from app.models.user import UserModel
 from app.models.rental import RentalModel
+from app.models.rental_share import RentalShareModel
+from app.models.user_rental_summary import UserRentalSummaryModel
+from app.models.saved_search import SavedSearchModel, SavedSearchFeatureModel, SearchNotificationModel
+from app.models.unit_sequence import UnitIdSequenceModel
+from app.models.unit_image import UnitImageModel
+from app.models.unit_archive import UnitArchiveModel, SecurityFeatureArchiveModel
+from app.models.invoice import InvoiceModel, InvoiceLineModel
@@ -1,7 +1,9 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
 class Base(DeclarativeBase):
     pass
@@ -16,4 +18,33 @@ class BaseModel(db.Model):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.now, onupdate=datetime.now)
\ No newline at end of file
+        DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+def dialect_name() -> str:
+    """Name of the database dialect behind the current session"""
+    return db.session.get_bind().dialect.name
+
+
+class days_between(FunctionElement):
+    """
+    Fractional days from the first datetime expression to the second,
+    e.g. days_between(RentalModel.start_date, RentalModel.end_date)
+    """
+    type = Float()
+    inherit_cache = True
+    name = 'days_between'
+
+
+@compiles(days_between)
+def _days_between_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "(julianday(%s) - julianday(%s))" % (
+        compiler.process(end, **kw), compiler.process(start, **kw))
+
+
+@compiles(days_between, 'postgresql')
+def _days_between_postgresql(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "(EXTRACT(EPOCH FROM (%s - %s)) / 86400.0)" % (
+        compiler.process(end, **kw), compiler.process(start, **kw))
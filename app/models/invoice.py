@@ -0,0 +1,56 @@
+from datetime import date
+from typing import List
+from app.models.base import BaseModel
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, String, Date, Numeric, ForeignKey, UniqueConstraint, Index
+
+
+class InvoiceModel(BaseModel):
+    """A tenant's monthly bill for one rental"""
+    __tablename__ = "invoices"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    rental_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('rentals.id'), nullable=False)
+    tenant_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('users.id'), nullable=False)
+    # Billing period [period_start, period_end)
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    period_end: Mapped[date] = mapped_column(Date, nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default='issued')
+
+    lines: Mapped[List["InvoiceLineModel"]] = relationship(
+        "InvoiceLineModel",
+        back_populates="invoice",
+        cascade="all, delete-orphan",
+        order_by="InvoiceLineModel.id"
+    )
+
+    __table_args__ = (
+        # One invoice per rental and period makes billing runs idempotent
+        UniqueConstraint('rental_id', 'period_start',
+                         name='uq_invoices_rental_period'),
+        Index('ix_invoices_tenant_period', 'tenant_id', 'period_start'),
+    )
+
+
+class InvoiceLineModel(BaseModel):
+    """A charge on an invoice"""
+    __tablename__ = "invoice_lines"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    invoice_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('invoices.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    description: Mapped[str] = mapped_column(String(200), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    unit_price: Mapped[float] = mapped_column(Numeric(12, 4), nullable=False)
+    amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+
+    invoice = relationship("InvoiceModel", back_populates="lines")
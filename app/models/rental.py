@@ -1,9 +1,9 @@
 from app.models.base import BaseModel
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Integer, String, Float, ForeignKey, DateTime, Index, DDL, event, func
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from datetime import datetime
 from typing import Optional, List
-import json
 
 
 class RentalModel(BaseModel):
@@ -28,15 +28,29 @@ class RentalModel(BaseModel):
         DateTime, nullable=False, default=datetime.utcnow)
     updated_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime, onupdate=datetime.utcnow)
-    shared_user_emails: Mapped[str] = mapped_column(
-        String,
-        nullable=True,
-        default='[]'
-    )  # Store as JSON string
+    # Legacy JSON list of emails, superseded by rental_shares. Only read
+    # by the `flask rentals migrate-shares` command, which clears it
+    shared_user_emails: Mapped[Optional[str]] = mapped_column(
+        String, nullable=True)
 
     # Relationships
     unit = relationship("UnitModel")
     tenant = relationship("UserModel")
+    shared_users: Mapped[List["UserModel"]] = relationship(
+        "UserModel",
+        secondary="rental_shares",
+        order_by="UserModel.email",
+        viewonly=True
+    )
+
+    __table_args__ = (
+        # Lets availability probes seek straight to one unit's intervals
+        Index('ix_rentals_unit_period', 'unit_id', 'start_date', 'end_date'),
+        # Keyset pages of a tenant's rentals, newest first
+        Index('ix_rentals_tenant_start', 'tenant_id', 'start_date', 'id'),
+        # Serves the expiry sweep and upcoming-expiration lookups
+        Index('ix_rentals_status_end_date', 'status', 'end_date'),
+    )
 
     def calculate_total_cost(self) -> float:
         """Calculate total cost for rental period"""
@@ -47,30 +61,22 @@ class RentalModel(BaseModel):
         months = days / 30.0  # Approximate months
         return round(self.monthly_rate * months, 2)
 
-    def add_shared_user(self, email: str) -> bool:
-        """Add a user to shared users list"""
-        try:
-            shared_users = json.loads(self.shared_user_emails or '[]')
-            if not shared_users:
-                shared_users = []
-
-            if email not in shared_users:
-                shared_users.append(email)
-                self.shared_user_emails = json.dumps(shared_users)
-                return True
-            return False
-        except json.JSONDecodeError:
-            self.shared_user_emails = json.dumps([email])
-            return True
 
-    def remove_shared_user(self, email: str) -> bool:
-        """Remove a shared user email"""
-        try:
-            shared_users = json.loads(self.shared_user_emails or '[]')
-            if email in shared_users:
-                shared_users.remove(email)
-                self.shared_user_emails = json.dumps(shared_users)
-                return True
-            return False
-        except Exception:
-            return False
+# Two active bookings of one unit may never overlap. btree_gist lets the
+# gist index behind the constraint combine unit_id equality with the range;
+# the same index serves the per-unit availability probes
+event.listen(
+    RentalModel.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS btree_gist').execute_if(
+        dialect='postgresql')
+)
+RentalModel.__table__.append_constraint(
+    ExcludeConstraint(
+        (RentalModel.unit_id, '='),
+        (func.tsrange(RentalModel.start_date, RentalModel.end_date), '&&'),
+        name='ex_rentals_unit_period',
+        using='gist',
+        where="status = 'active'"
+    ).ddl_if(dialect='postgresql')
+)
@@ -0,0 +1,21 @@
+from app.models.base import BaseModel
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, ForeignKey
+
+
+class RentalShareModel(BaseModel):
+    """A user the tenant shared a rental with"""
+    __tablename__ = "rental_shares"
+
+    rental_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('rentals.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    # Serves "shared with me"; the primary key serves lookups by rental
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True,
+        index=True
+    )
@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import Optional, List
+from app.models.base import BaseModel
+from app.models.securityFeature import SecurityFeatureType
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, String, Float, ForeignKey, DateTime, Index, Enum as SQLEnum
+
+
+class SavedSearchModel(BaseModel):
+    """A tenant's stored unit search, matched against units as they free up"""
+    __tablename__ = "saved_searches"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('users.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    name: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    city: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Lowercased city used as the posting key; NULL means "any city"
+    city_key: Mapped[Optional[str]] = mapped_column(
+        String, nullable=True, index=True)
+    min_size: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_size: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    min_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    # Relationships
+    features: Mapped[List["SavedSearchFeatureModel"]] = relationship(
+        "SavedSearchFeatureModel",
+        back_populates="search",
+        cascade="all, delete-orphan"
+    )
+
+
+class SavedSearchFeatureModel(BaseModel):
+    """A security feature a saved search requires"""
+    __tablename__ = "saved_search_features"
+
+    search_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('saved_searches.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    feature_type: Mapped[SecurityFeatureType] = mapped_column(
+        SQLEnum(SecurityFeatureType),
+        primary_key=True,
+        index=True
+    )
+
+    search = relationship("SavedSearchModel", back_populates="features")
+
+
+class SearchNotificationModel(BaseModel):
+    """A unit that matched one of a user's saved searches"""
+    __tablename__ = "search_notifications"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('users.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    search_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('saved_searches.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    unit_id: Mapped[str] = mapped_column(
+        String(20),
+        ForeignKey('units.unit_id', ondelete='CASCADE'),
+        nullable=False
+    )
+    read_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True)
+
+    search = relationship("SavedSearchModel")
+    unit = relationship("UnitModel")
+
+    __table_args__ = (
+        # Serves "latest notifications for a user" as a single index range
+        Index('ix_search_notifications_user_id_id', 'user_id', 'id'),
+    )
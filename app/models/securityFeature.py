@@ -55,3 +55,12 @@ class SecurityFeatureModel(BaseModel):
             SecurityFeatureType.CCTV,
             SecurityFeatureType.ACCESS
         ]
+
+    @classmethod
+    def get_feature_premium(cls, feature_type: SecurityFeatureType) -> float:
+        """Return the rate premium a single security feature adds"""
+        if feature_type in cls.get_premium_features():
+            return 0.15
+        if feature_type in cls.get_standard_features():
+            return 0.10
+        return 0.0
@@ -1,7 +1,7 @@
 from datetime import datetime
 from app.models.base import BaseModel
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import DateTime, Integer, String, Float, JSON, Enum, ForeignKey, CheckConstraint, Numeric, Boolean
+from sqlalchemy import DateTime, Integer, String, Float, JSON, Enum, ForeignKey, CheckConstraint, Numeric, Boolean, Index, func, cast
 from typing import Optional, List
 from app.models.enums import UnitStatus
 # Add this import
@@ -9,6 +9,15 @@ from app.models.securityFeature import SecurityFeatureModel, SecurityFeatureType
 from sqlalchemy.dialects import postgresql
 
 
+def _default_base_rate(context):
+    """Rows inserted without a base rate derive it from their monthly rate"""
+    params = context.get_current_parameters()
+    if params.get('monthly_rate') is None:
+        return None
+    return round(float(params['monthly_rate'])
+                 / (1 + float(params.get('security_premium') or 0)), 2)
+
+
 class UnitModel(BaseModel):
     """Model for a Unit"""
     __tablename__ = "units"
@@ -23,6 +32,11 @@ class UnitModel(BaseModel):
     size_sqm: Mapped[float] = mapped_column(Float, nullable=False)
     # Keeping as string since that's your current setup
     monthly_rate: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    # Pricing inputs: monthly_rate = base_rate * (1 + security_premium)
+    base_rate: Mapped[float] = mapped_column(
+        Numeric(10, 2), nullable=False, default=_default_base_rate)
+    security_premium: Mapped[float] = mapped_column(
+        Numeric(6, 4), nullable=False, default=0, server_default='0')
     currency: Mapped[str] = mapped_column(
         String, nullable=False, default="ZAR")
     climate_controlled: Mapped[bool] = mapped_column(
@@ -48,7 +62,7 @@ class UnitModel(BaseModel):
         index=True
     )
     images: Mapped[List[str]] = mapped_column(
-        postgresql.ARRAY(String),
+        postgresql.ARRAY(String).with_variant(JSON, "sqlite"),
         default=[],
         server_default='{}',
         nullable=False
@@ -65,6 +79,26 @@ class UnitModel(BaseModel):
     tenant = relationship("UserModel", foreign_keys=[
                           tenant_id], back_populates="rented_units")
     rentals = relationship("RentalModel", back_populates="unit")
+    # Selectin-loaded so list pages get thumbnails without a query per unit
+    uploaded_images = relationship(
+        "UnitImageModel",
+        back_populates="unit",
+        cascade="all, delete-orphan",
+        order_by="UnitImageModel.id",
+        lazy="selectin"
+    )
+
+    # Bumped on every update; the ORM adds it to the UPDATE's WHERE clause
+    # so concurrent writers cannot silently overwrite each other
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default='1')
+
+    __mapper_args__ = {"version_id_col": version}
+
+    # Soft delete: set instead of deleting the row; live queries filter on
+    # UnitModel.live() and long-deleted units are moved to units_archive
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True)
 
     # Constraints
     __table_args__ = (
@@ -77,12 +111,55 @@ class UnitModel(BaseModel):
         from app.models import UnitStatus
         return UnitStatus
 
+    @classmethod
+    def live(cls):
+        """Filter for units that have not been soft-deleted"""
+        return cls.deleted_at.is_(None)
+
+    @staticmethod
+    def price(base_rate: float, security_premium: float) -> float:
+        """Monthly rate for a base rate and security premium"""
+        return round(float(base_rate) * (1 + float(security_premium)), 2)
+
+    @classmethod
+    def price_expr(cls, base_rate=None):
+        """SQL equivalent of price(), optionally for a new base rate"""
+        base_rate = cls.base_rate if base_rate is None else base_rate
+        return func.round(
+            cast(base_rate * (1 + cls.security_premium), Numeric(12, 4)), 2)
+
+    def reprice(self) -> None:
+        """Derive monthly_rate from the stored pricing inputs"""
+        self.monthly_rate = self.price(self.base_rate, self.security_premium)
+
+    def apply_security_premium(self, delta: float) -> None:
+        """Shift the security premium by a delta and reprice"""
+        self.security_premium = round(
+            float(self.security_premium or 0) + delta, 4)
+        self.reprice()
+
     def calculate_security_premium(self) -> float:
         """Calculate price premium based on security features"""
-        premium = 0.0
-        for feature in self.security_features:
-            if feature.feature_type in SecurityFeatureModel.get_premium_features():
-                premium += 0.15
-            elif feature.feature_type in SecurityFeatureModel.get_standard_features():
-                premium += 0.10
-        return premium
+        return sum(
+            SecurityFeatureModel.get_feature_premium(feature.feature_type)
+            for feature in self.security_features
+        )
+
+
+# Unit names are unique per city among live units, ignoring case
+Index(
+    'uq_units_name_city',
+    func.lower(UnitModel.unit_name),
+    func.lower(UnitModel.city),
+    unique=True,
+    postgresql_where=UnitModel.live(),
+    sqlite_where=UnitModel.live()
+)
+
+# Partial indexes only cover the rows their queries can return: live units
+# for the hot listing paths, deleted ones for the archival job
+Index('ix_units_live_status', UnitModel.status,
+      postgresql_where=UnitModel.live(), sqlite_where=UnitModel.live())
+Index('ix_units_deleted_at', UnitModel.deleted_at,
+      postgresql_where=UnitModel.deleted_at.is_not(None),
+      sqlite_where=UnitModel.deleted_at.is_not(None))
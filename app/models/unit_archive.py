@@ -0,0 +1,46 @@
+from datetime import datetime
+from app.models.base import BaseModel
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Integer, String, Float, Enum, Numeric, Boolean
+from typing import Optional
+from app.models.enums import UnitStatus
+from app.models.securityFeature import SecurityFeatureType
+
+
+class UnitArchiveModel(BaseModel):
+    """Soft-deleted unit moved out of the units table, kept for analytics"""
+    __tablename__ = "units_archive"
+
+    unit_id: Mapped[str] = mapped_column(String(20), primary_key=True)
+    unit_name: Mapped[str] = mapped_column(String, nullable=False)
+    country: Mapped[str] = mapped_column(String, nullable=False)
+    city: Mapped[str] = mapped_column(String, nullable=False)
+    address_link: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[UnitStatus] = mapped_column(Enum(UnitStatus))
+    size_sqm: Mapped[float] = mapped_column(Float, nullable=False)
+    base_rate: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    security_premium: Mapped[float] = mapped_column(
+        Numeric(6, 4), nullable=False)
+    monthly_rate: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    currency: Mapped[str] = mapped_column(String, nullable=False)
+    climate_controlled: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    floor_level: Mapped[str] = mapped_column(String(50), nullable=False)
+    rental_duration_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    # No foreign keys: archived rows outlive the users they point to
+    user_id: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True, index=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.now)
+
+
+class SecurityFeatureArchiveModel(BaseModel):
+    """Security features of archived units"""
+    __tablename__ = "security_features_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    unit_id: Mapped[str] = mapped_column(
+        String(20), nullable=False, index=True)
+    feature_type: Mapped[SecurityFeatureType] = mapped_column(
+        Enum(SecurityFeatureType), nullable=False)
+    notes: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
@@ -0,0 +1,29 @@
+from app.models.base import BaseModel
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, String, ForeignKey, UniqueConstraint
+
+
+class UnitImageModel(BaseModel):
+    """An uploaded unit image, stored by the SHA-256 of its content"""
+    __tablename__ = "unit_images"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    unit_id: Mapped[str] = mapped_column(
+        String(20),
+        ForeignKey('units.unit_id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    content_hash: Mapped[str] = mapped_column(
+        String(64), nullable=False, index=True)
+    content_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    unit = relationship("UnitModel", back_populates="uploaded_images")
+
+    __table_args__ = (
+        UniqueConstraint('unit_id', 'content_hash',
+                         name='uq_unit_images_unit_hash'),
+    )
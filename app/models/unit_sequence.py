@@ -0,0 +1,13 @@
+from app.models.base import BaseModel
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String
+
+
+class UnitIdSequenceModel(BaseModel):
+    """Last sequence number handed out per city prefix and year"""
+    __tablename__ = "unit_id_sequences"
+
+    city_prefix: Mapped[str] = mapped_column(String(3), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    last_value: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0)
@@ -0,0 +1,35 @@
+from app.models.base import BaseModel
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, Float, ForeignKey
+
+
+class UserRentalSummaryModel(BaseModel):
+    """
+    Running rental totals of a user as tenant and as owner, kept up to
+    date with deltas by RentalService and rebuilt by
+    `flask rentals reconcile-summary`
+    """
+    __tablename__ = "user_rental_summary"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    tenant_rentals: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0)
+    tenant_active: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0)
+    tenant_spent: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0)
+    # Sum of rental durations in days, for the average
+    tenant_days: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0)
+    owner_rentals: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0)
+    owner_active: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0)
+    owner_revenue: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0)
+    owner_days: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0)
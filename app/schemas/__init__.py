@@ -4,5 +4,6 @@ from marshmallow import Schema, ValidationError
 from .user import UserSchema, UserUpdateSchema, UserResponseSchema
 from .unit import UnitBaseSchema, UnitCreateSchema, UnitUpdateSchema, UnitResponseSchema
 from .auth import LoginSchema, SignupSchema
+from .saved_search import SavedSearchCreateSchema
 
 
@@ -0,0 +1,38 @@
+from marshmallow import Schema, ValidationError, fields, validate, EXCLUDE, pre_load, validates_schema
+from app.models.securityFeature import SecurityFeatureType
+
+
+class SavedSearchCreateSchema(Schema):
+    """Schema for creating a saved search"""
+    class Meta:
+        unknown = EXCLUDE
+
+    @pre_load
+    def process_features(self, data, **kwargs):
+        """Convert feature names to uppercase before validation"""
+        if isinstance(data.get('features'), list):
+            data['features'] = [
+                feature.upper() if isinstance(feature, str) else feature
+                for feature in data['features']
+            ]
+        return data
+
+    name = fields.Str(validate=validate.Length(max=100))
+    city = fields.Str(validate=validate.Length(min=1))
+    min_size = fields.Float(validate=validate.Range(min=0))
+    max_size = fields.Float(validate=validate.Range(min=0))
+    min_price = fields.Float(validate=validate.Range(min=0))
+    max_price = fields.Float(validate=validate.Range(min=0))
+    features = fields.List(
+        fields.Str(validate=validate.OneOf(
+            choices=[feature.name for feature in SecurityFeatureType]
+        )),
+        load_default=list
+    )
+
+    @validates_schema
+    def validate_ranges(self, data, **kwargs):
+        for low, high in (('min_size', 'max_size'), ('min_price', 'max_price')):
+            if data.get(low) is not None and data.get(high) is not None \
+                    and data[low] > data[high]:
+                raise ValidationError(f"{low} cannot be greater than {high}")
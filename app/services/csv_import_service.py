@@ -0,0 +1,564 @@
+import csv
+import io
+import json
+import re
+import time
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterator, TextIO, Tuple
+
+from app.models.base import db, dialect_name
+from app.models.unit import UnitModel
+from app.models.rental import RentalModel
+from app.models.user import UserModel
+from app.models.enums import UnitStatus
+from app.models.securityFeature import SecurityFeatureModel, SecurityFeatureType
+from app.services.unit_service import UnitService
+from app.services.saved_search_service import SavedSearchService
+from app.services.unit_similarity_service import UnitSimilarityService
+from app.services.unit_autocomplete_service import UnitAutocompleteService
+
+
+# Names facility managers use in their sheets, mapped to our feature types
+FEATURE_ALIASES = {
+    'cctv': SecurityFeatureType.CCTV,
+    'cameras': SecurityFeatureType.CCTV,
+    'keypad entry': SecurityFeatureType.ACCESS,
+    'keycard access': SecurityFeatureType.ACCESS,
+    'access control': SecurityFeatureType.ACCESS,
+    'on-site guard': SecurityFeatureType.GUARDS,
+    'security guard': SecurityFeatureType.GUARDS,
+    'alarm system': SecurityFeatureType.ALARM,
+    'alarm': SecurityFeatureType.ALARM,
+    'motion sensor': SecurityFeatureType.MOTION,
+    'fire detection': SecurityFeatureType.FIRE,
+    'smoke detector': SecurityFeatureType.FIRE,
+    'biometric': SecurityFeatureType.BIOMETRIC,
+    'lighting': SecurityFeatureType.BASIC,
+    'lock': SecurityFeatureType.BASIC,
+}
+STATUS_ALIASES = {
+    'available': UnitStatus.VACANT,
+    'free': UnitStatus.VACANT,
+    'rented': UnitStatus.OCCUPIED,
+    'booked': UnitStatus.RESERVED,
+    'repair': UnitStatus.MAINTENANCE,
+}
+CURRENCY_SYMBOLS = {'$': 'USD', 'R': 'ZAR', '€': 'EUR', '£': 'GBP'}
+TRUE_VALUES = {'yes', 'y', 'true', 't', '1'}
+FALSE_VALUES = {'no', 'n', 'false', 'f', '0', ''}
+
+
+class CsvImportService:
+    """
+    Streams CSV exports into the database a chunk at a time: each chunk
+    is normalized in Python, probed for existing rows with one query and
+    written with COPY (PostgreSQL) or executemany, then committed, so
+    memory stays flat however large the file is.
+    """
+    CHUNK_SIZE = 1000
+    DEFAULT_DURATION_DAYS = 30
+
+    @staticmethod
+    def import_units(
+        stream: TextIO,
+        city: str,
+        country: str,
+        address_link: str,
+        owner_id: Optional[int] = None,
+        currency: Optional[str] = None,
+        name_prefix: str = 'Unit',
+        upsert: bool = False,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Import units from an inventory CSV (see playground/data/data.csv)
+        Args:
+            stream: Open text stream of the CSV file
+            city, country, address_link: Location of the facility
+            owner_id: Owner for rows without a user_id
+            currency: Currency for rates without a symbol or code
+            name_prefix: Unit names are "<prefix> <unit_id column>"
+            upsert: Update units that already exist instead of skipping them
+            chunk_size: Rows written per statement and transaction
+        Returns:
+            Dict with row counts, per-line errors and throughput
+        """
+        defaults = {
+            'city': city.strip(),
+            'country': country.strip(),
+            'address_link': address_link,
+            'owner_id': owner_id,
+            'currency': currency,
+            'name_prefix': name_prefix
+        }
+        return CsvImportService._run(
+            stream, chunk_size,
+            parse=lambda row: CsvImportService._parse_unit_row(row, defaults),
+            write=lambda rows: CsvImportService._write_units(rows, upsert)
+        )
+
+    @staticmethod
+    def import_users(stream: TextIO, upsert: bool = False,
+                     chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Import users from a CSV with id,name,surname,email,password_hash
+        columns. Passwords must already be bcrypt hashes.
+        Args:
+            stream: Open text stream of the CSV file
+            upsert: Update users whose email already exists
+            chunk_size: Rows written per statement and transaction
+        Returns:
+            Dict with row counts, per-line errors and throughput
+        """
+        stats = CsvImportService._run(
+            stream, chunk_size,
+            parse=CsvImportService._parse_user_row,
+            write=lambda rows: CsvImportService._write_users(rows, upsert)
+        )
+        if stats['inserted'] and dialect_name() == 'postgresql':
+            # Explicit ids bypass the sequence; move it past them
+            db.session.execute(db.text(
+                "SELECT setval(pg_get_serial_sequence('users', 'id'), "
+                "(SELECT COALESCE(MAX(id), 1) FROM users))"))
+            db.session.commit()
+        return stats
+
+    @staticmethod
+    def _run(stream: TextIO, chunk_size: int, parse, write) -> Dict[str, Any]:
+        """Parse and write a CSV chunk by chunk, one transaction per chunk"""
+        stats = {'rows': 0, 'inserted': 0,
+                 'updated': 0, 'skipped': 0, 'errors': []}
+        started = time.perf_counter()
+
+        for chunk in CsvImportService._chunks(csv.DictReader(stream), chunk_size):
+            stats['rows'] += len(chunk)
+            parsed = {}
+            for line, row in chunk:
+                try:
+                    data = parse(row)
+                except (ValueError, KeyError, TypeError) as e:
+                    stats['errors'].append({'line': line, 'error': str(e)})
+                    continue
+                if data['_key'] in parsed:
+                    stats['errors'].append({
+                        'line': line,
+                        'error': f"Duplicate of line {parsed[data['_key']]['_line']}"
+                    })
+                    continue
+                parsed[data['_key']] = {**data, '_line': line}
+
+            if not parsed:
+                continue
+            try:
+                inserted, updated, skipped, row_errors = write(
+                    list(parsed.values()))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                stats['errors'].append({
+                    'line': f"{chunk[0][0]}-{chunk[-1][0]}",
+                    'error': f"Chunk failed: {str(e)}"
+                })
+                continue
+            stats['inserted'] += inserted
+            stats['updated'] += updated
+            stats['skipped'] += skipped
+            stats['errors'].extend(row_errors)
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 3)
+        stats['rows_per_second'] = round(
+            stats['rows'] / elapsed) if elapsed else stats['rows']
+        return stats
+
+    @staticmethod
+    def _chunks(reader: csv.DictReader, size: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+        """Yield lists of (line number, row) without reading ahead"""
+        while True:
+            chunk = [(reader.line_num, row) for row in islice(reader, size)]
+            if not chunk:
+                return
+            yield chunk
+
+    # Units
+
+    @staticmethod
+    def _parse_unit_row(row: Dict[str, str], defaults: Dict[str, Any]) -> Dict[str, Any]:
+        external_id = (row.get('unit_id') or '').strip()
+        if not external_id:
+            raise ValueError("unit_id is required")
+
+        size = float(row['size_sqm'])
+        if size <= 0:
+            raise ValueError("size_sqm must be positive")
+
+        base_rate, rate_currency = CsvImportService._parse_money(
+            row['monthly_rate'])
+        if base_rate <= 0:
+            raise ValueError("monthly_rate must be positive")
+
+        floor_level = (row.get('floor_level') or '').strip()
+        if not floor_level:
+            raise ValueError("floor_level is required")
+
+        owner = (row.get('user_id') or '').strip()
+        features = CsvImportService._parse_features(
+            row.get('security_features'))
+        premium = UnitService._features_premium(features)
+        unit_name = f"{defaults['name_prefix']} {external_id}"
+
+        return {
+            '_key': (unit_name.lower(), defaults['city'].lower()),
+            'unit_name': unit_name,
+            'country': defaults['country'],
+            'city': defaults['city'],
+            'address_link': defaults['address_link'],
+            'status': CsvImportService._parse_status(row.get('status')),
+            'size_sqm': size,
+            'base_rate': base_rate,
+            'security_premium': premium,
+            'monthly_rate': UnitModel.price(base_rate, premium),
+            'currency': rate_currency or defaults['currency'] or 'ZAR',
+            'climate_controlled': CsvImportService._parse_bool(
+                row.get('climate_controlled')),
+            'floor_level': floor_level,
+            'rental_duration_days': int(row.get('rental_duration_days') or 0)
+            or CsvImportService.DEFAULT_DURATION_DAYS,
+            'user_id': int(owner) if owner else defaults['owner_id'],
+            'features': features
+        }
+
+    @staticmethod
+    def _write_units(rows: List[Dict[str, Any]], upsert: bool) -> Tuple[int, int, int, List[Dict[str, Any]]]:
+        # A unit with a tenant or a booking is run by the rental flow, so
+        # its status is never taken from a sheet
+        occupied = db.or_(
+            UnitModel.tenant_id.isnot(None),
+            db.select(RentalModel.id).where(
+                RentalModel.unit_id == UnitModel.unit_id,
+                RentalModel.status == 'active'
+            ).exists()
+        )
+        existing = dict(
+            ((name, city), (unit_id, user_id, status, is_occupied))
+            for name, city, unit_id, user_id, status, is_occupied in db.session.execute(
+                db.select(db.func.lower(UnitModel.unit_name),
+                          db.func.lower(UnitModel.city), UnitModel.unit_id,
+                          UnitModel.user_id, UnitModel.status, occupied)
+                .where(
+                    db.tuple_(
+                        db.func.lower(UnitModel.unit_name), db.func.lower(UnitModel.city)
+                    ).in_([row['_key'] for row in rows]),
+                    UnitModel.live()
+                )
+            )
+        )
+        # Names are unique per city across owners, so a row naming another
+        # owner's unit can be neither inserted nor allowed to overwrite it
+        errors = [
+            {
+                'line': row['_line'],
+                'error': f"Unit '{row['unit_name']}' in {row['city']} belongs to another owner"
+            }
+            for row in rows
+            if row['_key'] in existing and existing[row['_key']][1] != row['user_id']
+        ]
+        rows = [row for row in rows
+                if row['_key'] not in existing or existing[row['_key']][1] == row['user_id']]
+        new_rows = [row for row in rows if row['_key'] not in existing]
+        matched = [
+            {
+                **row,
+                'unit_id': existing[row['_key']][0],
+                'status': (existing[row['_key']][2] if existing[row['_key']][3]
+                           else row['status'])
+            }
+            for row in rows if row['_key'] in existing
+        ]
+        if not upsert:
+            matched, skipped = [], len(matched)
+        else:
+            skipped = 0
+
+        now = datetime.now()
+        for row, unit_id in zip(new_rows, UnitService._allocate_unit_ids_for(
+                [row['city'] for row in new_rows])):
+            row['unit_id'] = unit_id
+
+        columns = ('unit_id', 'unit_name', 'country', 'city', 'address_link',
+                   'status', 'size_sqm', 'base_rate', 'security_premium',
+                   'monthly_rate', 'currency', 'climate_controlled',
+                   'floor_level', 'rental_duration_days', 'user_id')
+        unit_rows = [
+            {
+                **{column: row[column] for column in columns},
+                'tenant_id': None,
+                'shared_user_emails': [],
+                'version': 1,
+                'created_at': now,
+                'updated_at': now
+            } for row in new_rows
+        ]
+
+        if matched:
+            table = UnitModel.__table__
+            updatable = ('status', 'size_sqm', 'base_rate', 'security_premium',
+                         'monthly_rate', 'currency', 'climate_controlled',
+                         'floor_level', 'rental_duration_days')
+            db.session.execute(
+                table.update()
+                .where(table.c.unit_id == db.bindparam('key_unit_id'))
+                .values(
+                    **{column: db.bindparam(column, type_=table.c[column].type)
+                       for column in updatable},
+                    version=table.c.version + 1,
+                    updated_at=now
+                ),
+                [
+                    {'key_unit_id': row['unit_id'],
+                     **{column: row[column] for column in updatable}}
+                    for row in matched
+                ]
+            )
+
+        # Features a matched unit keeps are left alone, with their notes;
+        # only the ones the sheet dropped or added are written
+        current = set(db.session.execute(
+            db.select(SecurityFeatureModel.unit_id, SecurityFeatureModel.feature_type)
+            .where(SecurityFeatureModel.unit_id.in_(
+                [row['unit_id'] for row in matched]))
+        ).tuples()) if matched else set()
+        wanted = {(row['unit_id'], feature_type)
+                  for row in new_rows + matched for feature_type in row['features']}
+        removed = current - wanted
+        if removed:
+            db.session.execute(
+                db.delete(SecurityFeatureModel)
+                .where(db.tuple_(SecurityFeatureModel.unit_id,
+                                 SecurityFeatureModel.feature_type).in_(
+                    list(removed)))
+                .execution_options(synchronize_session=False)
+            )
+
+        feature_rows = [
+            {
+                'unit_id': row['unit_id'],
+                'feature_type': feature_type,
+                'notes': "Imported from CSV",
+                'created_at': now,
+                'updated_at': now
+            }
+            for row in new_rows + matched for feature_type in row['features']
+            if (row['unit_id'], feature_type) not in current
+        ]
+
+        if dialect_name() == 'postgresql':
+            CsvImportService._copy_rows(UnitModel.__table__, unit_rows)
+            CsvImportService._copy_rows(
+                SecurityFeatureModel.__table__, feature_rows)
+        else:
+            if unit_rows:
+                db.session.execute(db.insert(UnitModel), unit_rows)
+            if feature_rows:
+                db.session.execute(
+                    db.insert(SecurityFeatureModel), feature_rows)
+
+        # Only units that are new or just became vacant can be news to a
+        # saved search; re-importing unchanged rows must not notify again
+        SavedSearchService.match_units(
+            [row['unit_id'] for row in new_rows] + [
+                row['unit_id'] for row in matched
+                if row['status'] == UnitStatus.VACANT
+                and existing[row['_key']][2] != UnitStatus.VACANT
+                and not existing[row['_key']][3]
+            ])
+
+        if new_rows or matched:
+            UnitSimilarityService.invalidate()
+            UnitAutocompleteService.invalidate()
+        return len(new_rows), len(matched), skipped, errors
+
+    # Users
+
+    @staticmethod
+    def _parse_user_row(row: Dict[str, str]) -> Dict[str, Any]:
+        email = (row.get('email') or '').strip().lower()
+        if '@' not in email or len(email) <= 5:
+            raise ValueError(f"Invalid email: {email or '(empty)'}")
+
+        name = (row.get('name') or '').strip()
+        surname = (row.get('surname') or '').strip()
+        if not name or not surname:
+            raise ValueError("name and surname are required")
+
+        password = (row.get('password_hash') or '').strip()
+        if not re.fullmatch(r'\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}', password):
+            raise ValueError("password_hash must be a bcrypt hash")
+
+        user_id = (row.get('id') or '').strip()
+        return {
+            '_key': email,
+            'id': int(user_id) if user_id else None,
+            'name': name[:50],
+            'surname': surname[:50],
+            'email': email,
+            'password': password
+        }
+
+    @staticmethod
+    def _write_users(rows: List[Dict[str, Any]], upsert: bool) -> Tuple[int, int, int, List[Dict[str, Any]]]:
+        existing = set(db.session.execute(
+            db.select(UserModel.email)
+            .where(UserModel.email.in_([row['email'] for row in rows]))
+        ).scalars())
+        new_rows = [row for row in rows if row['email'] not in existing]
+        matched = [row for row in rows if row['email'] in existing]
+        if not upsert:
+            matched, skipped = [], len(matched)
+        else:
+            skipped = 0
+
+        now = datetime.now()
+        if matched:
+            table = UserModel.__table__
+            db.session.execute(
+                table.update()
+                .where(table.c.email == db.bindparam('key_email'))
+                .values(
+                    name=db.bindparam('name'),
+                    surname=db.bindparam('surname'),
+                    password=db.bindparam('password'),
+                    updated_at=now
+                ),
+                [
+                    {'key_email': row['email'], 'name': row['name'],
+                     'surname': row['surname'], 'password': row['password']}
+                    for row in matched
+                ]
+            )
+
+        # Rows with and without an explicit id go in separate batches so
+        # every batch has the same columns
+        columns = ('name', 'surname', 'email', 'password')
+        for with_id in (True, False):
+            batch = [
+                {
+                    **({'id': row['id']} if with_id else {}),
+                    **{column: row[column] for column in columns},
+                    'created_at': now,
+                    'updated_at': now
+                } for row in new_rows if (row['id'] is not None) == with_id
+            ]
+            if not batch:
+                continue
+            if dialect_name() == 'postgresql':
+                CsvImportService._copy_rows(UserModel.__table__, batch)
+            else:
+                db.session.execute(db.insert(UserModel), batch)
+
+        return len(new_rows), len(matched), skipped, []
+
+    # Helpers
+
+    @staticmethod
+    def _copy_rows(table, rows: List[Dict[str, Any]]) -> None:
+        """Stream rows into a table with COPY ... FROM STDIN (PostgreSQL)"""
+        if not rows:
+            return
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([CsvImportService._copy_value(row[column])
+                             for column in columns])
+        buffer.seek(0)
+
+        # The raw DBAPI connection of the session's transaction
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _copy_value(value: Any) -> Any:
+        """Render a value the way COPY's CSV format expects it"""
+        if isinstance(value, Enum):
+            return value.name
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, (list, dict)):
+            return json.dumps(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _parse_money(value: str) -> Tuple[float, Optional[str]]:
+        """Parse '$100', 'R1 200.50' or '100 ZAR' into (amount, currency)"""
+        match = re.fullmatch(
+            r'\s*([^\d\s.,-]*)\s*(-?[\d\s,]*\.?\d+)\s*([A-Za-z]{3})?\s*', value or '')
+        if not match:
+            raise ValueError(f"Invalid amount: {value}")
+        symbol, amount, code = match.groups()
+        if symbol and code:
+            raise ValueError(f"Invalid amount: {value}")
+
+        currency = None
+        if code:
+            currency = code.upper()
+        elif symbol in CURRENCY_SYMBOLS:
+            currency = CURRENCY_SYMBOLS[symbol]
+        elif len(symbol) == 3 and symbol.isalpha():
+            currency = symbol.upper()
+        elif symbol:
+            raise ValueError(f"Unknown currency symbol: {symbol}")
+
+        return float(re.sub(r'[\s,]', '', amount)), currency
+
+    @staticmethod
+    def _parse_bool(value: Optional[str]) -> bool:
+        normalized = (value or '').strip().lower()
+        if normalized in TRUE_VALUES:
+            return True
+        if normalized in FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid yes/no value: {value}")
+
+    @staticmethod
+    def _parse_status(value: Optional[str]) -> UnitStatus:
+        normalized = (value or '').strip().lower()
+        if not normalized:
+            return UnitStatus.VACANT
+        if normalized in STATUS_ALIASES:
+            return STATUS_ALIASES[normalized]
+        for status in UnitStatus:
+            if normalized in (status.name.lower(), status.value):
+                return status
+        raise ValueError(f"Unknown status: {value}")
+
+    @staticmethod
+    def _parse_features(value: Optional[str]) -> List[SecurityFeatureType]:
+        """Map a comma separated feature list onto SecurityFeatureType"""
+        # Every unit has at least a lock
+        features = [SecurityFeatureType.BASIC]
+        for name in (value or '').split(','):
+            normalized = ' '.join(name.lower().split())
+            if not normalized:
+                continue
+            feature = FEATURE_ALIASES.get(normalized) or FEATURE_ALIASES.get(
+                normalized.rstrip('s'))
+            if feature is None:
+                feature = next((
+                    feature_type for feature_type in SecurityFeatureType
+                    if normalized in (feature_type.name.lower(), feature_type.value.lower())
+                ), None)
+            if feature is None:
+                raise ValueError(f"Unknown security feature: {name.strip()}")
+            if feature not in features:
+                features.append(feature)
+        return features
@@ -0,0 +1,226 @@
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, Any, Optional
+
+from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+# Variant name -> (bounding size, format, crop to exact size)
+VARIANTS = {
+    'thumbnail': ((320, 240), 'JPEG', True),
+    'thumbnail_webp': ((320, 240), 'WEBP', True),
+    'webp': ((1600, 1600), 'WEBP', False),
+}
+CONTENT_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+}
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+
+
+def _write_atomically(path: str, write) -> None:
+    """Write through a temp file so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            write(handle)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render_variants(original_path: str, variant_dir: str) -> str:
+    """
+    Render every missing variant of an original. Runs in a worker
+    process, so it only takes plain paths and touches no app state.
+    """
+    with Image.open(original_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+
+        for name, (size, image_format, crop) in VARIANTS.items():
+            path = os.path.join(variant_dir, name + EXTENSIONS[image_format])
+            if os.path.exists(path):
+                continue
+
+            if crop:
+                variant = ImageOps.fit(image, size, Image.LANCZOS)
+            else:
+                variant = image.copy()
+                variant.thumbnail(size, Image.LANCZOS)
+            if image_format == 'JPEG':
+                variant = variant.convert('RGB')
+
+            _write_atomically(path, lambda handle: variant.save(
+                handle, image_format, quality=80, optimize=True))
+    return variant_dir
+
+
+class ImageStorageService:
+    """
+    Content-addressed image store under storage/. Originals are kept
+    once per SHA-256, so re-uploads of the same file cost nothing, and
+    variants are rendered by a process pool after the upload returns.
+    """
+    MAX_IMAGE_BYTES = 10 * 1024 * 1024
+    URL_PREFIX = '/api/units/images'
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _pending = set()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def inspect(data: bytes) -> Dict[str, Any]:
+        """
+        Validate an uploaded image without storing it
+        Args:
+            data: Raw file content
+        Returns:
+            Dict with hash, content type, dimensions and size, or error
+        """
+        if not data:
+            return {"error": "Empty image upload"}
+        if len(data) > ImageStorageService.MAX_IMAGE_BYTES:
+            return {"error": f"Images cannot be larger than {ImageStorageService.MAX_IMAGE_BYTES // (1024 * 1024)} MB"}
+
+        try:
+            with Image.open(BytesIO(data)) as image:
+                image_format = image.format
+                width, height = image.size
+                image.verify()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+            return {"error": "Uploaded file is not a valid image"}
+
+        if image_format not in CONTENT_TYPES:
+            return {"error": f"Unsupported image format: {image_format}"}
+
+        return {
+            'content_hash': hashlib.sha256(data).hexdigest(),
+            'content_type': CONTENT_TYPES[image_format],
+            'width': width,
+            'height': height,
+            'size_bytes': len(data)
+        }
+
+    @staticmethod
+    def store(content_hash: str, data: bytes) -> bool:
+        """
+        Store an inspected original unless it is already stored
+        Returns:
+            True if this call wrote the file
+        """
+        path = ImageStorageService.original_path(content_hash)
+        if os.path.exists(path):
+            return False
+        _write_atomically(path, lambda handle: handle.write(data))
+        return True
+
+    @staticmethod
+    def discard(content_hash: str) -> None:
+        """Remove an original and its variants that no unit refers to"""
+        variant_dir = ImageStorageService._variant_dir(content_hash)
+        paths = [ImageStorageService.original_path(content_hash)] + [
+            os.path.join(variant_dir, name + EXTENSIONS[image_format])
+            for name, (_, image_format, _) in VARIANTS.items()
+        ]
+        for path in paths:
+            if os.path.exists(path):
+                os.unlink(path)
+
+    @staticmethod
+    def schedule_variants(content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Queue variant rendering unless it is done or already queued
+        Returns:
+            Error dict if the image could not be decoded while rendering
+            inline, otherwise None
+        """
+        variant_dir = ImageStorageService._variant_dir(content_hash)
+        if all(os.path.exists(os.path.join(variant_dir, name + EXTENSIONS[image_format]))
+               for name, (_, image_format, _) in VARIANTS.items()):
+            return None
+
+        original = ImageStorageService.original_path(content_hash)
+        workers = current_app.config.get('IMAGE_WORKERS', 2)
+        if not workers:
+            # No pool configured (tests, one-off scripts): render inline
+            try:
+                render_variants(original, variant_dir)
+            except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+                return {"error": "Uploaded file is not a valid image"}
+            return None
+
+        with ImageStorageService._lock:
+            if content_hash in ImageStorageService._pending:
+                return
+            if ImageStorageService._executor is None:
+                ImageStorageService._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            ImageStorageService._pending.add(content_hash)
+            future = ImageStorageService._executor.submit(
+                render_variants, original, variant_dir)
+
+        future.add_done_callback(
+            lambda _: ImageStorageService._finish(content_hash))
+        return None
+
+    @staticmethod
+    def _finish(content_hash: str) -> None:
+        with ImageStorageService._lock:
+            ImageStorageService._pending.discard(content_hash)
+
+    @staticmethod
+    def resolve(content_hash: str, variant: str) -> Optional[tuple]:
+        """
+        Find the file to serve for a variant
+        Returns:
+            (path, is_final) or None if the image does not exist;
+            is_final is False when the original stands in for a variant
+            that has not been rendered yet
+        """
+        if variant != 'original':
+            _, image_format, _ = VARIANTS[variant]
+            path = os.path.join(ImageStorageService._variant_dir(
+                content_hash), variant + EXTENSIONS[image_format])
+            if os.path.exists(path):
+                return path, True
+
+        path = ImageStorageService.original_path(content_hash)
+        if not os.path.exists(path):
+            return None
+        return path, variant == 'original'
+
+    @staticmethod
+    def urls(content_hash: str) -> Dict[str, str]:
+        """Public URLs of an image's original and variants"""
+        base = f"{ImageStorageService.URL_PREFIX}/{content_hash}"
+        urls = {'original': f"{base}/original"}
+        urls.update({name: f"{base}/{name}" for name in VARIANTS})
+        return urls
+
+    @staticmethod
+    def original_path(content_hash: str) -> str:
+        return os.path.join(ImageStorageService._root(), 'originals',
+                            content_hash[:2], content_hash)
+
+    @staticmethod
+    def _variant_dir(content_hash: str) -> str:
+        return os.path.join(ImageStorageService._root(), 'variants',
+                            content_hash[:2], content_hash)
+
+    @staticmethod
+    def _root() -> str:
+        return current_app.config.get('IMAGE_STORAGE_PATH') or os.path.join(
+            os.path.dirname(current_app.root_path), 'storage', 'images')
@@ -0,0 +1,208 @@
+import time
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.base import db, dialect_name
+from app.models.invoice import InvoiceModel, InvoiceLineModel
+from app.models.rental import RentalModel
+from app.models.unit import UnitModel
+
+
+class InvoiceService:
+    """
+    Bills rentals a calendar month at a time. A run walks the rentals
+    that were active during the period in id order, a chunk at a time:
+    the chunk is prorated with numpy in one vectorized pass and its
+    invoices and lines are written with two multi-row INSERTs, then
+    committed. Rentals already invoiced for the period are skipped, so
+    an interrupted or repeated run never bills twice.
+    """
+    CHUNK_SIZE = 5000
+
+    @staticmethod
+    def run_billing(year: int, month: int, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Invoice every rental that overlaps a billing month
+        Args:
+            year: Year of the billing period
+            month: Month of the billing period (1-12)
+            chunk_size: Rentals invoiced per transaction
+        Returns:
+            Dict with rental and invoice counts, the billed total and
+            throughput
+        """
+        period_start, period_end = InvoiceService.period_bounds(year, month)
+        window_start = datetime.combine(period_start, datetime.min.time())
+        window_end = datetime.combine(period_end, datetime.min.time())
+        period_days = (period_end - period_start).days
+        stats = {'period': f"{year:04d}-{month:02d}", 'rentals': 0,
+                 'invoices': 0, 'amount': 0.0}
+        insert = postgresql.insert if dialect_name() == 'postgresql' else sqlite.insert
+        invoices_table = InvoiceModel.__table__
+        one_day = np.timedelta64(1, 'D')
+        started = time.perf_counter()
+        last_id = 0
+
+        try:
+            while True:
+                rows = db.session.execute(
+                    db.select(
+                        RentalModel.id,
+                        RentalModel.tenant_id,
+                        RentalModel.start_date,
+                        RentalModel.end_date,
+                        RentalModel.monthly_rate,
+                        UnitModel.unit_name,
+                        UnitModel.currency
+                    )
+                    .join(UnitModel)
+                    .where(
+                        RentalModel.id > last_id,
+                        RentalModel.start_date < window_end,
+                        RentalModel.end_date > window_start,
+                        ~db.select(InvoiceModel.id).where(
+                            InvoiceModel.rental_id == RentalModel.id,
+                            InvoiceModel.period_start == period_start
+                        ).exists()
+                    )
+                    .order_by(RentalModel.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                stats['rentals'] += len(rows)
+
+                rental_ids, tenant_ids, starts, ends, rates, names, currencies = zip(*rows)
+                billed_from, billed_to, days, amounts = InvoiceService._prorate(
+                    starts, ends, rates, period_start, period_end)
+                billable = np.flatnonzero(days > 0)
+                if billable.size == 0:
+                    continue
+
+                created = db.session.execute(
+                    insert(invoices_table)
+                    .on_conflict_do_nothing(
+                        index_elements=['rental_id', 'period_start'])
+                    .returning(invoices_table.c.id, invoices_table.c.rental_id),
+                    [
+                        {
+                            'rental_id': rental_ids[i],
+                            'tenant_id': tenant_ids[i],
+                            'period_start': period_start,
+                            'period_end': period_end,
+                            'currency': currencies[i],
+                            'amount': float(amounts[i]),
+                            'status': 'issued'
+                        } for i in billable
+                    ]
+                ).all()
+                invoice_ids = {rental_id: invoice_id for invoice_id, rental_id in created}
+
+                lines = [
+                    {
+                        'invoice_id': invoice_ids[rental_ids[i]],
+                        'description': (
+                            f"Storage rental: {names[i]}, "
+                            f"{billed_from[i]} to {billed_to[i] - one_day}"
+                        ),
+                        'quantity': int(days[i]),
+                        'unit_price': round(float(rates[i]) / period_days, 4),
+                        'amount': float(amounts[i])
+                    } for i in billable if rental_ids[i] in invoice_ids
+                ]
+                if lines:
+                    db.session.execute(
+                        db.insert(InvoiceLineModel.__table__), lines)
+                db.session.commit()
+
+                stats['invoices'] += len(lines)
+                stats['amount'] += sum(line['amount'] for line in lines)
+
+        except Exception as e:
+            db.session.rollback()
+            stats['error'] = f"Billing run failed: {str(e)}"
+
+        seconds = time.perf_counter() - started
+        stats['amount'] = round(stats['amount'], 2)
+        stats['seconds'] = round(seconds, 2)
+        stats['rentals_per_second'] = round(stats['rentals'] / seconds) if seconds else 0
+        return stats
+
+    @staticmethod
+    def get_user_invoices(user_id: int, period: Optional[Tuple[int, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Get a tenant's invoices with their lines, newest period first
+        Args:
+            user_id: ID of the tenant
+            period: Only the invoices of this (year, month)
+        Returns:
+            List of invoices
+        """
+        query = (
+            db.select(InvoiceModel)
+            .where(InvoiceModel.tenant_id == user_id)
+            .options(db.selectinload(InvoiceModel.lines))
+            .order_by(InvoiceModel.period_start.desc(), InvoiceModel.id.desc())
+        )
+        if period:
+            query = query.where(
+                InvoiceModel.period_start == InvoiceService.period_bounds(*period)[0])
+
+        invoices = db.session.execute(query).scalars().all()
+        return [InvoiceService._serialize_invoice(invoice) for invoice in invoices]
+
+    @staticmethod
+    def period_bounds(year: int, month: int) -> Tuple[date, date]:
+        """First day of a billing month and of the month after it"""
+        return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
+
+    @staticmethod
+    def _prorate(starts, ends, rates, period_start: date, period_end: date):
+        """
+        Vectorized proration of a chunk of rentals over a billing month.
+        A rental is billed for every calendar day of the month it covers,
+        including a partly used last day, at monthly_rate / days in month.
+        Returns:
+            Arrays of first billed day, day after the last billed day,
+            billed days and amounts rounded half up to cents
+        """
+        first = np.datetime64(period_start, 'D')
+        last = np.datetime64(period_end, 'D')
+        start_days = np.array(starts, dtype='datetime64[us]').astype('datetime64[D]')
+        end_days = (
+            np.array(ends, dtype='datetime64[us]') - np.timedelta64(1, 'us')
+        ).astype('datetime64[D]') + np.timedelta64(1, 'D')
+
+        billed_from = np.maximum(start_days, first)
+        billed_to = np.minimum(end_days, last)
+        days = np.maximum((billed_to - billed_from).astype(np.int64), 0)
+        amounts = np.floor(
+            np.asarray(rates, dtype=float) * days / (last - first).astype(np.int64)
+            * 100 + 0.5
+        ) / 100
+        return billed_from, billed_to, days, amounts
+
+    @staticmethod
+    def _serialize_invoice(invoice: InvoiceModel) -> Dict[str, Any]:
+        """Convert invoice model to dictionary"""
+        return {
+            'id': invoice.id,
+            'rental_id': invoice.rental_id,
+            'period_start': invoice.period_start.isoformat(),
+            'period_end': invoice.period_end.isoformat(),
+            'currency': invoice.currency,
+            'amount': float(invoice.amount),
+            'status': invoice.status,
+            'lines': [
+                {
+                    'description': line.description,
+                    'quantity': line.quantity,
+                    'unit_price': float(line.unit_price),
+                    'amount': float(line.amount)
+                } for line in invoice.lines
+            ],
+            'created_at': invoice.created_at.isoformat() if invoice.created_at else None
+        }
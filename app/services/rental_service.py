@@ -1,60 +1,207 @@
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta, timezone
+import base64
+import binascii
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, datetime, time, timedelta, timezone
 from flask import json
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
-from app.models.base import db
+from app.models.base import db, dialect_name, days_between
 from app.models.rental import RentalModel
+from app.models.rental_share import RentalShareModel
 from app.models.unit import UnitModel
 from app.models.enums import UnitStatus
 from app.models.user import UserModel
+from app.services.saved_search_service import SavedSearchService
+from app.services.unit_service import UnitService
+from app.services.unit_similarity_service import UnitSimilarityService
+from app.services.rental_summary_service import RentalSummaryService, Delta
 
 
 class RentalService:
+    # SQLSTATE of a Postgres exclusion constraint violation
+    EXCLUSION_VIOLATION = '23P01'
+    SWEEP_BATCH_SIZE = 500
+    PAGE_SIZE = 50
+
     @staticmethod
     def create_rental(data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new rental agreement"""
+        """
+        Create a new rental agreement, now or for a future window.
+        A booking that starts now claims the unit with a single conditional
+        UPDATE ... WHERE status = VACANT, so of two concurrent bookings
+        exactly one matches the row. The rental itself is written with
+        INSERT ... SELECT ... WHERE NOT EXISTS over the unit's overlapping
+        active bookings, so the probe and the write are one statement;
+        on Postgres the ex_rentals_unit_period constraint backs it up.
+        Future bookings leave the unit's current status alone.
+        """
         try:
-            # Validate unit availability
-            unit = db.session.execute(
-                db.select(UnitModel).filter_by(unit_id=data['unit_id'])
-            ).scalar_one_or_none()
-
-            if not unit:
-                return {"error": "Unit not found"}
-
-            if unit.status != UnitStatus.VACANT:
-                return {"error": "Unit is not available for rent"}
-
-            # Create rental agreement
-            rental = RentalModel(
-                unit_id=data['unit_id'],
-                tenant_id=data['tenant_id'],
-                start_date=data['start_date'],
-                end_date=data['end_date'],
-                monthly_rate=unit.monthly_rate,
-                status='active',
-                created_at=datetime.now(tz=timezone.utc),
-                updated_at=datetime.now(tz=timezone.utc),
-                total_cost=(data['end_date'] - data['start_date']).days * (unit.monthly_rate / 30)
-            )
+            now = datetime.utcnow()
+            unit_id = data['unit_id']
+            start_date = RentalService._as_utc(data['start_date'])
+            end_date = RentalService._as_utc(data['end_date'])
+            if end_date <= start_date:
+                return {"error": "End date must be after start date"}
 
             # TODO: Change this when payment methods is implemented
-            # Update unit status
-            unit.status = UnitStatus.OCCUPIED
-            unit.tenant_id = data['tenant_id']
-
-            db.session.add(rental)
+            if start_date <= now:
+                claimed = db.session.execute(
+                    db.update(UnitModel)
+                    .where(
+                        UnitModel.unit_id == unit_id,
+                        UnitModel.status == UnitStatus.VACANT,
+                        UnitModel.live()
+                    )
+                    .values(
+                        status=UnitStatus.OCCUPIED,
+                        tenant_id=data['tenant_id'],
+                        version=UnitModel.version + 1,
+                        updated_at=now
+                    )
+                    .returning(UnitModel.unit_id)
+                    .execution_options(synchronize_session=False)
+                ).first()
+                if claimed is None:
+                    return RentalService._refuse_booking(
+                        unit_id, "Unit is not available for rent")
+
+            days = (end_date - start_date).days
+            booking = db.select(
+                UnitModel.unit_id,
+                db.literal(int(data['tenant_id']), RentalModel.tenant_id.type),
+                db.literal(start_date, RentalModel.start_date.type),
+                db.literal(end_date, RentalModel.end_date.type),
+                UnitModel.monthly_rate,
+                db.literal('active'),
+                UnitModel.monthly_rate * days / 30,
+                db.literal(now, RentalModel.created_at.type),
+                db.literal(now, RentalModel.updated_at.type)
+            ).where(
+                UnitModel.unit_id == unit_id,
+                UnitModel.live(),
+                ~RentalService._overlapping_bookings(
+                    unit_id, start_date, end_date).exists()
+            )
+            inserted = db.session.execute(
+                db.insert(RentalModel)
+                .from_select(
+                    ['unit_id', 'tenant_id', 'start_date', 'end_date',
+                     'monthly_rate', 'status', 'total_cost', 'created_at',
+                     'updated_at'],
+                    booking
+                )
+                .returning(RentalModel.id, RentalModel.total_cost)
+            ).first()
+            if inserted is None:
+                return RentalService._refuse_booking(
+                    unit_id, "Unit is already booked for these dates")
+
+            owner_id = db.session.execute(
+                db.select(UnitModel.user_id).where(UnitModel.unit_id == unit_id)
+            ).scalar()
+            RentalSummaryService.apply_delta(data['tenant_id'], owner_id, (
+                1, 1, float(inserted.total_cost),
+                (end_date - start_date).total_seconds() / 86400
+            ))
             db.session.commit()
+            if start_date <= now:
+                UnitService._reindex_unit(db.session.get(UnitModel, unit_id))
 
-            return RentalService._serialize_rental(rental)
+            # The requester is the tenant, so they see the full rental
+            return RentalService._serialize_rental(
+                db.session.get(RentalModel, inserted.id), data['tenant_id'])
 
-        except IntegrityError:
+        except IntegrityError as e:
             db.session.rollback()
+            if getattr(e.orig, 'pgcode', None) == RentalService.EXCLUSION_VIOLATION:
+                # Lost a race against a concurrent booking of the same window
+                return {"error": "Unit is already booked for these dates"}
             return {"error": "Database integrity error"}
         except Exception as e:
             db.session.rollback()
             return {"error": f"Failed to create rental: {str(e)}"}
 
+    @staticmethod
+    def _summary_contribution(rental: RentalModel) -> Delta:
+        """What a rental adds to its tenant's and owner's summary totals"""
+        days = (RentalService._as_utc(rental.end_date) -
+                RentalService._as_utc(rental.start_date)).total_seconds() / 86400
+        return (1, int(rental.status == 'active'), float(rental.total_cost or 0), days)
+
+    @staticmethod
+    def _apply_summary_change(rental: RentalModel, before: Delta) -> None:
+        """Record the change of a rental since `before` in the summaries"""
+        after = RentalService._summary_contribution(rental)
+        RentalSummaryService.apply_delta(
+            rental.tenant_id, rental.unit.user_id,
+            tuple(new - old for new, old in zip(after, before)))
+
+    @staticmethod
+    def _refuse_booking(unit_id: str, reason: str) -> Dict[str, Any]:
+        """Roll back a refused booking and explain why it was refused"""
+        db.session.rollback()
+        exists = db.session.execute(
+            db.select(UnitModel.unit_id)
+            .where(UnitModel.unit_id == unit_id, UnitModel.live())
+        ).first()
+        if not exists:
+            return {"error": "Unit not found"}
+        return {"error": reason}
+
+    @staticmethod
+    def _overlapping_bookings(unit_id: str, start_date: datetime, end_date: datetime,
+                              exclude_id: Optional[int] = None):
+        """
+        Select active rentals of a unit overlapping [start_date, end_date).
+        On Postgres this is a range probe on the gist index behind
+        ex_rentals_unit_period. Elsewhere, since a unit's active bookings
+        never overlap each other, only the latest one starting before
+        end_date can overlap; it is a single backwards seek on
+        ix_rentals_unit_period, however long the unit's history.
+        Args:
+            unit_id: ID of the unit
+            start_date: Start of the window (naive UTC)
+            end_date: Exclusive end of the window (naive UTC)
+            exclude_id: Rental to ignore, when moving its own dates
+        Returns:
+            Select whose .exists() is true if the window is taken
+        """
+        if dialect_name() == 'postgresql':
+            query = db.select(RentalModel.id).where(
+                RentalModel.unit_id == unit_id,
+                RentalModel.status == 'active',
+                db.func.tsrange(
+                    RentalModel.start_date, RentalModel.end_date
+                ).op('&&')(db.func.tsrange(start_date, end_date))
+            )
+            if exclude_id is not None:
+                query = query.where(RentalModel.id != exclude_id)
+            return query
+
+        latest = (
+            db.select(RentalModel.end_date)
+            .where(
+                RentalModel.unit_id == unit_id,
+                RentalModel.status == 'active',
+                RentalModel.start_date < end_date
+            )
+            .order_by(RentalModel.start_date.desc())
+            .limit(1)
+        )
+        if exclude_id is not None:
+            latest = latest.where(RentalModel.id != exclude_id)
+        latest = latest.subquery()
+        return db.select(latest.c.end_date).where(latest.c.end_date > start_date)
+
+    @staticmethod
+    def _as_utc(value) -> datetime:
+        """Normalize a date or datetime to the naive UTC datetimes stored"""
+        if not isinstance(value, datetime):
+            return datetime.combine(value, time.min)
+        if value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
     @staticmethod
     def get_rental_by_id(rental_id: int, current_user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Get rental agreement by ID"""
@@ -65,24 +212,102 @@ class RentalService:
         return RentalService._serialize_rental(rental, current_user_id) if rental else None
 
     @staticmethod
-    def get_user_rentals(user_id: int) -> Dict[str, List[Dict[str, Any]]]:
-        """Get all rentals for a user (both as tenant and owner)"""
-        # Get rentals where user is tenant
-        tenant_rentals = db.session.execute(
-            db.select(RentalModel).filter_by(tenant_id=user_id)
-        ).scalars().all()
-
-        # Get rentals where user is unit owner
-        owner_rentals = db.session.execute(
+    def get_user_rentals(user_id: int, status: Optional[str] = None,
+                         start_from: Optional[date] = None, start_to: Optional[date] = None,
+                         cursor: Optional[str] = None, limit: int = PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Get one page of a user's rentals (both as tenant and owner), newest
+        first by (start_date, id). Each role is a keyset range scan -
+        ix_rentals_tenant_start for the tenant side, ix_rentals_unit_period
+        through the owner's units for the other - and both are merged in
+        the same statement.
+        Args:
+            user_id: ID of the user
+            status: Only rentals with this status
+            start_from: Only rentals starting on or after this date
+            start_to: Only rentals starting on or before this date
+            cursor: next_cursor of the previous page
+            limit: Page size
+        Returns:
+            Rentals of the page by role, and the cursor of the next page
+        """
+        try:
+            keyset = RentalService._decode_cursor(cursor)
+        except ValueError:
+            return {"error": "Invalid cursor"}
+
+        def page(query):
+            return RentalService._page_query(
+                query, status, start_from, start_to, keyset, limit).subquery()
+
+        as_tenant = page(
+            db.select(RentalModel.id).where(RentalModel.tenant_id == user_id))
+        as_owner = page(
+            db.select(RentalModel.id).join(UnitModel)
+            .where(UnitModel.user_id == user_id))
+        page_ids = db.union(
+            db.select(as_tenant.c.id), db.select(as_owner.c.id)).subquery()
+
+        rentals = db.session.execute(
             db.select(RentalModel)
-            .join(UnitModel)
-            .filter(UnitModel.user_id == user_id)
+            .join(page_ids, page_ids.c.id == RentalModel.id)
+            .order_by(RentalModel.start_date.desc(), RentalModel.id.desc())
+            .limit(limit + 1)
+            .options(*RentalService._load_options())
         ).scalars().all()
+        rentals, next_cursor = RentalService._split_page(rentals, limit)
 
-        return {
-            'as_tenant': [RentalService._serialize_rental(r, user_id) for r in tenant_rentals],
-            'as_owner': [RentalService._serialize_rental(r, user_id) for r in owner_rentals]
-        }
+        result = {'as_tenant': [], 'as_owner': [], 'next_cursor': next_cursor}
+        for rental in rentals:
+            serialized = RentalService._serialize_rental(rental, user_id)
+            if str(rental.tenant_id) == str(user_id):
+                result['as_tenant'].append(serialized)
+            if str(rental.unit.user_id) == str(user_id):
+                result['as_owner'].append(serialized)
+        return result
+
+    @staticmethod
+    def _page_query(query, status: Optional[str], start_from: Optional[date],
+                    start_to: Optional[date], keyset: Optional[Tuple[datetime, int]],
+                    limit: int):
+        """Apply list filters, the keyset and the page order to a rentals select"""
+        if status:
+            query = query.where(RentalModel.status == status)
+        if start_from:
+            query = query.where(RentalModel.start_date >= datetime.combine(
+                start_from, time.min))
+        if start_to:
+            query = query.where(RentalModel.start_date < datetime.combine(
+                start_to + timedelta(days=1), time.min))
+        if keyset:
+            query = query.where(
+                db.tuple_(RentalModel.start_date, RentalModel.id) < keyset)
+        return (
+            query.order_by(RentalModel.start_date.desc(), RentalModel.id.desc())
+            .limit(limit + 1)
+        )
+
+    @staticmethod
+    def _split_page(rentals: List[RentalModel], limit: int) -> Tuple[List[RentalModel], Optional[str]]:
+        """Trim the look-ahead row of a page and derive the next cursor"""
+        if len(rentals) <= limit:
+            return rentals, None
+        rentals = rentals[:limit]
+        last = rentals[-1]
+        raw = f"{last.start_date.isoformat()}|{last.id}"
+        return rentals, base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+        """Parse a next_cursor back into its (start_date, id) keyset"""
+        if not cursor:
+            return None
+        try:
+            start_date, rental_id = base64.urlsafe_b64decode(
+                cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(start_date), int(rental_id)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise ValueError(f"Invalid cursor: {cursor}")
 
     @staticmethod
     def update_rental(rental_id: int, data: Dict[str, Any], user_id: int) -> Dict[str, Any]:
@@ -99,27 +324,44 @@ class RentalService:
             if not (str(rental.tenant_id) == str(user_id) or str(rental.unit.user_id) == str(user_id)):
                 return {"error": "Unauthorized to modify this rental"}
 
+            if data.get('status') == 'terminated' and rental.status != 'active':
+                return {"error": "Rental is not active"}
+
+            # Extending into the next booking of the unit, or reactivating
+            # a rental whose dates were booked since, is not allowed
+            if data.get('status', rental.status) == 'active':
+                clash = db.session.execute(db.select(
+                    RentalService._overlapping_bookings(
+                        rental.unit_id, rental.start_date,
+                        RentalService._as_utc(data.get('end_date', rental.end_date)),
+                        exclude_id=rental.id
+                    ).exists()
+                )).scalar()
+                if clash:
+                    return {"error": "Unit is already booked for these dates"}
+
+            before = RentalService._summary_contribution(rental)
+
             # Handle status changes
-            if 'status' in data:
-                if data['status'] == 'terminated':
-                    rental.end_date = datetime.now(tz=timezone.utc)
-                    rental.unit.status = UnitStatus.VACANT
-                    rental.unit.tenant_id = None
-
-            allowed_fields = ['end_date', 'status']
-            for field in allowed_fields:
-                if field in data:
-                    setattr(rental, field, data[field])
-            end_date = data.get('end_date', rental.end_date)
-            if isinstance(end_date, datetime):
-                end_date = end_date.date()
-            if isinstance(rental.start_date, datetime):
-                start_date = rental.start_date.date()
+            if data.get('status') == 'terminated':
+                RentalService._end_rental(rental)
             else:
-                start_date = rental.start_date
-            rental.total_cost = (end_date - start_date).days * (rental.monthly_rate / 30)
-            rental.updated_at = datetime.now(tz=timezone.utc)
+                allowed_fields = ['end_date', 'status']
+                for field in allowed_fields:
+                    if field in data:
+                        setattr(rental, field, data[field])
+                end_date = data.get('end_date', rental.end_date)
+                if isinstance(end_date, datetime):
+                    end_date = end_date.date()
+                if isinstance(rental.start_date, datetime):
+                    start_date = rental.start_date.date()
+                else:
+                    start_date = rental.start_date
+                rental.total_cost = (end_date - start_date).days * (rental.monthly_rate / 30)
+                rental.updated_at = datetime.now(tz=timezone.utc)
+            RentalService._apply_summary_change(rental, before)
             db.session.commit()
+            UnitService._reindex_unit(rental.unit)
 
             return RentalService._serialize_rental(rental)
 
@@ -145,15 +387,11 @@ class RentalService:
             if rental.status != 'active':
                 return {"error": "Rental is not active"}
 
-            # Update rental and unit
-            rental.status = 'terminated'
-            rental.end_date = datetime.now(tz=timezone.utc)
-            rental.updated_at = datetime.now(tz=timezone.utc)
-
-            rental.unit.status = UnitStatus.VACANT
-            rental.unit.tenant_id = None
-
+            before = RentalService._summary_contribution(rental)
+            RentalService._end_rental(rental)
+            RentalService._apply_summary_change(rental, before)
             db.session.commit()
+            UnitService._reindex_unit(rental.unit)
 
             return {"message": "Rental terminated successfully"}
 
@@ -161,6 +399,36 @@ class RentalService:
             db.session.rollback()
             return {"error": f"Failed to terminate rental: {str(e)}"}
 
+    @staticmethod
+    def _end_rental(rental: RentalModel) -> None:
+        """
+        Terminate a rental as of now and recost it for the period it kept.
+        The unit is only freed if this rental is the one occupying it; a
+        booking that has not started yet is cancelled as a zero-length
+        booking and leaves whoever holds the unit alone.
+        """
+        now = datetime.utcnow()
+        start_date = RentalService._as_utc(rental.start_date)
+        rental.status = 'terminated'
+        rental.end_date = max(now, start_date)
+        rental.total_cost = (rental.end_date - start_date).days * (rental.monthly_rate / 30)
+        rental.updated_at = now
+
+        unit = rental.unit
+        if start_date <= now and str(unit.tenant_id) == str(rental.tenant_id):
+            unit.status = UnitStatus.VACANT
+            unit.tenant_id = None
+            SavedSearchService.match_unit(unit)
+
+    @staticmethod
+    def _load_options():
+        """Eager-load what _serialize_rental reads, one query per relation"""
+        return (
+            db.selectinload(RentalModel.unit).lazyload(UnitModel.uploaded_images),
+            db.selectinload(RentalModel.tenant),
+            db.selectinload(RentalModel.shared_users)
+        )
+
     @staticmethod
     def _serialize_rental(rental: RentalModel, current_user_id: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -170,17 +438,11 @@ class RentalService:
             current_user_id: ID of the requesting user (None for public access)
         """
         # Check if user is authorized to see sensitive info
-        shared_users = json.loads(rental.shared_user_emails or '[]')
-        current_user = None
-        if current_user_id:
-            current_user = db.session.query(UserModel).get(current_user_id)
-
-        is_authorized = (
-            current_user_id and (
-                str(current_user_id) == str(rental.tenant_id) or  # Is tenant
-                str(current_user_id) == str(rental.unit.user_id) or  # Is owner
-                (current_user and current_user.email in shared_users)  # Is shared user
-            )
+        is_authorized = bool(current_user_id) and (
+            str(current_user_id) == str(rental.tenant_id) or  # Is tenant
+            str(current_user_id) == str(rental.unit.user_id) or  # Is owner
+            any(str(current_user_id) == str(user.id)
+                for user in rental.shared_users)  # Is shared user
         )
 
         # Base serialization (public info)
@@ -209,82 +471,78 @@ class RentalService:
                     'name': f"{rental.tenant.name} {rental.tenant.surname}",
                     'email': rental.tenant.email
                 },
-                'shared_users': shared_users
+                'shared_users': [user.email for user in rental.shared_users]
             })
 
         return serialized
 
     @staticmethod
-    def get_rental_statistics() -> Dict[str, Any]:
-        """Get statistics about rentals"""
-        now = datetime.now(tz=timezone.utc)
-        stats = {
-            'total_active_rentals': db.session.query(RentalModel)
-            .filter_by(status='active').count(),
-            'total_terminated': db.session.query(RentalModel)
-            .filter_by(status='terminated').count(),
-            'expiring_soon': db.session.query(RentalModel)
-            .filter(
-                RentalModel.status == 'active',
-                RentalModel.end_date <= now + timedelta(days=30)
-            ).count(),
-            'average_duration': db.session.query(
-                db.func.avg(
-                    db.func.julianday(RentalModel.end_date) -
-                    db.func.julianday(RentalModel.start_date)
-                )
-            ).scalar() or 0
-        }
-        return stats
+    def get_global_rental_statistics() -> Dict[str, Any]:
+        """Get statistics about all rentals, in a single aggregate query"""
+        try:
+            now = datetime.utcnow()
+            active = RentalModel.status == 'active'
+            row = db.session.execute(
+                db.select(
+                    db.func.count().filter(active),
+                    db.func.count().filter(RentalModel.status == 'terminated'),
+                    db.func.count().filter(
+                        active, RentalModel.end_date <= now + timedelta(days=30)),
+                    db.func.avg(days_between(
+                        RentalModel.start_date, RentalModel.end_date))
+                ).select_from(RentalModel)
+            ).one()
+
+            return {
+                'total_active_rentals': row[0],
+                'total_terminated': row[1],
+                'expiring_soon': row[2],
+                'average_duration': float(row[3] or 0)
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to get rental statistics: {str(e)}"}
 
     @staticmethod
     def get_rental_statistics(user_id: int) -> Dict[str, Any]:
-        """Get statistics about user's rentals"""
+        """
+        Get statistics about user's rentals, as tenant and as owner.
+        Totals come from the user's user_rental_summary row, kept current
+        by deltas, so the cost does not grow with the rental history.
+        """
         try:
-            # Get user's rentals as tenant
-            tenant_rentals = db.session.query(
-                RentalModel).filter_by(tenant_id=user_id)
-
-            # Get user's rentals as owner
-            owner_rentals = (db.session.query(RentalModel)
-                             .join(UnitModel)
-                             .filter(UnitModel.user_id == user_id))
-
-            # Calculate average duration using SQLite's julianday function
-            avg_duration = db.session.query(
-                db.func.avg(
-                    db.func.round(
-                        (db.func.julianday(RentalModel.end_date) -
-                         db.func.julianday(RentalModel.start_date))
-                    )
+            summary = RentalSummaryService.get_summary(user_id)
+            units_rented = db.session.execute(
+                db.select(db.func.count())
+                .select_from(UnitModel)
+                .where(
+                    UnitModel.user_id == user_id,
+                    db.select(RentalModel.id)
+                    .where(RentalModel.unit_id == UnitModel.unit_id)
+                    .exists()
                 )
-            ).filter(RentalModel.tenant_id == user_id).scalar()
+            ).scalar()
+
+            def average(days, rentals):
+                return round(days / rentals, 2) if rentals else 0.0
 
-            stats = {
+            return {
                 'as_tenant': {
-                    'total_rentals': tenant_rentals.count(),
-                    'active_rentals': tenant_rentals.filter_by(status='ACTIVE').count(),
-                    'total_spent': float(
-                        tenant_rentals.with_entities(
-                            db.func.sum(RentalModel.total_cost)
-                        ).scalar() or 0
-                    ),
-                    'average_duration': float(avg_duration or 0)
+                    'total_rentals': summary['tenant_rentals'],
+                    'active_rentals': summary['tenant_active'],
+                    'total_spent': round(summary['tenant_spent'], 2),
+                    'average_duration': average(
+                        summary['tenant_days'], summary['tenant_rentals'])
                 },
                 'as_owner': {
-                    'total_rentals': owner_rentals.count(),
-                    'active_rentals': owner_rentals.filter_by(status='ACTIVE').count(),
-                    'total_revenue': float(
-                        owner_rentals.with_entities(
-                            db.func.sum(RentalModel.total_cost)
-                        ).scalar() or 0
-                    ),
-                    'units_rented': owner_rentals.distinct(RentalModel.unit_id).count()
+                    'total_rentals': summary['owner_rentals'],
+                    'active_rentals': summary['owner_active'],
+                    'total_revenue': round(summary['owner_revenue'], 2),
+                    'units_rented': units_rented
                 }
             }
 
-            return stats
-
         except Exception as e:
             db.session.rollback()
             return {"error": f"Failed to get rental statistics: {str(e)}"}
@@ -312,12 +570,14 @@ class RentalService:
             if not shared_user:
                 return {"error": "User not found"}
 
-            if rental.add_shared_user(email):
-                db.session.commit()
-                return RentalService._serialize_rental(rental)
-            else:
+            if db.session.get(RentalShareModel, (rental.id, shared_user.id)):
                 return {"error": "User already has access"}
 
+            db.session.add(RentalShareModel(
+                rental_id=rental.id, user_id=shared_user.id))
+            db.session.commit()
+            return RentalService._serialize_rental(rental, user_id)
+
         except Exception as e:
             db.session.rollback()
             return {"error": f"Failed to share rental: {str(e)}"}
@@ -336,78 +596,324 @@ class RentalService:
             if str(rental.tenant_id) != str(user_id):
                 return {"error": "Only the tenant can manage sharing"}
 
-            if rental.remove_shared_user(email):
-                db.session.commit()
-                return RentalService._serialize_rental(rental)
-            else:
+            result = db.session.execute(
+                db.delete(RentalShareModel).where(
+                    RentalShareModel.rental_id == rental.id,
+                    RentalShareModel.user_id.in_(
+                        db.select(UserModel.id).filter_by(email=email))
+                )
+            )
+            if not result.rowcount:
+                db.session.rollback()
                 return {"error": "User does not have access"}
 
+            db.session.commit()
+            return RentalService._serialize_rental(rental, user_id)
+
         except Exception as e:
             db.session.rollback()
             return {"error": f"Failed to remove shared access: {str(e)}"}
 
     @staticmethod
-    def get_upcoming_expirations(user_id: int) -> List[Dict[str, Any]]:
+    def get_shared_with_me(user_id: int) -> List[Dict[str, Any]]:
         """
-        Get rentals expiring in the next 30 days for a user
+        Get the rentals other tenants shared with a user, newest first.
+        Served from the user_id index of rental_shares.
         Args:
-            user_id: ID of the user (can be tenant or owner)
+            user_id: ID of the user the rentals were shared with
+        Returns:
+            List of rentals
+        """
+        rentals = db.session.execute(
+            db.select(RentalModel)
+            .join(RentalShareModel, RentalShareModel.rental_id == RentalModel.id)
+            .where(RentalShareModel.user_id == user_id)
+            .order_by(RentalModel.start_date.desc(), RentalModel.id.desc())
+            .options(*RentalService._load_options())
+        ).scalars().all()
+        return [RentalService._serialize_rental(rental, user_id) for rental in rentals]
+
+    @staticmethod
+    def migrate_shared_emails(chunk_size: int = 1000) -> Dict[str, Any]:
+        """
+        Move the legacy JSON shared_user_emails lists into rental_shares.
+        Rentals are walked in id order; each chunk resolves its emails with
+        one query, writes its shares with one INSERT ... ON CONFLICT DO
+        NOTHING and clears the migrated column, so re-runs are cheap and
+        never duplicate a share.
+        Args:
+            chunk_size: Rentals migrated per transaction
         Returns:
-            List of rentals expiring soon
+            Counts of migrated rentals, shares and emails without a user
         """
+        stats = {'rentals': 0, 'shares': 0, 'unknown_emails': 0}
+        insert = postgresql.insert if dialect_name() == 'postgresql' else sqlite.insert
+        last_id = 0
         try:
-            thirty_days_from_now = datetime.now(
-                tz=timezone.utc) + timedelta(days=30)
-
-            # Get rentals where user is tenant
-            tenant_rentals = (
-                db.session.query(RentalModel)
-                .filter(
-                    RentalModel.tenant_id == user_id,
-                    RentalModel.status == 'active',
-                    RentalModel.end_date <= thirty_days_from_now,
-                    RentalModel.end_date >= datetime.now(tz=timezone.utc)
+            while True:
+                rows = db.session.execute(
+                    db.select(RentalModel.id, RentalModel.shared_user_emails)
+                    .where(
+                        RentalModel.id > last_id,
+                        RentalModel.shared_user_emails.is_not(None)
+                    )
+                    .order_by(RentalModel.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                emails_by_rental = {}
+                for rental_id, raw in rows:
+                    try:
+                        emails = json.loads(raw or '[]')
+                    except ValueError:
+                        emails = []
+                    if isinstance(emails, list):
+                        emails_by_rental[rental_id] = {
+                            email for email in emails if isinstance(email, str)}
+
+                wanted = set().union(*emails_by_rental.values())
+                user_ids = dict(db.session.execute(
+                    db.select(UserModel.email, UserModel.id)
+                    .where(UserModel.email.in_(wanted))
+                ).all()) if wanted else {}
+
+                shares = [
+                    {'rental_id': rental_id, 'user_id': user_ids[email]}
+                    for rental_id, emails in emails_by_rental.items()
+                    for email in emails if email in user_ids
+                ]
+                if shares:
+                    db.session.execute(
+                        insert(RentalShareModel).on_conflict_do_nothing(), shares)
+                db.session.execute(
+                    db.update(RentalModel)
+                    .where(RentalModel.id.in_([row.id for row in rows]))
+                    .values(shared_user_emails=None)
+                    .execution_options(synchronize_session=False)
                 )
-                .all()
-            )
+                db.session.commit()
+
+                stats['rentals'] += len(rows)
+                stats['shares'] += len(shares)
+                stats['unknown_emails'] += sum(
+                    len(emails) for emails in emails_by_rental.values()
+                ) - len(shares)
+            return stats
+
+        except Exception as e:
+            db.session.rollback()
+            return {**stats, "error": f"Failed to migrate shared users: {str(e)}"}
 
-            # Get rentals where user is owner
-            owner_rentals = (
-                db.session.query(RentalModel)
+    @staticmethod
+    def get_upcoming_expirations(user_id: int, days: int = 30, limit: int = 100) -> Dict[str, Any]:
+        """
+        Get active rentals of a user ending within a horizon, soonest first.
+        The tenant and owner sides are one UNION ALL query tagged by role,
+        each branch a range scan of ix_rentals_status_end_date; units and
+        tenants are then loaded in bulk.
+        Args:
+            user_id: ID of the user (can be tenant or owner)
+            days: How many days ahead to look
+            limit: Maximum number of rentals across both roles
+        Returns:
+            Rentals expiring soon, grouped by the user's role
+        """
+        try:
+            now = datetime.utcnow()
+            expiring = (
+                RentalModel.status == 'active',
+                RentalModel.end_date >= now,
+                RentalModel.end_date <= now + timedelta(days=days)
+            )
+            tagged = db.union_all(
+                db.select(RentalModel.id, RentalModel.end_date,
+                          db.literal('as_tenant').label('role'))
+                .where(RentalModel.tenant_id == user_id, *expiring),
+                db.select(RentalModel.id, RentalModel.end_date,
+                          db.literal('as_owner').label('role'))
                 .join(UnitModel)
-                .filter(
-                    UnitModel.user_id == user_id,
-                    RentalModel.status == 'active',
-                    RentalModel.end_date <= thirty_days_from_now,
-                    RentalModel.end_date >= datetime.now(tz=timezone.utc)
-                )
-                .all()
+                .where(UnitModel.user_id == user_id, *expiring)
+            ).subquery()
+
+            rows = db.session.execute(
+                db.select(RentalModel, tagged.c.role)
+                .join(tagged, tagged.c.id == RentalModel.id)
+                .order_by(tagged.c.end_date, RentalModel.id)
+                .limit(limit)
+                .options(*RentalService._load_options())
+            ).all()
+
+            result = {'as_tenant': [], 'as_owner': []}
+            for rental, role in rows:
+                result[role].append(
+                    RentalService._serialize_rental(rental, user_id))
+            return result
+
+        except Exception as e:
+            return {"error": f"Failed to get upcoming expirations: {str(e)}"}
+
+    @staticmethod
+    def expire_overdue_rentals(batch_size: int = SWEEP_BATCH_SIZE,
+                               now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Sweep rentals through their lifecycle with set-based UPDATEs.
+        Units whose booking has started are handed to its tenant first:
+        due bookings are read off ix_rentals_status_end_date in keyset
+        batches and only their units are updated. Then active rentals past
+        their end_date are marked expired in batches read off the same
+        index, and their units are set VACANT unless another booking is
+        already running. Each batch is its own short transaction and skips
+        rows locked by concurrent writers (FOR UPDATE SKIP LOCKED on
+        Postgres). Only active rentals are touched, so re-running the
+        sweep is harmless.
+        Args:
+            batch_size: Rentals handled per transaction
+            now: Point in time to sweep up to (naive UTC, default now)
+        Returns:
+            Counts of expired rentals, freed units and started bookings
+        """
+        now = now or datetime.utcnow()
+        stats = {'expired': 0, 'freed_units': 0, 'started': 0}
+
+        def running():
+            return db.select(RentalModel.tenant_id).where(
+                RentalModel.unit_id == UnitModel.unit_id,
+                RentalModel.status == 'active',
+                RentalModel.start_date <= now,
+                RentalModel.end_date > now
             )
 
-            return {
-                'as_tenant': [
-                    RentalService._serialize_rental(rental, user_id)
-                    for rental in tenant_rentals
-                ],
-                'as_owner': [
-                    RentalService._serialize_rental(rental, user_id)
-                    for rental in owner_rentals
-                ]
-            }
+        def held_by_other(tenant_id):
+            return db.or_(
+                UnitModel.status == UnitStatus.VACANT,
+                db.and_(UnitModel.status == UnitStatus.OCCUPIED,
+                        UnitModel.tenant_id.is_distinct_from(tenant_id))
+            )
+
+        try:
+            current_tenant = running().limit(1).scalar_subquery()
+            last = None
+            while True:
+                due = (
+                    db.select(RentalModel.end_date, RentalModel.id,
+                              RentalModel.unit_id)
+                    .join(UnitModel)
+                    .where(
+                        RentalModel.status == 'active',
+                        RentalModel.end_date > now,
+                        RentalModel.start_date <= now,
+                        UnitModel.live(),
+                        held_by_other(RentalModel.tenant_id)
+                    )
+                    .order_by(RentalModel.end_date, RentalModel.id)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True, of=RentalModel)
+                )
+                if last:
+                    due = due.where(
+                        db.tuple_(RentalModel.end_date, RentalModel.id) > last)
+                rows = db.session.execute(due).all()
+                if not rows:
+                    break
+                last = (rows[-1].end_date, rows[-1].id)
+
+                started = db.session.execute(
+                    db.update(UnitModel)
+                    .where(
+                        UnitModel.unit_id.in_([row.unit_id for row in rows]),
+                        UnitModel.live(),
+                        running().exists(),
+                        held_by_other(current_tenant)
+                    )
+                    .values(
+                        status=UnitStatus.OCCUPIED,
+                        tenant_id=current_tenant,
+                        version=UnitModel.version + 1,
+                        updated_at=now
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                stats['started'] += started.rowcount
+
+            while True:
+                rental_ids = db.session.execute(
+                    db.select(RentalModel.id)
+                    .where(RentalModel.status == 'active',
+                           RentalModel.end_date <= now)
+                    .order_by(RentalModel.end_date)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                ).scalars().all()
+                if not rental_ids:
+                    break
+
+                RentalSummaryService.apply_expired(rental_ids)
+                db.session.execute(
+                    db.update(RentalModel)
+                    .where(RentalModel.id.in_(rental_ids))
+                    .values(status='expired', updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                freed = db.session.execute(
+                    db.update(UnitModel)
+                    .where(
+                        UnitModel.unit_id.in_(
+                            db.select(RentalModel.unit_id)
+                            .where(RentalModel.id.in_(rental_ids))
+                        ),
+                        UnitModel.status == UnitStatus.OCCUPIED,
+                        ~running().exists()
+                    )
+                    .values(
+                        status=UnitStatus.VACANT,
+                        tenant_id=None,
+                        version=UnitModel.version + 1,
+                        updated_at=now
+                    )
+                    .returning(UnitModel.unit_id)
+                    .execution_options(synchronize_session=False)
+                ).scalars().all()
+                SavedSearchService.match_units(freed)
+                db.session.commit()
+
+                stats['expired'] += len(rental_ids)
+                stats['freed_units'] += len(freed)
+
+            if stats['started'] or stats['freed_units']:
+                UnitSimilarityService.invalidate()
+            return stats
 
         except Exception as e:
-            return {"error": f"Failed to get upcoming expirations: {str(e)}"}
+            db.session.rollback()
+            return {**stats, "error": f"Failed to expire rentals: {str(e)}"}
 
     @staticmethod
-    def get_rental_history(unit_id: str, user_id: int) -> List[Dict[str, Any]]:
+    def get_rental_history(unit_id: str, user_id: int, status: Optional[str] = None,
+                           start_from: Optional[date] = None, start_to: Optional[date] = None,
+                           cursor: Optional[str] = None, limit: int = PAGE_SIZE) -> Dict[str, Any]:
         """
-        Get rental history for a specific unit
+        Get one page of the rental history of a unit, newest first by
+        (start_date, id), as a keyset range scan of ix_rentals_unit_period
         Args:
             unit_id: ID of the unit
             user_id: ID of the requesting user (for authorization)
+            status: Only rentals with this status
+            start_from: Only rentals starting on or after this date
+            start_to: Only rentals starting on or before this date
+            cursor: next_cursor of the previous page
+            limit: Page size
         Returns:
-            List of past rentals for the unit
+            Rentals of the page and the cursor of the next page
         """
+        try:
+            keyset = RentalService._decode_cursor(cursor)
+        except ValueError:
+            return {"error": "Invalid cursor"}
+
         try:
             # First verify if user has access to this unit
             unit = db.session.query(UnitModel).filter_by(
@@ -419,15 +925,18 @@ class RentalService:
             if str(unit.user_id) != str(user_id) and str(unit.tenant_id) != str(user_id):
                 return {"error": "Unauthorized to view rental history"}
 
-            # Get all rentals for this unit, ordered by date
-            rentals = (
-                db.session.query(RentalModel)
-                .filter(RentalModel.unit_id == unit_id)
-                .order_by(RentalModel.start_date.desc())
-                .all()
-            )
+            rentals = db.session.execute(
+                RentalService._page_query(
+                    db.select(RentalModel).where(RentalModel.unit_id == unit_id),
+                    status, start_from, start_to, keyset, limit
+                ).options(*RentalService._load_options())
+            ).scalars().all()
+            rentals, next_cursor = RentalService._split_page(rentals, limit)
 
-            return [RentalService._serialize_rental(rental, user_id) for rental in rentals]
+            return {
+                'rentals': [RentalService._serialize_rental(rental, user_id) for rental in rentals],
+                'next_cursor': next_cursor
+            }
 
         except Exception as e:
             return {"error": f"Failed to get rental history: {str(e)}"}
@@ -0,0 +1,224 @@
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.base import db, dialect_name, days_between
+from app.models.rental import RentalModel
+from app.models.unit import UnitModel
+from app.models.user import UserModel
+from app.models.user_rental_summary import UserRentalSummaryModel
+
+
+# What one rental adds to a role's totals: (rentals, active, amount, days)
+Delta = Tuple[int, int, float, float]
+
+ROLE_COLUMNS = {
+    'tenant': ('tenant_rentals', 'tenant_active', 'tenant_spent', 'tenant_days'),
+    'owner': ('owner_rentals', 'owner_active', 'owner_revenue', 'owner_days')
+}
+
+
+class RentalSummaryService:
+    @staticmethod
+    def apply_delta(tenant_id: int, owner_id: Optional[int], delta: Delta) -> None:
+        """
+        Add a rental's change to its tenant's and owner's totals, inside
+        the caller's transaction, once the change itself is flushed. A
+        user without a summary row gets it built from history, which then
+        already holds the change; if another transaction inserts the row
+        first, the upsert waits on its lock and adds the delta to it.
+        Args:
+            tenant_id: Tenant of the rental
+            owner_id: Owner of the rented unit, if any
+            delta: Change of (rentals, active, amount, days)
+        """
+        if not any(delta):
+            return
+        changes: Dict[int, Dict[str, Any]] = {}
+        for user_id, role in ((tenant_id, 'tenant'), (owner_id, 'owner')):
+            if user_id is not None:
+                changes.setdefault(int(user_id), {}).update(
+                    zip(ROLE_COLUMNS[role], delta))
+        for user_id, change in changes.items():
+            updated = db.session.execute(
+                db.update(UserRentalSummaryModel)
+                .where(UserRentalSummaryModel.user_id == user_id)
+                .values({
+                    column: getattr(UserRentalSummaryModel, column) + value
+                    for column, value in change.items()
+                })
+                .execution_options(synchronize_session=False)
+            )
+            if updated.rowcount:
+                continue
+            insert = RentalSummaryService._insert_from_history([user_id])
+            db.session.execute(insert.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={column: getattr(insert.table.c, column) + value
+                      for column, value in change.items()}
+            ))
+
+    @staticmethod
+    def apply_expired(rental_ids: List[int]) -> None:
+        """
+        Set-based apply_delta for a batch of active rentals that are about
+        to expire: each tenant's and owner's active count drops by the
+        number of their rentals in the batch, in two UPDATE statements
+        Args:
+            rental_ids: IDs of the rentals being expired
+        """
+        if not rental_ids:
+            return
+        # Users without a row get it built while the rentals still count
+        # as active, so the decrement below applies to them too
+        affected = db.union(*(
+            db.select(RentalSummaryService._user_column(role))
+            .select_from(RentalModel).join(UnitModel)
+            .where(RentalModel.id.in_(rental_ids))
+            for role in ROLE_COLUMNS
+        ))
+        db.session.execute(
+            RentalSummaryService._insert_from_history(affected)
+            .on_conflict_do_nothing(index_elements=['user_id'])
+        )
+        for role in ROLE_COLUMNS:
+            user_id = RentalSummaryService._user_column(role)
+            expiring = (
+                db.select(db.func.count())
+                .select_from(RentalModel)
+                .where(RentalModel.id.in_(rental_ids),
+                       user_id == UserRentalSummaryModel.user_id)
+            )
+            if role == 'owner':
+                expiring = expiring.join(UnitModel)
+            active = getattr(UserRentalSummaryModel, ROLE_COLUMNS[role][1])
+            db.session.execute(
+                db.update(UserRentalSummaryModel)
+                .where(UserRentalSummaryModel.user_id.in_(
+                    db.select(user_id).select_from(RentalModel)
+                    .join(UnitModel).where(RentalModel.id.in_(rental_ids))
+                ))
+                .values({active: active - expiring.scalar_subquery()})
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def get_summary(user_id: int) -> Dict[str, Any]:
+        """
+        Get a user's rental totals, building the row from the user's
+        rental history if it does not exist yet
+        Args:
+            user_id: ID of the user
+        Returns:
+            Dict of the summary columns
+        """
+        user_id = int(user_id)
+        summary = RentalSummaryService._read(user_id)
+        if summary is None:
+            # Writers that find no row insert one too, with their change
+            # added on conflict, so whichever insert wins is complete
+            db.session.execute(
+                RentalSummaryService._insert_from_history([user_id])
+                .on_conflict_do_nothing(index_elements=['user_id'])
+            )
+            db.session.commit()
+            summary = RentalSummaryService._read(user_id)
+        return summary
+
+    @staticmethod
+    def rebuild() -> Dict[str, Any]:
+        """
+        Recompute every summary row from the rentals table with two
+        set-based INSERT ... SELECT ... GROUP BY statements, one per role,
+        in a single transaction
+        Returns:
+            Number of summary rows written
+        """
+        try:
+            insert = postgresql.insert if dialect_name() == 'postgresql' else sqlite.insert
+            db.session.execute(db.delete(UserRentalSummaryModel))
+            db.session.execute(
+                insert(UserRentalSummaryModel).from_select(
+                    ['user_id', *ROLE_COLUMNS['tenant']],
+                    RentalSummaryService._totals('tenant')
+                )
+            )
+            owners = insert(UserRentalSummaryModel).from_select(
+                ['user_id', *ROLE_COLUMNS['owner']],
+                RentalSummaryService._totals('owner')
+            )
+            db.session.execute(owners.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={column: owners.excluded[column]
+                      for column in ROLE_COLUMNS['owner']}
+            ))
+            users = db.session.execute(
+                db.select(db.func.count()).select_from(UserRentalSummaryModel)
+            ).scalar()
+            db.session.commit()
+            return {"users": users}
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to rebuild rental summaries: {str(e)}"}
+
+    @staticmethod
+    def _user_column(role: str):
+        return RentalModel.tenant_id if role == 'tenant' else UnitModel.user_id
+
+    @staticmethod
+    def _totals(role: str):
+        """Select (user_id, *ROLE_COLUMNS[role]) aggregated over rentals"""
+        user_id = RentalSummaryService._user_column(role)
+        query = (
+            db.select(
+                user_id,
+                db.func.count(),
+                db.func.count().filter(RentalModel.status == 'active'),
+                db.func.coalesce(db.func.sum(RentalModel.total_cost), 0.0),
+                db.func.coalesce(db.func.sum(days_between(
+                    RentalModel.start_date, RentalModel.end_date)), 0.0)
+            )
+            .select_from(RentalModel)
+            .where(user_id.is_not(None))
+            .group_by(user_id)
+        )
+        if role == 'owner':
+            query = query.join(UnitModel)
+        return query
+
+    @staticmethod
+    def _insert_from_history(user_ids):
+        """
+        INSERT ... SELECT of the summary rows of the given users, computed
+        from their rentals; the caller adds the ON CONFLICT clause
+        Args:
+            user_ids: List of user IDs, or a select of them
+        """
+        columns = {}
+        joined = UserModel.__table__
+        for role in ROLE_COLUMNS:
+            totals = (
+                RentalSummaryService._totals(role)
+                .where(RentalSummaryService._user_column(role).in_(user_ids))
+                .subquery()
+            )
+            user_id, *values = totals.c
+            joined = joined.outerjoin(totals, user_id == UserModel.id)
+            columns.update(
+                (column, db.func.coalesce(value, 0))
+                for column, value in zip(ROLE_COLUMNS[role], values))
+
+        insert = postgresql.insert if dialect_name() == 'postgresql' else sqlite.insert
+        return insert(UserRentalSummaryModel).from_select(
+            ['user_id', *columns],
+            db.select(UserModel.id, *columns.values())
+            .select_from(joined)
+            .where(UserModel.id.in_(user_ids))
+        )
+
+    @staticmethod
+    def _read(user_id: int) -> Optional[Dict[str, Any]]:
+        row = db.session.execute(
+            db.select(*UserRentalSummaryModel.__table__.c)
+            .where(UserRentalSummaryModel.user_id == user_id)
+        ).mappings().first()
+        return dict(row) if row else None
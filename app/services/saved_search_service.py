@@ -0,0 +1,291 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+from app.models.base import db
+from app.models.unit import UnitModel
+from app.models.enums import UnitStatus
+from app.models.securityFeature import SecurityFeatureModel, SecurityFeatureType
+from app.models.saved_search import SavedSearchModel, SavedSearchFeatureModel, SearchNotificationModel
+
+
+class SavedSearchService:
+    MAX_SEARCHES_PER_USER = 20
+
+    @staticmethod
+    def create_search(user_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a search so the user is notified when a matching unit frees up"""
+        try:
+            search_count = db.session.query(SavedSearchModel).filter_by(
+                user_id=user_id).count()
+            if search_count >= SavedSearchService.MAX_SEARCHES_PER_USER:
+                return {"error": f"Cannot have more than {SavedSearchService.MAX_SEARCHES_PER_USER} saved searches"}
+
+            city = data.get('city')
+            search = SavedSearchModel(
+                user_id=user_id,
+                name=data.get('name'),
+                city=city,
+                city_key=city.strip().lower() if city else None,
+                min_size=data.get('min_size'),
+                max_size=data.get('max_size'),
+                min_price=data.get('min_price'),
+                max_price=data.get('max_price'),
+                features=[
+                    SavedSearchFeatureModel(
+                        feature_type=SecurityFeatureType[feature])
+                    for feature in set(data.get('features', []))
+                ]
+            )
+
+            db.session.add(search)
+            db.session.commit()
+
+            return SavedSearchService._serialize_search(search)
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to save search: {str(e)}"}
+
+    @staticmethod
+    def get_user_searches(user_id: int) -> List[Dict[str, Any]]:
+        """Get all saved searches of a user"""
+        searches = db.session.execute(
+            db.select(SavedSearchModel)
+            .filter_by(user_id=user_id)
+            .options(db.selectinload(SavedSearchModel.features))
+            .order_by(SavedSearchModel.id)
+        ).scalars().all()
+        return [SavedSearchService._serialize_search(search) for search in searches]
+
+    @staticmethod
+    def delete_search(search_id: int, user_id: int) -> Dict[str, Any]:
+        """Delete a saved search and its notifications"""
+        try:
+            search = db.session.get(SavedSearchModel, search_id)
+            if not search:
+                return {"error": "Saved search not found"}
+
+            if str(search.user_id) != str(user_id):
+                return {"error": "Unauthorized - not your saved search"}
+
+            db.session.execute(
+                db.delete(SearchNotificationModel)
+                .where(SearchNotificationModel.search_id == search_id)
+            )
+            db.session.delete(search)
+            db.session.commit()
+
+            return {"message": "Saved search deleted successfully"}
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to delete saved search: {str(e)}"}
+
+    @staticmethod
+    def match_unit(unit: UnitModel) -> int:
+        """
+        Record notifications for every saved search a vacant unit satisfies.
+        Only this unit is evaluated: candidate searches come from the
+        city_key index (plus the "any city" posting list), and searches that
+        require a feature the unit lacks are dropped by an anti-join on
+        saved_search_features. Notifications are added to the current
+        session; the caller owns the commit.
+        Args:
+            unit: The unit that was created or became vacant
+        Returns:
+            Number of notifications recorded
+        """
+        if unit.status != UnitStatus.VACANT:
+            return 0
+
+        size = float(unit.size_sqm)
+        rate = float(unit.monthly_rate)
+        unit_features = [
+            feature.feature_type for feature in unit.security_features]
+
+        missing_feature = db.select(SavedSearchFeatureModel.search_id).where(
+            SavedSearchFeatureModel.search_id == SavedSearchModel.id
+        )
+        if unit_features:
+            missing_feature = missing_feature.where(
+                SavedSearchFeatureModel.feature_type.not_in(unit_features))
+
+        query = (
+            db.select(SavedSearchModel.id, SavedSearchModel.user_id)
+            .where(
+                db.or_(
+                    SavedSearchModel.city_key == unit.city.strip().lower(),
+                    SavedSearchModel.city_key.is_(None)
+                ),
+                db.or_(SavedSearchModel.min_size.is_(None),
+                       SavedSearchModel.min_size <= size),
+                db.or_(SavedSearchModel.max_size.is_(None),
+                       SavedSearchModel.max_size >= size),
+                db.or_(SavedSearchModel.min_price.is_(None),
+                       SavedSearchModel.min_price <= rate),
+                db.or_(SavedSearchModel.max_price.is_(None),
+                       SavedSearchModel.max_price >= rate),
+                ~missing_feature.exists()
+            )
+        )
+        if unit.user_id is not None:
+            # Owners don't need to hear about their own units
+            query = query.where(SavedSearchModel.user_id != unit.user_id)
+
+        matches = db.session.execute(query).all()
+        if matches:
+            db.session.execute(
+                db.insert(SearchNotificationModel),
+                [
+                    {
+                        'user_id': user_id,
+                        'search_id': search_id,
+                        'unit_id': unit.unit_id
+                    } for search_id, user_id in matches
+                ]
+            )
+        return len(matches)
+
+    @staticmethod
+    def match_units(unit_ids: List[str]) -> int:
+        """
+        Set-based variant of match_unit for batches of units that are
+        already flushed: a single INSERT ... SELECT joins the vacant units
+        to the searches of their city and skips any search requiring a
+        feature the unit does not have. The caller owns the commit.
+        Args:
+            unit_ids: IDs of units that were created or became vacant
+        Returns:
+            Number of notifications recorded
+        """
+        if not unit_ids:
+            return 0
+
+        lacks_feature = (
+            db.select(SavedSearchFeatureModel.search_id)
+            .where(
+                SavedSearchFeatureModel.search_id == SavedSearchModel.id,
+                ~db.select(SecurityFeatureModel.id).where(
+                    SecurityFeatureModel.unit_id == UnitModel.unit_id,
+                    SecurityFeatureModel.feature_type == SavedSearchFeatureModel.feature_type
+                ).correlate_except(SecurityFeatureModel).exists()
+            )
+            .correlate_except(SavedSearchFeatureModel)
+        )
+        matches = (
+            db.select(SavedSearchModel.user_id, SavedSearchModel.id, UnitModel.unit_id)
+            .join(UnitModel, db.or_(
+                SavedSearchModel.city_key == db.func.lower(db.func.trim(UnitModel.city)),
+                SavedSearchModel.city_key.is_(None)
+            ))
+            .where(
+                UnitModel.unit_id.in_(unit_ids),
+                UnitModel.live(),
+                UnitModel.status == UnitStatus.VACANT,
+                db.or_(SavedSearchModel.min_size.is_(None),
+                       SavedSearchModel.min_size <= UnitModel.size_sqm),
+                db.or_(SavedSearchModel.max_size.is_(None),
+                       SavedSearchModel.max_size >= UnitModel.size_sqm),
+                db.or_(SavedSearchModel.min_price.is_(None),
+                       SavedSearchModel.min_price <= UnitModel.monthly_rate),
+                db.or_(SavedSearchModel.max_price.is_(None),
+                       SavedSearchModel.max_price >= UnitModel.monthly_rate),
+                db.or_(UnitModel.user_id.is_(None),
+                       SavedSearchModel.user_id != UnitModel.user_id),
+                ~lacks_feature.exists()
+            )
+        )
+
+        result = db.session.execute(
+            db.insert(SearchNotificationModel).from_select(
+                ['user_id', 'search_id', 'unit_id'], matches)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def get_notifications(
+        user_id: int,
+        unread_only: bool = False,
+        after_id: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a user's newest search notifications, newest first
+        Args:
+            user_id: ID of the user
+            unread_only: Skip notifications already marked as read
+            after_id: Last id of the previous page; continues with the
+                older notifications after it
+            limit: Page size
+        Returns:
+            List of notifications
+        """
+        query = (
+            db.select(SearchNotificationModel)
+            .filter(SearchNotificationModel.user_id == user_id)
+            .options(db.joinedload(SearchNotificationModel.unit))
+            .order_by(SearchNotificationModel.id.desc())
+            .limit(limit)
+        )
+        if unread_only:
+            query = query.filter(SearchNotificationModel.read_at.is_(None))
+        if after_id:
+            query = query.filter(SearchNotificationModel.id < after_id)
+
+        notifications = db.session.execute(query).scalars().all()
+        return [SavedSearchService._serialize_notification(n) for n in notifications]
+
+    @staticmethod
+    def mark_notifications_read(user_id: int, notification_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Mark some or all of a user's notifications as read"""
+        try:
+            query = (
+                db.update(SearchNotificationModel)
+                .where(
+                    SearchNotificationModel.user_id == user_id,
+                    SearchNotificationModel.read_at.is_(None)
+                )
+                .values(read_at=datetime.utcnow())
+            )
+            if notification_ids:
+                query = query.where(
+                    SearchNotificationModel.id.in_(notification_ids))
+
+            result = db.session.execute(query)
+            db.session.commit()
+
+            return {"updated": result.rowcount}
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to update notifications: {str(e)}"}
+
+    @staticmethod
+    def _serialize_search(search: SavedSearchModel) -> Dict[str, Any]:
+        """Convert saved search model to dictionary"""
+        return {
+            'id': search.id,
+            'name': search.name,
+            'city': search.city,
+            'min_size': search.min_size,
+            'max_size': search.max_size,
+            'min_price': search.min_price,
+            'max_price': search.max_price,
+            'features': sorted(feature.feature_type.name for feature in search.features),
+            'created_at': search.created_at.isoformat() if search.created_at else None
+        }
+
+    @staticmethod
+    def _serialize_notification(notification: SearchNotificationModel) -> Dict[str, Any]:
+        """Convert notification model to a compact dictionary"""
+        unit = notification.unit
+        return {
+            'id': notification.id,
+            'search_id': notification.search_id,
+            'unit': {
+                'id': unit.unit_id,
+                'name': unit.unit_name,
+                'location': f"{unit.city}, {unit.country}",
+                'size_sqm': unit.size_sqm,
+                'monthly_rate': float(unit.monthly_rate),
+                'currency': unit.currency
+            },
+            'read': notification.read_at is not None,
+            'created_at': notification.created_at.isoformat() if notification.created_at else None
+        }
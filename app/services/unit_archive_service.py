@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any
+
+from app.models.base import db
+from app.models.unit import UnitModel
+from app.models.unit_image import UnitImageModel
+from app.models.unit_archive import UnitArchiveModel, SecurityFeatureArchiveModel
+from app.models.rental import RentalModel
+from app.models.securityFeature import SecurityFeatureModel
+from app.models.saved_search import SearchNotificationModel
+
+
+class UnitArchiveService:
+    RETENTION_DAYS = 90
+    CHUNK_SIZE = 500
+
+    # Columns copied verbatim from units to units_archive
+    UNIT_COLUMNS = (
+        'unit_id', 'unit_name', 'country', 'city', 'address_link', 'status',
+        'size_sqm', 'base_rate', 'security_premium', 'monthly_rate',
+        'currency', 'climate_controlled', 'floor_level',
+        'rental_duration_days', 'user_id', 'deleted_at', 'created_at',
+        'updated_at'
+    )
+    FEATURE_COLUMNS = ('id', 'unit_id', 'feature_type',
+                       'notes', 'created_at', 'updated_at')
+
+    @staticmethod
+    def archive_deleted_units(retention_days: int = RETENTION_DAYS,
+                              chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Move units soft-deleted more than `retention_days` ago, and their
+        features, into the archive tables. Each chunk is copied with
+        INSERT ... SELECT, deleted and committed on its own, so locks are
+        short and a failure only loses the current chunk. Units that still
+        have rentals stay put: rental history keeps pointing at them.
+        Args:
+            retention_days: Days a deleted unit stays in the hot tables
+            chunk_size: Units moved per transaction
+        Returns:
+            Dict with the number of units and features archived
+        """
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        archived_units = archived_features = 0
+
+        while True:
+            unit_ids = db.session.execute(
+                db.select(UnitModel.unit_id)
+                .where(
+                    UnitModel.deleted_at < cutoff,
+                    ~db.select(RentalModel.id)
+                    .where(RentalModel.unit_id == UnitModel.unit_id)
+                    .exists()
+                )
+                .order_by(UnitModel.deleted_at)
+                .limit(chunk_size)
+            ).scalars().all()
+            if not unit_ids:
+                break
+
+            try:
+                archived_at = datetime.utcnow()
+                db.session.execute(
+                    db.insert(UnitArchiveModel).from_select(
+                        UnitArchiveService.UNIT_COLUMNS + ('archived_at',),
+                        db.select(
+                            *(getattr(UnitModel, column)
+                              for column in UnitArchiveService.UNIT_COLUMNS),
+                            db.literal(archived_at, db.DateTime)
+                        ).where(UnitModel.unit_id.in_(unit_ids))
+                    )
+                )
+                features = db.session.execute(
+                    db.insert(SecurityFeatureArchiveModel).from_select(
+                        UnitArchiveService.FEATURE_COLUMNS,
+                        db.select(
+                            *(getattr(SecurityFeatureModel, column)
+                              for column in UnitArchiveService.FEATURE_COLUMNS)
+                        ).where(SecurityFeatureModel.unit_id.in_(unit_ids))
+                    )
+                ).rowcount
+
+                # Children first; SQLite does not enforce the cascades
+                for model in (SecurityFeatureModel, UnitImageModel, SearchNotificationModel):
+                    db.session.execute(
+                        db.delete(model)
+                        .where(model.unit_id.in_(unit_ids))
+                        .execution_options(synchronize_session=False)
+                    )
+                db.session.execute(
+                    db.delete(UnitModel)
+                    .where(UnitModel.unit_id.in_(unit_ids))
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                return {
+                    "error": f"Failed to archive units: {str(e)}",
+                    "archived_units": archived_units,
+                    "archived_features": archived_features
+                }
+
+            archived_units += len(unit_ids)
+            archived_features += features
+
+        return {
+            "archived_units": archived_units,
+            "archived_features": archived_features
+        }
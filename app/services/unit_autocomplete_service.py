@@ -0,0 +1,166 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import List, Dict, Any, Optional, Tuple
+
+from flask import current_app
+from app.models.base import db
+from app.models.unit import UnitModel
+
+
+TOKEN_KINDS = ('city', 'country', 'unit_name')
+
+# (normalized text, kind)
+Token = Tuple[str, str]
+
+
+class _PrefixIndex:
+    """
+    Sorted list of distinct tokens with per-token unit counts.
+    A prefix maps to one contiguous slice of the list, found with two
+    bisections; writes only touch the tokens of the unit that changed.
+    """
+
+    def __init__(self):
+        self.keys: List[Token] = []
+        self.counts: Dict[Token, int] = {}
+        self.labels: Dict[Token, str] = {}
+        self.unit_tokens: Dict[str, Dict[Token, str]] = {}
+        self.built_at = time.monotonic()
+
+    def _add(self, token: Token, label: str):
+        count = self.counts.get(token, 0)
+        if count == 0:
+            insort(self.keys, token)
+            self.labels[token] = label
+        self.counts[token] = count + 1
+
+    def _discard(self, token: Token):
+        count = self.counts[token] - 1
+        if count == 0:
+            del self.keys[bisect_left(self.keys, token)]
+            del self.counts[token]
+            del self.labels[token]
+        else:
+            self.counts[token] = count
+
+    def upsert(self, unit_id: str, tokens: Dict[Token, str]):
+        previous = self.unit_tokens.get(unit_id, {})
+        for token in previous.keys() - tokens.keys():
+            self._discard(token)
+        for token in tokens.keys() - previous.keys():
+            self._add(token, tokens[token])
+        self.unit_tokens[unit_id] = tokens
+
+    def remove(self, unit_id: str):
+        for token in self.unit_tokens.pop(unit_id, {}):
+            self._discard(token)
+
+    def complete(self, prefix: str, limit: int, kind: Optional[str]) -> List[Tuple[Token, int]]:
+        lo = bisect_left(self.keys, (prefix, ''))
+        hi = bisect_left(self.keys, (prefix + '\uffff', ''), lo)
+        candidates = self.keys[lo:hi]
+        if kind:
+            candidates = [token for token in candidates if token[1] == kind]
+        top = heapq.nsmallest(
+            limit, candidates, key=lambda token: (-self.counts[token], token))
+        return [(token, self.counts[token]) for token in top]
+
+
+class UnitAutocompleteService:
+    # Rebuild from the database periodically so that writes handled by
+    # other worker processes are eventually picked up
+    REFRESH_SECONDS = 300
+    EXTENSION_KEY = 'unit_autocomplete_index'
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def complete(prefix: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the most common cities, countries and unit-name words that
+        start with a prefix
+        Args:
+            prefix: Text typed so far (case-insensitive)
+            limit: Maximum number of completions
+            kind: Restrict completions to one of TOKEN_KINDS
+        Returns:
+            List of completions with the number of units carrying them
+        """
+        prefix = UnitAutocompleteService._normalize(prefix)
+        if not prefix:
+            return []
+
+        with UnitAutocompleteService._lock:
+            index = UnitAutocompleteService._get_index()
+            completions = index.complete(prefix, limit, kind)
+            return [
+                {
+                    'value': index.labels[token],
+                    'kind': token[1],
+                    'count': count
+                } for token, count in completions
+            ]
+
+    @staticmethod
+    def upsert_unit(unit: UnitModel):
+        """Refresh a unit's tokens after it was created or changed"""
+        with UnitAutocompleteService._lock:
+            index = current_app.extensions.get(
+                UnitAutocompleteService.EXTENSION_KEY)
+            if index is not None:
+                index.upsert(unit.unit_id, UnitAutocompleteService._tokenize(
+                    unit.city, unit.country, unit.unit_name))
+
+    @staticmethod
+    def remove_unit(unit_id: str):
+        """Drop a deleted unit's tokens"""
+        with UnitAutocompleteService._lock:
+            index = current_app.extensions.get(
+                UnitAutocompleteService.EXTENSION_KEY)
+            if index is not None:
+                index.remove(unit_id)
+
+    @staticmethod
+    def invalidate():
+        """Discard the index so the next query rebuilds it, after bulk writes"""
+        with UnitAutocompleteService._lock:
+            current_app.extensions.pop(
+                UnitAutocompleteService.EXTENSION_KEY, None)
+
+    @staticmethod
+    def _normalize(text: Optional[str]) -> str:
+        return ' '.join((text or '').lower().split())
+
+    @staticmethod
+    def _tokenize(city: str, country: str, unit_name: str) -> Dict[Token, str]:
+        """Map a unit's searchable values to {token: display label}"""
+        tokens = {}
+        for kind, value in (('city', city), ('country', country)):
+            normalized = UnitAutocompleteService._normalize(value)
+            if normalized:
+                tokens[(normalized, kind)] = value.strip()
+        for word in re.findall(r"\w+", unit_name or ''):
+            if len(word) > 1 and not word.isdigit():
+                tokens.setdefault((word.lower(), 'unit_name'), word)
+        return tokens
+
+    @staticmethod
+    def _get_index() -> _PrefixIndex:
+        """Return the app's index, building it if missing or stale"""
+        index = current_app.extensions.get(
+            UnitAutocompleteService.EXTENSION_KEY)
+        if index is None or time.monotonic() - index.built_at > UnitAutocompleteService.REFRESH_SECONDS:
+            index = _PrefixIndex()
+            rows = db.session.execute(
+                db.select(UnitModel.unit_id, UnitModel.city,
+                          UnitModel.country, UnitModel.unit_name)
+                .where(UnitModel.live())
+            ).all()
+            for unit_id, city, country, unit_name in rows:
+                index.upsert(unit_id, UnitAutocompleteService._tokenize(
+                    city, country, unit_name))
+            current_app.extensions[UnitAutocompleteService.EXTENSION_KEY] = index
+        return index
@@ -1,24 +1,39 @@
 from typing import List, Dict, Any, Optional
 
-from flask import json
-from app.models.base import db
+from app.models.base import db, dialect_name
 from app.models.rental import RentalModel
 from app.models.unit import UnitModel
 from app.models.enums import UnitStatus
 from app.models.securityFeature import SecurityFeatureModel, SecurityFeatureType
+from app.models.unit_sequence import UnitIdSequenceModel
+from app.models.unit_image import UnitImageModel
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime
-from app.models.user import UserModel
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import datetime, date, time, timedelta
 from app.schemas.unit import UnitCreateSchema, UnitUpdateSchema, UnitResponseSchema
+from app.services.saved_search_service import SavedSearchService
+from app.services.unit_similarity_service import UnitSimilarityService
+from app.services.unit_autocomplete_service import UnitAutocompleteService
+from app.services.image_storage_service import ImageStorageService
 from urllib.parse import urlparse
 import re
 
 
+# Marks an argument the caller did not preload
+_NOT_LOADED = object()
+
+
 class UnitService:
+    MAX_BATCH_IDS = 300
+    MAX_BULK_UNITS = 10000
+    MAX_IMAGES_PER_UNIT = 20
+    VERSION_CONFLICT = 'version_conflict'
+
     @staticmethod
     def get_all_units(floor_level: str = None, status: str = None) -> List[Dict[str, Any]]:
         """Get all units with optional filters"""
-        query = db.select(UnitModel)
+        query = db.select(UnitModel).where(UnitModel.live())
 
         if floor_level:
             query = query.filter(UnitModel.floor_level == floor_level)
@@ -32,7 +47,9 @@ class UnitService:
     def get_available_units() -> List[Dict[str, Any]]:
         """Get all available units (public view)"""
         units = db.session.execute(
-            db.select(UnitModel).filter_by(status=UnitStatus.VACANT)
+            db.select(UnitModel)
+            .where(UnitModel.live())
+            .filter_by(status=UnitStatus.VACANT)
         ).scalars().all()
         # No user_id for public view
         return [UnitService._serialize_unit(unit) for unit in units]
@@ -41,11 +58,11 @@ class UnitService:
     def get_user_units(user_id: int) -> Dict[str, List[Dict[str, Any]]]:
         """Get units owned and rented by a user"""
         owned_units = db.session.execute(
-            db.select(UnitModel).filter_by(user_id=user_id)
+            db.select(UnitModel).where(UnitModel.live()).filter_by(user_id=user_id)
         ).scalars().all()
 
         rented_units = db.session.execute(
-            db.select(UnitModel).filter_by(tenant_id=user_id)
+            db.select(UnitModel).where(UnitModel.live()).filter_by(tenant_id=user_id)
         ).scalars().all()
 
         return {
@@ -65,6 +82,10 @@ class UnitService:
             # Generate unit ID
             unit_id = UnitService._generate_unit_id(data['city'])
 
+            feature_types = [SecurityFeatureType[feature]
+                             for feature in data.get('security_features', [])]
+            premium = UnitService._features_premium(feature_types)
+
             # Create unit with all fields from schema
             new_unit = UnitModel(
                 unit_id=unit_id,
@@ -72,9 +93,11 @@ class UnitService:
                 country=data['country'],
                 city=data['city'],
                 address_link=data['address_link'],
-                status=data['status'],
+                status=UnitStatus[data['status']],
                 size_sqm=data['size_sqm'],
-                monthly_rate=data['monthly_rate'],
+                base_rate=data['monthly_rate'],
+                security_premium=premium,
+                monthly_rate=UnitModel.price(data['monthly_rate'], premium),
                 currency=data.get('currency', 'ZAR'),
                 climate_controlled=data.get('climate_controlled', False),
                 floor_level=data['floor_level'],
@@ -86,52 +109,308 @@ class UnitService:
             )
 
             # Add security features if provided
-            if 'security_features' in data:
-                features = []
-                for feature_type in data['security_features']:
-                    feature = SecurityFeatureModel(
-                        unit_id=unit_id,
-                        feature_type=SecurityFeatureType[feature_type],
-                        notes=f"Added during unit creation"
-                    )
-                    features.append(feature)
-                new_unit.security_features = features
-
-            # Calculate rate with security premium
-            base_rate = float(new_unit.monthly_rate)
-            premium = new_unit.calculate_security_premium()
-            new_unit.monthly_rate = round(base_rate * (1 + premium), 2)
+            new_unit.security_features = [
+                SecurityFeatureModel(
+                    unit_id=unit_id,
+                    feature_type=feature_type,
+                    notes=f"Added during unit creation"
+                ) for feature_type in feature_types
+            ]
 
             db.session.add(new_unit)
+            db.session.flush()
+
+            # Notify tenants whose saved searches this unit satisfies
+            SavedSearchService.match_unit(new_unit)
+
             db.session.commit()
+            UnitService._reindex_unit(new_unit)
 
             return UnitService._serialize_unit(new_unit)
 
         except IntegrityError as e:
             db.session.rollback()
+            if UnitService._is_duplicate_name_error(e):
+                return {"error": UnitService._duplicate_name_message(data['unit_name'], data['city'])}
             return {"error": f"Database integrity error: {str(e)}"}
         except Exception as e:
             db.session.rollback()
             return {"error": f"Failed to create unit: {str(e)}"}
 
     @staticmethod
-    def update_unit(unit_id: str, data: Dict[str, Any], user_id: int) -> Dict[str, Any]:
-        """Update an existing storage unit with ownership check"""
+    def bulk_create_units(units: List[Dict[str, Any]], user_id: int,
+                          errors: Optional[Dict[int, Any]] = None) -> Dict[str, Any]:
+        """
+        Create many units in a single transaction
+        Args:
+            units: Unit data loaded with UnitCreateSchema(many=True)
+            user_id: ID of the owner creating the units
+            errors: Schema errors keyed by row index; those rows are skipped
+        Returns:
+            Dict with created/failed counts and a result per row, in order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(units)
+        for index, error in (errors or {}).items():
+            results[index] = {"index": index, "error": str(error)}
+
+        # Validate rows and catch duplicates inside the batch
+        valid = []
+        seen_names = {}
+        for index, data in enumerate(units):
+            if results[index] is not None:
+                continue
+            data = {**data, 'user_id': user_id}
+            is_valid, error_message = UnitService._validate_unit_data(data)
+            if is_valid:
+                name_key = (data['unit_name'].lower(), data['city'].lower())
+                if name_key in seen_names:
+                    is_valid, error_message = False, (
+                        f"{UnitService._duplicate_name_message(data['unit_name'], data['city'])}"
+                        f" (row {seen_names[name_key]})")
+                else:
+                    seen_names[name_key] = index
+            if not is_valid:
+                results[index] = {"index": index, "error": error_message}
+                continue
+            valid.append((index, data))
+
+        # Catch duplicates of existing units with one probe per chunk
+        name_keys = list(seen_names)
+        for start in range(0, len(name_keys), 500):
+            existing = db.session.execute(
+                db.select(db.func.lower(UnitModel.unit_name), db.func.lower(UnitModel.city))
+                .where(
+                    db.tuple_(
+                        db.func.lower(UnitModel.unit_name), db.func.lower(UnitModel.city)
+                    ).in_(name_keys[start:start + 500]),
+                    UnitModel.live()
+                )
+            ).all()
+            for name_key in existing:
+                index = seen_names[tuple(name_key)]
+                results[index] = {
+                    "index": index,
+                    "error": UnitService._duplicate_name_message(
+                        units[index]['unit_name'], units[index]['city'])
+                }
+        valid = [(index, data)
+                 for index, data in valid if results[index] is None]
+
         try:
-            unit = db.session.execute(
-                db.select(UnitModel).filter_by(unit_id=unit_id)
-            ).scalar_one_or_none()
+            unit_ids = UnitService._allocate_unit_ids_for(
+                [data['city'] for _, data in valid])
+
+            now = datetime.utcnow()
+            unit_rows = []
+            feature_rows = []
+            for unit_id, (index, data) in zip(unit_ids, valid):
+                feature_types = [SecurityFeatureType[feature]
+                                 for feature in data.get('security_features', [])]
+                premium = UnitService._features_premium(feature_types)
+                unit_rows.append({
+                    'unit_id': unit_id,
+                    'unit_name': data['unit_name'],
+                    'country': data['country'],
+                    'city': data['city'],
+                    'address_link': data['address_link'],
+                    'status': UnitStatus[data['status']],
+                    'size_sqm': data['size_sqm'],
+                    'base_rate': data['monthly_rate'],
+                    'security_premium': premium,
+                    'monthly_rate': UnitModel.price(data['monthly_rate'], premium),
+                    'currency': data.get('currency', 'ZAR'),
+                    'climate_controlled': data.get('climate_controlled', False),
+                    'floor_level': data['floor_level'],
+                    'rental_duration_days': data['rental_duration_days'],
+                    'user_id': user_id,
+                    'tenant_id': None,
+                    'shared_user_emails': [],
+                    'images': data.get('images', []),
+                    'created_at': now,
+                    'updated_at': now
+                })
+                feature_rows.extend({
+                    'unit_id': unit_id,
+                    'feature_type': feature_type,
+                    'notes': "Added during bulk unit creation",
+                    'created_at': now,
+                    'updated_at': now
+                } for feature_type in feature_types)
+                results[index] = {"index": index, "unit_id": unit_id}
+
+            # executemany inserts; no per-row ORM objects or flushes
+            if unit_rows:
+                db.session.execute(db.insert(UnitModel), unit_rows)
+            if feature_rows:
+                db.session.execute(
+                    db.insert(SecurityFeatureModel), feature_rows)
+
+            SavedSearchService.match_units(
+                [row['unit_id'] for row in unit_rows])
 
-            if not unit:
-                return {"error": "Unit not found"}
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if UnitService._is_duplicate_name_error(e):
+                return {"error": "Another request created units with the same names, please retry"}
+            return {"error": f"Database integrity error: {str(e)}"}
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to create units: {str(e)}"}
 
-            # Check ownership
-            if unit.user_id != user_id:
-                return {"error": "Unauthorized - not the owner"}
+        if unit_rows:
+            UnitSimilarityService.invalidate()
+            UnitAutocompleteService.invalidate()
+
+        return {
+            "created": len(unit_rows),
+            "failed": len(units) - len(unit_rows),
+            "results": results
+        }
+
+    @staticmethod
+    def bulk_update_rates(city: str, user_id: int, value: float,
+                          change_type: str = 'percentage', dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Change the rates of all of an owner's units in a city with one UPDATE
+        Args:
+            city: City of the units (case-insensitive)
+            user_id: ID of the owner
+            value: Percentage (e.g. 5 for +5%) or absolute amount to apply
+            change_type: 'percentage' or 'absolute'
+            dry_run: Only report the impact, change nothing
+        Returns:
+            Dict with the affected count and the monthly revenue impact
+        """
+        if change_type not in ('percentage', 'absolute'):
+            return {"error": "change_type must be 'percentage' or 'absolute'"}
+
+        # Changes apply to the base rate; the security premium is kept
+        if change_type == 'percentage':
+            new_base = UnitModel.base_rate * (1 + value / 100.0)
+        else:
+            new_base = UnitModel.base_rate + value
+        new_base = db.func.round(db.cast(new_base, db.Numeric(12, 4)), 2)
+        new_rate = UnitModel.price_expr(new_base)
+
+        filters = (
+            db.func.lower(UnitModel.city) == city.strip().lower(),
+            UnitModel.user_id == user_id,
+            UnitModel.live()
+        )
+        occupied = UnitModel.status == UnitStatus.OCCUPIED
+
+        try:
+            impact = db.session.execute(
+                db.select(
+                    db.func.count(),
+                    db.func.sum(UnitModel.monthly_rate),
+                    db.func.sum(new_rate),
+                    db.func.min(new_base),
+                    db.func.sum(db.case(
+                        (occupied, UnitModel.monthly_rate), else_=0)),
+                    db.func.sum(db.case((occupied, new_rate), else_=0))
+                ).where(*filters)
+            ).one()
+            count, current_total, new_total, lowest_base, current_revenue, new_revenue = impact
+
+            if not count:
+                return {"error": f"No units found in {city}"}
+            if float(lowest_base) <= 0:
+                return {"error": "Rate change would make some monthly rates zero or negative"}
+
+            summary = {
+                'city': city,
+                'change_type': change_type,
+                'value': value,
+                'dry_run': dry_run,
+                'units': count,
+                'current_total_rate': round(float(current_total), 2),
+                'new_total_rate': round(float(new_total), 2),
+                'current_monthly_revenue': round(float(current_revenue), 2),
+                'new_monthly_revenue': round(float(new_revenue), 2),
+                'monthly_revenue_change': round(float(new_revenue) - float(current_revenue), 2)
+            }
+            if dry_run:
+                return summary
+
+            result = db.session.execute(
+                db.update(UnitModel)
+                .where(*filters)
+                .values(base_rate=new_base, monthly_rate=new_rate,
+                        version=UnitModel.version + 1,
+                        updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to update rates: {str(e)}"}
+
+        UnitSimilarityService.invalidate()
+        summary['updated_units'] = result.rowcount
+        return summary
+
+    @staticmethod
+    def rebuild_pricing() -> Dict[str, Any]:
+        """
+        Recompute every unit's security premium from its features and
+        derive its base rate from the monthly rate it is charged, in one
+        UPDATE. Legacy rows carry monthly_rate as their base rate although
+        it already includes the premium, so repricing from base_rate would
+        charge the premium twice; monthly rates are left unchanged.
+        Returns:
+            Dict with the number of units updated
+        """
+        try:
+            premium = UnitService._security_premium_expr()
+            result = db.session.execute(
+                db.update(UnitModel)
+                .values(
+                    security_premium=premium,
+                    base_rate=db.func.round(db.cast(
+                        UnitModel.monthly_rate / (1 + premium), db.Numeric(12, 4)), 2),
+                    version=UnitModel.version + 1
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to rebuild pricing: {str(e)}"}
+
+        UnitSimilarityService.invalidate()
+        return {"updated_units": result.rowcount}
+
+    @staticmethod
+    def update_unit(unit_id: str, data: Dict[str, Any], user_id: int,
+                    expected_version: Optional[int] = None,
+                    unit: Optional[UnitModel] = None) -> Dict[str, Any]:
+        """
+        Update an existing storage unit with ownership check
+        Args:
+            unit_id: ID of the unit to update
+            data: Fields loaded with UnitUpdateSchema
+            user_id: ID of the user making the request
+            expected_version: Version the client last read (If-Match);
+                the update is refused if the unit changed since
+            unit: The unit if the caller already loaded it
+        Returns:
+            Dict with updated unit data or error message
+        """
+        try:
+            unit, error = UnitService._owned_unit(unit_id, user_id, unit)
+            if error:
+                return error
+
+            if expected_version is not None and unit.version != expected_version:
+                return UnitService._version_conflict(unit.version)
+
+            was_vacant = unit.status == UnitStatus.VACANT
 
             # Update allowed fields from schema
             allowed_fields = [
-                'unit_name', 'status', 'monthly_rate', 'currency',
+                'unit_name', 'status', 'currency',
                 'climate_controlled', 'floor_level', 'rental_duration_days',
                 'tenant_id', 'shared_user_emails'
             ]
@@ -140,66 +419,123 @@ class UnitService:
                 if field in data:
                     setattr(unit, field, data[field])
 
+            # The submitted rate is the base rate, as on creation
+            if 'monthly_rate' in data:
+                unit.base_rate = data['monthly_rate']
+
             # Handle security features update
             if 'security_features' in data:
-                # Clear existing features
-                unit.security_features = []
-
-                # Add new features
-                for feature_type in data['security_features']:
-                    feature = SecurityFeatureModel(
+                feature_types = [SecurityFeatureType[feature_type]
+                                 for feature_type in set(data['security_features'])]
+
+                # Replace existing features without loading them
+                db.session.execute(
+                    db.delete(SecurityFeatureModel)
+                    .where(SecurityFeatureModel.unit_id == unit_id)
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.add_all([
+                    SecurityFeatureModel(
                         unit_id=unit_id,
-                        feature_type=SecurityFeatureType[feature_type],
+                        feature_type=feature_type,
                         notes=f"Updated on {datetime.utcnow().isoformat()}"
-                    )
-                    unit.security_features.append(feature)
+                    ) for feature_type in feature_types
+                ])
+                unit.security_premium = UnitService._features_premium(
+                    feature_types)
+
+            unit.reprice()
 
-                # Recalculate rate with new security premium
-                base_rate = float(unit.monthly_rate)
-                premium = unit.calculate_security_premium()
-                unit.monthly_rate = round(base_rate * (1 + premium), 2)
+            if not was_vacant and unit.status == UnitStatus.VACANT:
+                SavedSearchService.match_unit(unit)
 
             unit.updated_at = datetime.utcnow()
+            db.session.flush()
+            # Serialized before the commit expires the unit, so the
+            # response reuses what this request already loaded
+            result = UnitService._serialize_unit(unit)
+            UnitService._reindex_unit(unit)
             db.session.commit()
 
-            return UnitService._serialize_unit(unit)
+            return result
 
+        except StaleDataError:
+            # Another request committed between our read and our UPDATE
+            db.session.rollback()
+            return UnitService._version_conflict()
+        except IntegrityError as e:
+            db.session.rollback()
+            if UnitService._is_duplicate_name_error(e):
+                return {"error": UnitService._duplicate_name_message(data['unit_name'], unit.city)}
+            return {"error": f"Database integrity error: {str(e)}"}
         except Exception as e:
             db.session.rollback()
             return {"error": f"Failed to update unit: {str(e)}"}
 
     @staticmethod
-    def delete_unit(unit_id: str, user_id: int) -> Dict[str, Any]:
-        """Delete a storage unit"""
+    def delete_unit(unit_id: str, user_id: int, unit: Optional[UnitModel] = None) -> Dict[str, Any]:
+        """
+        Soft-delete a storage unit. The row stays, hidden from every live
+        query, until the archival job moves it to units_archive.
+        """
         try:
-            unit = db.session.execute(
-                db.select(UnitModel).filter_by(unit_id=unit_id)
-            ).scalar_one_or_none()
-
-            if not unit:
-                return {"error": "Unit not found"}
-
-            # Check ownership
-            if unit.user_id != user_id:
-                return {"error": "Unauthorized - not the owner"}
+            unit, error = UnitService._owned_unit(unit_id, user_id, unit)
+            if error:
+                return error
 
             # Check if unit can be deleted
             if unit.status != UnitStatus.VACANT:
                 return {"error": "Cannot delete occupied or reserved unit"}
 
-            db.session.delete(unit)
+            # A vacant unit may still be booked for later
+            booked = db.session.execute(db.select(
+                db.select(RentalModel.id).where(
+                    RentalModel.unit_id == unit.unit_id,
+                    RentalModel.status == 'active',
+                    RentalModel.end_date > datetime.utcnow()
+                ).exists()
+            )).scalar()
+            if booked:
+                return {"error": "Cannot delete unit with upcoming bookings"}
+
+            unit.deleted_at = datetime.utcnow()
             db.session.commit()
+            UnitSimilarityService.remove_unit(unit_id)
+            UnitAutocompleteService.remove_unit(unit_id)
 
             return {"message": "Unit deleted successfully"}
         except Exception as e:
             db.session.rollback()
             return {"error": f"Failed to delete unit: {str(e)}"}
 
+    @staticmethod
+    def get_unit_for_write(unit_id: str) -> Optional[UnitModel]:
+        """
+        Load a unit entity by primary key for a write, without serializing
+        it or eager loading its images. Served from the identity map if the
+        unit is already in the session.
+        """
+        unit = db.session.get(
+            UnitModel, unit_id, options=[db.lazyload(UnitModel.uploaded_images)])
+        return unit if unit and unit.deleted_at is None else None
+
+    @staticmethod
+    def _owned_unit(unit_id: str, user_id: int,
+                    unit: Optional[UnitModel] = None) -> tuple[Optional[UnitModel], Optional[Dict[str, Any]]]:
+        """Return the unit to write to and check ownership, reusing a preloaded unit"""
+        if unit is None:
+            unit = UnitService.get_unit_for_write(unit_id)
+        if not unit:
+            return None, {"error": "Unit not found"}
+        if str(unit.user_id) != str(user_id):
+            return None, {"error": "Unauthorized - not the owner"}
+        return unit, None
+
     @staticmethod
     def get_unit_by_id(unit_id: str, current_user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Get a single unit by ID"""
         unit = db.session.execute(
-            db.select(UnitModel).filter_by(unit_id=unit_id)
+            db.select(UnitModel).where(UnitModel.live()).filter_by(unit_id=unit_id)
         ).scalar_one_or_none()
 
         if not unit:
@@ -207,6 +543,52 @@ class UnitService:
 
         return UnitService._serialize_unit(unit, current_user_id)
 
+    @staticmethod
+    def get_similar_units(unit_id: str, limit: int = 5, vacant_only: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Get the units most similar to a unit, most similar first"""
+        nearest = UnitSimilarityService.nearest_units(
+            unit_id, limit, vacant_only)
+        if nearest is None:
+            return None
+        if not nearest:
+            return []
+
+        distances = dict(nearest)
+        similar = UnitService.get_units_by_ids(list(distances))['units']
+        for serialized in similar:
+            serialized['similarity_distance'] = round(
+                distances[serialized['unit_id']], 4)
+        return similar
+
+    @staticmethod
+    def get_units_by_ids(unit_ids: List[str], current_user_id: Optional[int] = None) -> Dict[str, List[Any]]:
+        """
+        Get many units in a single round trip
+        Args:
+            unit_ids: IDs to fetch, at most MAX_BATCH_IDS
+            current_user_id: ID of the requesting user (None for public view)
+        Returns:
+            Dict with the found units in request order and the missing ids
+        """
+        unit_ids = list(dict.fromkeys(unit_ids))
+        units = db.session.execute(
+            db.select(UnitModel)
+            .filter(UnitModel.unit_id.in_(unit_ids), UnitModel.live())
+            .options(
+                db.selectinload(UnitModel.security_features),
+                db.joinedload(UnitModel.owner),
+                db.joinedload(UnitModel.tenant)
+            )
+        ).unique().scalars().all()
+        units_by_id = {unit.unit_id: unit for unit in units}
+
+        ordered = [units_by_id[unit_id]
+                   for unit_id in unit_ids if unit_id in units_by_id]
+        return {
+            'units': UnitService._serialize_units(ordered, current_user_id),
+            'missing': [unit_id for unit_id in unit_ids if unit_id not in units_by_id]
+        }
+
     @staticmethod
     def search_units(
         city: str = None,
@@ -217,9 +599,11 @@ class UnitService:
         features: List[str] = None,
         floor_level: str = None,
         status: str = None,
+        available_from: date = None,
+        available_to: date = None,
     ) -> List[Dict[str, Any]]:
         """Search units with filters"""
-        query = db.select(UnitModel)
+        query = db.select(UnitModel).where(UnitModel.live())
 
         if city:
             query = query.filter(UnitModel.city.like(f"%{city.lower()}%"))
@@ -242,29 +626,62 @@ class UnitService:
                     SecurityFeatureModel.feature_type == SecurityFeatureType[feature.upper(
                     )]
                 )
+        if available_from and available_to:
+            # Anti-join: drop units with a booking overlapping the window
+            query = query.filter(
+                ~UnitService._overlapping_rentals(
+                    available_from, available_to).exists()
+            )
 
         units = db.session.execute(query).scalars().all()
         return [UnitService._serialize_unit(unit) for unit in units]
 
+    @staticmethod
+    def _overlapping_rentals(available_from: date, available_to: date):
+        """
+        Correlated select of active or future rentals of a unit that overlap
+        the inclusive date window [available_from, available_to]
+        """
+        window_start = datetime.combine(available_from, time.min)
+        window_end = datetime.combine(
+            available_to + timedelta(days=1), time.min)
+
+        if dialect_name() == 'postgresql':
+            # Served by the gist index behind ex_rentals_unit_period
+            overlaps = db.func.tsrange(
+                RentalModel.start_date, RentalModel.end_date
+            ).op('&&')(db.func.tsrange(window_start, window_end))
+        else:
+            overlaps = db.and_(
+                RentalModel.start_date < window_end,
+                RentalModel.end_date > window_start
+            )
+
+        return db.select(RentalModel.id).where(
+            RentalModel.unit_id == UnitModel.unit_id,
+            RentalModel.status == 'active',
+            overlaps
+        )
+
     @staticmethod
     def get_unit_statistics() -> Dict[str, Any]:
         """Get statistics about units"""
         stats = {
-            'total_units': db.session.query(UnitModel).count(),
-            'vacant_units': db.session.query(UnitModel)
+            'total_units': db.session.query(UnitModel).filter(UnitModel.live()).count(),
+            'vacant_units': db.session.query(UnitModel).filter(UnitModel.live())
             .filter_by(status=UnitStatus.VACANT).count(),
-            'occupied_units': db.session.query(UnitModel)
+            'occupied_units': db.session.query(UnitModel).filter(UnitModel.live())
             .filter_by(status=UnitStatus.OCCUPIED).count(),
             'average_rate': float(
-                db.session.query(db.func.avg(UnitModel.monthly_rate))
+                db.session.query(db.func.avg(UnitModel.monthly_rate)).filter(UnitModel.live())
                 .scalar() or 0
             ),
             'total_area': float(
-                db.session.query(db.func.sum(UnitModel.size_sqm))
+                db.session.query(db.func.sum(UnitModel.size_sqm)).filter(UnitModel.live())
                 .scalar() or 0
             ),
             'cities': [
-                city[0] for city in db.session.query(UnitModel.city)
+                city[0] for city in db.session.query(UnitModel.city).filter(UnitModel.live())
                 .distinct()
                 .order_by(UnitModel.city)
                 .all()
@@ -274,7 +691,7 @@ class UnitService:
         # Add more detailed statistics
         stats.update({
             'average_size': float(
-                db.session.query(db.func.avg(UnitModel.size_sqm))
+                db.session.query(db.func.avg(UnitModel.size_sqm)).filter(UnitModel.live())
                 .scalar() or 0
             ),
             'occupancy_rate': round(
@@ -283,7 +700,7 @@ class UnitService:
                 2
             ),
             'total_revenue': float(
-                db.session.query(db.func.sum(UnitModel.monthly_rate))
+                db.session.query(db.func.sum(UnitModel.monthly_rate)).filter(UnitModel.live())
                 .filter_by(status=UnitStatus.OCCUPIED)
                 .scalar() or 0
             )
@@ -292,7 +709,8 @@ class UnitService:
         return stats
 
     @staticmethod
-    def _serialize_unit(unit: UnitModel, current_user_id: Optional[int] = None) -> Dict[str, Any]:
+    def _serialize_unit(unit: UnitModel, current_user_id: Optional[int] = None,
+                        active_rental: Optional[RentalModel] = _NOT_LOADED) -> Dict[str, Any]:
         """Convert unit model to dictionary with privacy controls"""
         # Base serialization
         serialized = {
@@ -304,10 +722,13 @@ class UnitService:
             'status': unit.status.value,
             'size_sqm': unit.size_sqm,
             'monthly_rate': float(unit.monthly_rate),
+            'base_rate': float(unit.base_rate),
+            'security_premium': float(unit.security_premium),
             'currency': unit.currency,
             'climate_controlled': unit.climate_controlled,
             'floor_level': unit.floor_level,
             'rental_duration_days': unit.rental_duration_days,
+            'version': unit.version,
             'created_at': unit.created_at.isoformat() if unit.created_at else None,
             'updated_at': unit.updated_at.isoformat() if unit.updated_at else None,
             'security_features': [
@@ -316,8 +737,21 @@ class UnitService:
                     'notes': feature.notes
                 } for feature in unit.security_features
             ],
-            'images': unit.images
+            'images': unit.images,
+            'uploaded_images': [
+                {
+                    'id': image.id,
+                    'width': image.width,
+                    'height': image.height,
+                    **ImageStorageService.urls(image.content_hash)
+                } for image in unit.uploaded_images
+            ]
         }
+        # List pages only need the first image, at thumbnail size
+        serialized['thumbnail_url'] = (
+            serialized['uploaded_images'][0]['thumbnail']
+            if serialized['uploaded_images'] else None
+        )
 
         # Add owner info
         if unit.owner:
@@ -327,10 +761,11 @@ class UnitService:
             }
 
         # Get active rental for this unit and its shared users
-        active_rental = db.session.query(RentalModel).filter(
-            RentalModel.unit_id == unit.unit_id,
-            RentalModel.status == 'active'
-        ).first()
+        if active_rental is _NOT_LOADED:
+            active_rental = db.session.query(RentalModel).filter(
+                RentalModel.unit_id == unit.unit_id,
+                RentalModel.status == 'active'
+            ).first()
 
         # Check if current user is authorized (owner, tenant, or shared user)
         is_authorized = False
@@ -340,12 +775,11 @@ class UnitService:
                 str(current_user_id) == str(unit.tenant_id)    # Is tenant
             )
 
-            # Check if user is in shared_user_emails
+            # Check if the active rental was shared with the user
             if active_rental and not is_authorized:
-                shared_users = json.loads(
-                    active_rental.shared_user_emails or '[]')
-                user = db.session.query(UserModel).get(current_user_id)
-                is_authorized = user and user.email in shared_users
+                is_authorized = any(
+                    str(current_user_id) == str(user.id)
+                    for user in active_rental.shared_users)
 
         if is_authorized:
             if unit.tenant:
@@ -357,15 +791,78 @@ class UnitService:
                 serialized['tenant_id'] = unit.tenant_id
 
                 if active_rental:
-                    serialized['shared_user_emails'] = json.loads(
-                        active_rental.shared_user_emails or '[]'
-                    )
+                    serialized['shared_user_emails'] = [
+                        user.email for user in active_rental.shared_users]
         else:
             # For public view, just show if unit is occupied
             serialized['is_occupied'] = bool(unit.tenant_id)
 
         return serialized
 
+    @staticmethod
+    def _serialize_units(units: List[UnitModel], current_user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Serialize many units, loading their active rentals in one query"""
+        active_rentals = {}
+        if units:
+            rentals = db.session.execute(
+                db.select(RentalModel).filter(
+                    RentalModel.unit_id.in_([unit.unit_id for unit in units]),
+                    RentalModel.status == 'active'
+                ).options(db.selectinload(RentalModel.shared_users))
+            ).scalars().all()
+            for rental in rentals:
+                active_rentals.setdefault(rental.unit_id, rental)
+
+        return [
+            UnitService._serialize_unit(
+                unit, current_user_id, active_rentals.get(unit.unit_id))
+            for unit in units
+        ]
+
+    @staticmethod
+    def _reindex_unit(unit: UnitModel) -> None:
+        """Refresh the in-memory indexes after a unit was written"""
+        UnitSimilarityService.upsert_unit(unit)
+        UnitAutocompleteService.upsert_unit(unit)
+
+    @staticmethod
+    def _features_premium(feature_types: List[SecurityFeatureType]) -> float:
+        """Total rate premium of a set of security features"""
+        return round(sum(SecurityFeatureModel.get_feature_premium(feature_type)
+                         for feature_type in feature_types), 4)
+
+    @staticmethod
+    def _security_premium_expr():
+        """Correlated SQL expression for a unit's security premium"""
+        return (
+            db.select(db.func.coalesce(db.func.sum(db.case(
+                (SecurityFeatureModel.feature_type.in_(
+                    SecurityFeatureModel.get_premium_features()), 0.15),
+                (SecurityFeatureModel.feature_type.in_(
+                    SecurityFeatureModel.get_standard_features()), 0.10),
+                else_=0.0
+            )), 0.0))
+            .where(SecurityFeatureModel.unit_id == UnitModel.unit_id)
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def _is_duplicate_name_error(error: IntegrityError) -> bool:
+        """Whether an IntegrityError comes from the name/city unique index"""
+        return 'uq_units_name_city' in str(error.orig)
+
+    @staticmethod
+    def _version_conflict(current_version: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "error": "Unit was modified by another request, reload it and retry",
+            "code": UnitService.VERSION_CONFLICT,
+            "current_version": current_version
+        }
+
+    @staticmethod
+    def _duplicate_name_message(unit_name: str, city: str) -> str:
+        return f"Unit with name '{unit_name}' already exists in {city}"
+
     @staticmethod
     def _validate_unit_data(data: Dict[str, Any]) -> tuple[bool, str]:
         """Validate unit data before creation/update"""
@@ -378,19 +875,6 @@ class UnitService:
             if field not in data:
                 return False, f"Missing required field: {field}"
 
-        # Check for existing unit with same location and name first
-        existing_unit = db.session.execute(
-            db.select(UnitModel)
-            .filter(
-                db.func.lower(
-                    UnitModel.unit_name) == data['unit_name'].lower(),
-                db.func.lower(UnitModel.city) == data['city'].lower()
-            )
-        ).scalar_one_or_none()
-
-        if existing_unit:
-            return False, f"Unit with name '{data['unit_name']}' already exists in {data['city']}"
-
         # Case-insensitive status validation
         try:
             valid_statuses = [status.name.lower() for status in UnitStatus]
@@ -452,31 +936,31 @@ class UnitService:
         return True, ""
 
     @staticmethod
-    def add_security_features(unit_id: str, features: List[str], user_id: int) -> Dict[str, Any]:
+    def add_security_features(unit_id: str, features: List[str], user_id: int,
+                              unit: Optional[UnitModel] = None) -> Dict[str, Any]:
         """
         Add security features to a unit
         Args:
             unit_id: ID of the unit to update
             features: List of security feature types to add
             user_id: ID of the user making the request
+            unit: The unit if the caller already loaded it
         Returns:
             Dict with updated unit data or error message
         """
         try:
             # Get unit and verify ownership
-            unit = db.session.execute(
-                db.select(UnitModel).filter_by(unit_id=unit_id)
-            ).scalar_one_or_none()
-
-            if not unit:
-                return {"error": "Unit not found"}
+            unit, error = UnitService._owned_unit(unit_id, user_id, unit)
+            if error:
+                return error
 
-            if unit.user_id != user_id:
-                return {"error": "Unauthorized - not the owner"}
-
-            # Get existing features
+            # Get existing feature types
             existing_features = {
-                feature.feature_type.name for feature in unit.security_features}
+                feature_type.name for feature_type in db.session.execute(
+                    db.select(SecurityFeatureModel.feature_type)
+                    .filter_by(unit_id=unit_id)
+                ).scalars()
+            }
 
             # Validate and check for duplicates
             new_features = []
@@ -490,61 +974,63 @@ class UnitService:
                     if feature_upper in existing_features:
                         return {"error": f"Security feature '{feature}' already exists for this unit"}
 
-                    new_features.append(feature_upper)
+                    if feature_upper not in new_features:
+                        new_features.append(feature_upper)
                 except KeyError:
                     return {"error": f"Invalid security feature: {feature}"}
 
             # Add new features
-            for feature_type in new_features:
-                feature = SecurityFeatureModel(
+            feature_types = [SecurityFeatureType[feature_type]
+                             for feature_type in new_features]
+            db.session.add_all([
+                SecurityFeatureModel(
                     unit_id=unit_id,
-                    feature_type=SecurityFeatureType[feature_type],
+                    feature_type=feature_type,
                     notes=f"Added on {datetime.utcnow().isoformat()}"
-                )
-                unit.security_features.append(feature)
+                ) for feature_type in feature_types
+            ])
 
-            # Recalculate monthly rate with new security premium
-            base_rate = float(unit.monthly_rate) / \
-                (1 + unit.calculate_security_premium())
-            new_premium = unit.calculate_security_premium()
-            unit.monthly_rate = round(base_rate * (1 + new_premium), 2)
+            # Shift the premium by the added features only
+            unit.apply_security_premium(
+                UnitService._features_premium(feature_types))
 
             unit.updated_at = datetime.utcnow()
+            db.session.flush()
+            result = UnitService._serialize_unit(unit)
+            UnitService._reindex_unit(unit)
             db.session.commit()
 
-            return UnitService._serialize_unit(unit)
+            return result
 
         except Exception as e:
             db.session.rollback()
             return {"error": f"Failed to add security features: {str(e)}"}
 
     @staticmethod
-    def remove_security_features(unit_id: str, features: List[str], user_id: int) -> Dict[str, Any]:
+    def remove_security_features(unit_id: str, features: List[str], user_id: int,
+                                 unit: Optional[UnitModel] = None) -> Dict[str, Any]:
         """
         Remove security features from a unit
         Args:
             unit_id: ID of the unit to update
             features: List of security feature types to remove
             user_id: ID of the user making the request
+            unit: The unit if the caller already loaded it
         Returns:
             Dict with updated unit data or error message
         """
         try:
             # Get unit and verify ownership
-            unit = db.session.execute(
-                db.select(UnitModel).filter_by(unit_id=unit_id)
-            ).scalar_one_or_none()
-
-            if not unit:
-                return {"error": "Unit not found"}
-
-            if int(unit.user_id) != user_id:
-                return {"error": "Unauthorized - not the owner"}
+            unit, error = UnitService._owned_unit(unit_id, user_id, unit)
+            if error:
+                return error
 
-            # Get existing features
+            # Get existing feature types
             existing_features = {
-                feature.feature_type.name: feature
-                for feature in unit.security_features
+                feature_type.name for feature_type in db.session.execute(
+                    db.select(SecurityFeatureModel.feature_type)
+                    .filter_by(unit_id=unit_id)
+                ).scalars()
             }
 
             # Validate features to remove
@@ -562,25 +1048,33 @@ class UnitService:
                     if feature_upper == 'BASIC':
                         return {"error": "Cannot remove BASIC security feature"}
 
-                    features_to_remove.append(existing_features[feature_upper])
+                    feature_type = SecurityFeatureType[feature_upper]
+                    if feature_type not in features_to_remove:
+                        features_to_remove.append(feature_type)
                 except KeyError:
                     return {"error": f"Invalid security feature: {feature}"}
 
             # Remove features
-            for feature in features_to_remove:
-                db.session.delete(feature)
-                unit.security_features.remove(feature)
+            db.session.execute(
+                db.delete(SecurityFeatureModel)
+                .where(
+                    SecurityFeatureModel.unit_id == unit_id,
+                    SecurityFeatureModel.feature_type.in_(features_to_remove)
+                )
+                .execution_options(synchronize_session=False)
+            )
 
-            # Recalculate monthly rate with new security premium
-            base_rate = float(unit.monthly_rate) / \
-                (1 + unit.calculate_security_premium())
-            new_premium = unit.calculate_security_premium()
-            unit.monthly_rate = round(base_rate * (1 + new_premium), 2)
+            # Shift the premium by the removed features only
+            unit.apply_security_premium(
+                -UnitService._features_premium(features_to_remove))
 
             unit.updated_at = datetime.utcnow()
+            db.session.flush()
+            result = UnitService._serialize_unit(unit)
+            UnitService._reindex_unit(unit)
             db.session.commit()
 
-            return UnitService._serialize_unit(unit)
+            return result
 
         except Exception as e:
             db.session.rollback()
@@ -606,6 +1100,80 @@ class UnitService:
             db.session.rollback()
             return {"error": f"Failed to add images: {str(e)}"}
 
+    @staticmethod
+    def upload_unit_images(unit_id: str, uploads: List[bytes], user_id: int,
+                           unit: Optional[UnitModel] = None) -> Dict[str, Any]:
+        """
+        Store uploaded image files for a unit
+        Args:
+            unit_id: ID of the unit
+            uploads: Raw content of each uploaded file
+            user_id: ID of the user making the request
+            unit: The unit if the caller already loaded it
+        Returns:
+            Dict with updated unit data or error message
+        """
+        written = []
+        try:
+            unit, error = UnitService._owned_unit(unit_id, user_id, unit)
+            if error:
+                return error
+
+            known = {image.content_hash for image in unit.uploaded_images}
+            stored = []
+            originals = []
+            for data in uploads:
+                result = ImageStorageService.inspect(data)
+                if "error" in result:
+                    return result
+                # The same file uploaded twice is kept once
+                if result['content_hash'] not in known:
+                    known.add(result['content_hash'])
+                    stored.append(result)
+                    originals.append(data)
+
+            if len(unit.uploaded_images) + len(stored) > UnitService.MAX_IMAGES_PER_UNIT:
+                return {"error": f"A unit cannot have more than {UnitService.MAX_IMAGES_PER_UNIT} images"}
+
+            # Files are only written once the whole upload is accepted;
+            # those written here are removed again if it fails after all
+            for image, data in zip(stored, originals):
+                if ImageStorageService.store(image['content_hash'], data):
+                    written.append(image['content_hash'])
+
+            # Thumbnails are rendered in the background; until then the
+            # variant URLs serve the original. Without a worker pool they
+            # render inline, which is where undecodable files surface
+            for image in stored:
+                result = ImageStorageService.schedule_variants(
+                    image['content_hash'])
+                if result:
+                    for content_hash in written:
+                        ImageStorageService.discard(content_hash)
+                    return result
+
+            unit.uploaded_images.extend(
+                UnitImageModel(**image) for image in stored)
+            db.session.flush()
+            result = UnitService._serialize_unit(unit)
+            db.session.commit()
+
+            return result
+        except Exception as e:
+            db.session.rollback()
+            for content_hash in written:
+                ImageStorageService.discard(content_hash)
+            return {"error": f"Failed to upload images: {str(e)}"}
+
+    @staticmethod
+    def get_image_content_type(content_hash: str) -> Optional[str]:
+        """Content type of an uploaded image, None if no unit uses it"""
+        return db.session.execute(
+            db.select(UnitImageModel.content_type)
+            .filter_by(content_hash=content_hash)
+            .limit(1)
+        ).scalar()
+
     @staticmethod
     def remove_unit_image(unit_id: str, image_url: str) -> Dict[str, Any]:
         """Remove an image from a unit"""
@@ -629,27 +1197,80 @@ class UnitService:
     @staticmethod
     def _generate_unit_id(city: str) -> str:
         """Generate a unique unit ID based on city and sequential number"""
-        # Get current year
+        return UnitService._allocate_unit_ids(city, 1)[0]
+
+    @staticmethod
+    def _allocate_unit_ids_for(cities: List[str]) -> List[str]:
+        """Allocate one ID per entry, with one counter bump per city prefix"""
+        by_prefix: Dict[str, List[int]] = {}
+        for position, city in enumerate(cities):
+            by_prefix.setdefault(city[:3].upper(), []).append(position)
+
+        unit_ids: List[Optional[str]] = [None] * len(cities)
+        for positions in by_prefix.values():
+            allocated = UnitService._allocate_unit_ids(
+                cities[positions[0]], len(positions))
+            for position, unit_id in zip(positions, allocated):
+                unit_ids[position] = unit_id
+        return unit_ids
+
+    @staticmethod
+    def _allocate_unit_ids(city: str, count: int) -> List[str]:
+        """
+        Reserve `count` consecutive unit IDs for a city in the current year.
+        The counter row in unit_id_sequences is bumped with a single
+        UPDATE ... RETURNING, so concurrent creates serialize on that row
+        (on SQLite the statement opens the write transaction itself) and
+        never see the same number. The first allocation for a prefix and
+        year seeds the counter from any IDs already present.
+        Args:
+            city: City the units are located in
+            count: Number of IDs to reserve
+        Returns:
+            List of IDs, e.g. CPT-2024-0001
+        """
         current_year = datetime.now().year
 
         # Get city prefix (first 3 letters uppercase)
         city_prefix = city[:3].upper()
 
-        # Get the last unit number for this city and year
-        last_unit = db.session.execute(
-            db.select(UnitModel)
-            .filter(
-                UnitModel.unit_id.like(f"{city_prefix}-{current_year}-%")
+        last_value = db.session.execute(
+            db.update(UnitIdSequenceModel)
+            .where(
+                UnitIdSequenceModel.city_prefix == city_prefix,
+                UnitIdSequenceModel.year == current_year
             )
-            .order_by(UnitModel.unit_id.desc())
+            .values(last_value=UnitIdSequenceModel.last_value + count)
+            .returning(UnitIdSequenceModel.last_value)
         ).scalar_one_or_none()
 
-        # Get next sequence number
-        if last_unit:
-            last_seq = int(last_unit.unit_id.split('-')[-1])
-            next_seq = last_seq + 1
-        else:
-            next_seq = 1
+        if last_value is None:
+            id_prefix = f"{city_prefix}-{current_year}-"
+            existing_max = (
+                db.select(db.func.coalesce(db.func.max(
+                    db.cast(db.func.substr(UnitModel.unit_id,
+                            len(id_prefix) + 1), db.Integer)
+                ), 0))
+                .where(UnitModel.unit_id.like(f"{id_prefix}%"))
+                .scalar_subquery()
+            )
+            insert = postgresql.insert if dialect_name() == 'postgresql' else sqlite.insert
+            last_value = db.session.execute(
+                insert(UnitIdSequenceModel)
+                .values(
+                    city_prefix=city_prefix,
+                    year=current_year,
+                    last_value=existing_max + count
+                )
+                .on_conflict_do_update(
+                    index_elements=['city_prefix', 'year'],
+                    set_={'last_value': UnitIdSequenceModel.last_value + count}
+                )
+                .returning(UnitIdSequenceModel.last_value)
+            ).scalar_one()
 
         # Format: CPT-2024-0001
-        return f"{city_prefix}-{current_year}-{next_seq:04d}"
+        return [
+            f"{city_prefix}-{current_year}-{seq:04d}"
+            for seq in range(last_value - count + 1, last_value + 1)
+        ]
@@ -0,0 +1,237 @@
+import threading
+import time
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+from flask import current_app
+from app.models.base import db
+from app.models.unit import UnitModel
+from app.models.enums import UnitStatus
+from app.models.securityFeature import SecurityFeatureModel, SecurityFeatureType
+
+
+FEATURE_TYPES = list(SecurityFeatureType)
+
+# Relative importance of each attribute in the distance
+SIZE_WEIGHT = 1.0
+RATE_WEIGHT = 1.0
+CLIMATE_WEIGHT = 0.5
+FEATURE_WEIGHT = 0.25
+FLOOR_WEIGHT = 0.5
+CITY_WEIGHT = 2.0
+
+
+class _UnitFeatureMatrix:
+    """
+    In-memory feature matrix of all units, one row per unit.
+    Size and rate are kept raw and min-max normalised at query time, so
+    inserting an outlier never forces a rebuild. City and floor are
+    stored as integer codes and compared for equality, which keeps the
+    row width fixed as new cities appear.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.unit_ids: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.free_rows: List[int] = []
+        self.city_codes: Dict[str, int] = {}
+        self.floor_codes: Dict[str, int] = {}
+        self.numeric = np.zeros((capacity, 2))
+        self.binary = np.zeros((capacity, 1 + len(FEATURE_TYPES)))
+        self.city = np.full(capacity, -1, dtype=np.int32)
+        self.floor = np.full(capacity, -1, dtype=np.int32)
+        self.vacant = np.zeros(capacity, dtype=bool)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.built_at = time.monotonic()
+
+    def _grow(self):
+        capacity = self.numeric.shape[0] * 2
+        for name in ('numeric', 'binary', 'city', 'floor', 'vacant', 'live'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    @staticmethod
+    def _code(codes: Dict[str, int], value: str) -> int:
+        key = (value or '').strip().lower()
+        return codes.setdefault(key, len(codes))
+
+    def upsert(self, unit_id: str, size: float, rate: float, climate: bool,
+               floor_level: str, city: str, vacant: bool,
+               features: List[SecurityFeatureType]):
+        row = self.rows.get(unit_id)
+        if row is None:
+            if self.free_rows:
+                row = self.free_rows.pop()
+                self.unit_ids[row] = unit_id
+            else:
+                row = len(self.unit_ids)
+                if row == self.numeric.shape[0]:
+                    self._grow()
+                self.unit_ids.append(unit_id)
+            self.rows[unit_id] = row
+
+        self.numeric[row] = (size, rate)
+        self.binary[row] = 0
+        self.binary[row, 0] = 1.0 if climate else 0.0
+        for feature in features:
+            self.binary[row, 1 + FEATURE_TYPES.index(feature)] = 1.0
+        self.city[row] = self._code(self.city_codes, city)
+        self.floor[row] = self._code(self.floor_codes, floor_level)
+        self.vacant[row] = vacant
+        self.live[row] = True
+
+    def remove(self, unit_id: str):
+        row = self.rows.pop(unit_id, None)
+        if row is not None:
+            self.live[row] = False
+            self.unit_ids[row] = None
+            self.free_rows.append(row)
+
+    def nearest(self, unit_id: str, k: int, vacant_only: bool) -> List[Tuple[str, float]]:
+        row = self.rows[unit_id]
+        n = len(self.unit_ids)
+        live = self.live[:n]
+
+        candidates = live.copy()
+        candidates[row] = False
+        if vacant_only:
+            candidates &= self.vacant[:n]
+        candidates = np.flatnonzero(candidates)
+        if candidates.size == 0:
+            return []
+
+        numeric = self.numeric[:n][live]
+        span = numeric.max(axis=0) - numeric.min(axis=0)
+        span[span == 0] = 1.0
+
+        scaled = (self.numeric[candidates] - self.numeric[row]) / span
+        distances = (scaled ** 2 @ np.array([SIZE_WEIGHT, RATE_WEIGHT]))
+        weights = np.full(self.binary.shape[1], FEATURE_WEIGHT)
+        weights[0] = CLIMATE_WEIGHT
+        distances += (self.binary[candidates] - self.binary[row]) ** 2 @ weights
+        distances += CITY_WEIGHT * (self.city[candidates] != self.city[row])
+        distances += FLOOR_WEIGHT * (self.floor[candidates] != self.floor[row])
+
+        k = min(k, candidates.size)
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top], kind='stable')]
+        return [(self.unit_ids[candidates[i]], float(distances[i])) for i in top]
+
+
+class UnitSimilarityService:
+    # Rebuild from the database periodically so that writes handled by
+    # other worker processes are eventually picked up
+    REFRESH_SECONDS = 300
+    EXTENSION_KEY = 'unit_similarity_index'
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def nearest_units(unit_id: str, limit: int = 5, vacant_only: bool = False) -> Optional[List[Tuple[str, float]]]:
+        """
+        Find the units closest to a unit in the feature matrix
+        Args:
+            unit_id: ID of the reference unit
+            limit: Number of neighbours to return
+            vacant_only: Only consider units that can be rented now
+        Returns:
+            List of (unit_id, distance), closest first, or None if the
+            unit does not exist
+        """
+        with UnitSimilarityService._lock:
+            matrix = UnitSimilarityService._get_matrix()
+            if unit_id not in matrix.rows:
+                # Possibly created by another worker since the last rebuild
+                unit = db.session.get(UnitModel, unit_id)
+                if not unit or unit.deleted_at is not None:
+                    return None
+                UnitSimilarityService._upsert(matrix, unit)
+            return matrix.nearest(unit_id, limit, vacant_only)
+
+    @staticmethod
+    def upsert_unit(unit: UnitModel):
+        """Refresh a unit's row after it was created or changed"""
+        with UnitSimilarityService._lock:
+            matrix = current_app.extensions.get(
+                UnitSimilarityService.EXTENSION_KEY)
+            if matrix is not None:
+                UnitSimilarityService._upsert(matrix, unit)
+
+    @staticmethod
+    def remove_unit(unit_id: str):
+        """Drop a deleted unit from the matrix"""
+        with UnitSimilarityService._lock:
+            matrix = current_app.extensions.get(
+                UnitSimilarityService.EXTENSION_KEY)
+            if matrix is not None:
+                matrix.remove(unit_id)
+
+    @staticmethod
+    def invalidate():
+        """Discard the matrix so the next query rebuilds it, after bulk writes"""
+        with UnitSimilarityService._lock:
+            current_app.extensions.pop(
+                UnitSimilarityService.EXTENSION_KEY, None)
+
+    @staticmethod
+    def _upsert(matrix: _UnitFeatureMatrix, unit: UnitModel):
+        matrix.upsert(
+            unit_id=unit.unit_id,
+            size=float(unit.size_sqm),
+            rate=float(unit.monthly_rate),
+            climate=bool(unit.climate_controlled),
+            floor_level=unit.floor_level,
+            city=unit.city,
+            vacant=unit.status == UnitStatus.VACANT,
+            features=[feature.feature_type for feature in unit.security_features]
+        )
+
+    @staticmethod
+    def _get_matrix() -> _UnitFeatureMatrix:
+        """Return the app's matrix, building it if missing or stale"""
+        matrix = current_app.extensions.get(
+            UnitSimilarityService.EXTENSION_KEY)
+        if matrix is None or time.monotonic() - matrix.built_at > UnitSimilarityService.REFRESH_SECONDS:
+            matrix = UnitSimilarityService._build_matrix()
+            current_app.extensions[UnitSimilarityService.EXTENSION_KEY] = matrix
+        return matrix
+
+    @staticmethod
+    def _build_matrix() -> _UnitFeatureMatrix:
+        """Build the matrix with two column-only queries over live units"""
+        rows = db.session.execute(
+            db.select(
+                UnitModel.unit_id,
+                UnitModel.size_sqm,
+                UnitModel.monthly_rate,
+                UnitModel.climate_controlled,
+                UnitModel.floor_level,
+                UnitModel.city,
+                UnitModel.status
+            ).where(UnitModel.live())
+        ).all()
+
+        features: Dict[str, List[SecurityFeatureType]] = {}
+        for unit_id, feature_type in db.session.execute(
+            db.select(SecurityFeatureModel.unit_id,
+                      SecurityFeatureModel.feature_type)
+            .join(UnitModel)
+            .where(UnitModel.live())
+        ):
+            features.setdefault(unit_id, []).append(feature_type)
+
+        matrix = _UnitFeatureMatrix(capacity=max(256, len(rows)))
+        for unit_id, size, rate, climate, floor_level, city, status in rows:
+            matrix.upsert(
+                unit_id=unit_id,
+                size=float(size),
+                rate=float(rate),
+                climate=bool(climate),
+                floor_level=floor_level,
+                city=city,
+                vacant=status == UnitStatus.VACANT,
+                features=features.get(unit_id, [])
+            )
+        return matrix
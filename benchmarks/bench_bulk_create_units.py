@@ -0,0 +1,74 @@
+"""
+Benchmark bulk unit creation against one-by-one creation.
+
+Usage:
+    python -m benchmarks.bench_bulk_create_units [--units 10000] [--single 500]
+
+Runs against a throwaway SQLite file unless DATABASE_URL is set.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def _unit(i):
+    return {
+        'unit_name': f"Bench Unit {i}",
+        'country': 'South Africa',
+        'city': ('Cape Town', 'Johannesburg', 'Durban')[i % 3],
+        'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town',
+        'status': 'VACANT',
+        'size_sqm': 5.0 + i % 45,
+        'monthly_rate': 100.0 + i % 900,
+        'floor_level': 'Ground Floor',
+        'rental_duration_days': 30,
+        'security_features': ['BASIC', 'CCTV'] if i % 2 else ['BASIC'],
+        'images': []
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--units', type=int, default=10000)
+    parser.add_argument('--single', type=int, default=500,
+                        help='units to create one at a time for comparison')
+    args = parser.parse_args()
+
+    if not os.getenv('DATABASE_URL'):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['DATABASE_URL'] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.models.base import db
+    from app.models.user import UserModel
+    from app.services.unit_service import UnitService
+
+    app = create_app()
+    with app.app_context():
+        owner = UserModel(name='Bench', surname='Owner',
+                          email=f"bench-{time.time_ns()}@example.com", password='x')
+        db.session.add(owner)
+        db.session.commit()
+
+        started = time.perf_counter()
+        for i in range(args.single):
+            result = UnitService.create_unit(
+                {**_unit(i), 'user_id': owner.id})
+            assert 'error' not in result, result
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = UnitService.bulk_create_units(
+            [_unit(i) for i in range(args.single, args.single + args.units)], owner.id)
+        bulk = time.perf_counter() - started
+        assert result.get('created') == args.units, result
+
+        print(f"one-by-one: {args.single} units in {single:.2f}s "
+              f"({args.single / single:,.0f} units/s)")
+        print(f"bulk:       {args.units} units in {bulk:.2f}s "
+              f"({args.units / bulk:,.0f} units/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark concurrent bookings and check that no unit is booked twice.
+
+Every thread tries to book every unit, in its own random order, so each
+unit is contended by all threads at once. Exactly one booking per unit
+must succeed.
+
+Usage:
+    python -m benchmarks.bench_concurrent_booking [--units 200] [--threads 16]
+
+Runs against a throwaway SQLite file unless DATABASE_URL is set.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--units', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    if not os.getenv('DATABASE_URL'):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        # Writers queue on SQLite's lock instead of failing fast
+        os.environ['DATABASE_URL'] = f"sqlite:///{path}?timeout=60"
+
+    from app import create_app
+    from app.models.base import db
+    from app.models.user import UserModel
+    from app.models.rental import RentalModel
+    from app.services.unit_service import UnitService
+    from app.services.rental_service import RentalService
+
+    app = create_app()
+    with app.app_context():
+        stamp = time.time_ns()
+        users = [
+            UserModel(name='Bench', surname=str(i),
+                      email=f"bench-{stamp}-{i}@example.com", password='x')
+            for i in range(args.threads + 1)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        owner_id, tenant_ids = users[0].id, [user.id for user in users[1:]]
+
+        result = UnitService.bulk_create_units([
+            {
+                'unit_name': f"Booking Bench {stamp} {i}",
+                'country': 'South Africa',
+                'city': 'Cape Town',
+                'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town',
+                'status': 'VACANT',
+                'size_sqm': 10.0,
+                'monthly_rate': 500.0,
+                'floor_level': 'Ground Floor',
+                'rental_duration_days': 30
+            } for i in range(args.units)
+        ], owner_id)
+        unit_ids = [row['unit_id'] for row in result['results']]
+
+    start_date = datetime.now()
+    end_date = start_date + timedelta(days=90)
+    outcomes = Counter()
+    outcomes_lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def book(tenant_id):
+        order = random.sample(unit_ids, len(unit_ids))
+        local = Counter()
+        with app.app_context():
+            barrier.wait()
+            for unit_id in order:
+                result = RentalService.create_rental({
+                    'unit_id': unit_id,
+                    'tenant_id': tenant_id,
+                    'start_date': start_date,
+                    'end_date': end_date
+                })
+                if 'error' not in result:
+                    local['booked'] += 1
+                elif result['error'] == "Unit is not available for rent":
+                    local['refused'] += 1
+                else:
+                    local['failed'] += 1
+            db.session.remove()
+        with outcomes_lock:
+            outcomes.update(local)
+
+    threads = [threading.Thread(target=book, args=(tenant_id,))
+               for tenant_id in tenant_ids]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        rentals_per_unit = Counter(db.session.execute(
+            db.select(RentalModel.unit_id)
+            .where(RentalModel.unit_id.in_(unit_ids))
+        ).scalars())
+    double_booked = [unit_id for unit_id, count in rentals_per_unit.items()
+                     if count > 1]
+
+    attempts = sum(outcomes.values())
+    print(f"{args.threads} threads, {args.units} units, {attempts} attempts "
+          f"in {elapsed:.2f}s ({attempts / elapsed:,.0f} attempts/s, "
+          f"{outcomes['booked'] / elapsed:,.0f} bookings/s)")
+    print(f"booked {outcomes['booked']}, refused {outcomes['refused']}, "
+          f"failed {outcomes['failed']}, double-booked units {len(double_booked)}")
+    assert not double_booked, double_booked
+    assert outcomes['booked'] == args.units, outcomes
+
+
+if __name__ == '__main__':
+    main()
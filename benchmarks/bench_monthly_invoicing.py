@@ -0,0 +1,86 @@
+"""
+Benchmark a monthly billing run over many rentals.
+
+Usage:
+    python -m benchmarks.bench_monthly_invoicing [--rentals 100000] [--chunk-size 5000]
+
+Runs against a throwaway SQLite file unless DATABASE_URL is set. The
+run is repeated to show that a second pass over the same period finds
+nothing left to bill.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rentals', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    if not os.getenv('DATABASE_URL'):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['DATABASE_URL'] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.models.base import db
+    from app.models.rental import RentalModel
+    from app.models.unit import UnitModel
+    from app.models.user import UserModel
+    from app.services.invoice_service import InvoiceService
+
+    app = create_app()
+    with app.app_context():
+        owner = UserModel(name='Bench', surname='Owner',
+                          email=f"bench-{time.time_ns()}@example.com", password='x')
+        db.session.add(owner)
+        db.session.commit()
+
+        # One unit per rental keeps the data realistic for the
+        # per-unit exclusion constraint on Postgres
+        prefix = f"BENCH-{time.time_ns()}"
+        db.session.execute(db.insert(UnitModel), [
+            {
+                'unit_id': f"{prefix}-{i}",
+                'unit_name': f"Bench Unit {i}",
+                'user_id': owner.id,
+                'country': 'South Africa',
+                'city': 'Cape Town',
+                'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town',
+                'status': 'OCCUPIED',
+                'size_sqm': 10.0,
+                'monthly_rate': 100.0 + i % 900,
+                'currency': 'ZAR',
+                'floor_level': 'Ground Floor',
+                'rental_duration_days': 30
+            } for i in range(args.rentals)
+        ])
+        # Start dates spread over the month before and the billing month
+        # itself, so a share of the invoices is prorated
+        month = datetime(2026, 1, 1)
+        db.session.execute(db.insert(RentalModel), [
+            {
+                'unit_id': f"{prefix}-{i}",
+                'tenant_id': owner.id,
+                'start_date': month - timedelta(days=31) + timedelta(hours=i % (62 * 24)),
+                'end_date': month + timedelta(days=60),
+                'monthly_rate': 100.0 + i % 900,
+                'status': 'active'
+            } for i in range(args.rentals)
+        ])
+        db.session.commit()
+
+        for label in ('first run', 'rerun'):
+            result = InvoiceService.run_billing(
+                month.year, month.month, args.chunk_size)
+            assert 'error' not in result, result
+            print(f"{label}: {result['invoices']} invoices from "
+                  f"{result['rentals']} rentals in {result['seconds']:.2f}s "
+                  f"({result['rentals_per_second']:,} rentals/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,10 @@
 import pytest
 from datetime import datetime, timedelta, timezone
+from app.models.base import db
+from app.models.unit import UnitModel
+from app.models.user import UserModel
+from app.models.rental import RentalModel
+from app.models.rental_share import RentalShareModel
 
 
 class TestRentalEndpoints:
@@ -77,3 +82,106 @@ class TestRentalEndpoints:
         )
         assert response.status_code == 200
         assert 'as_tenant' in response.json
+
+    def test_list_rentals_query_budget(self, app, client, auth_headers, test_user, query_counter):
+        """Listing rentals costs the same number of statements for 1 or 20 rows"""
+        other = UserModel(name='Other', surname='Tenant',
+                          email='other@example.com', password='x')
+        db.session.add(other)
+        db.session.flush()
+
+        def add_rentals(start, count):
+            for i in range(start, start + count):
+                unit = UnitModel(
+                    unit_id=f'UNIT-B{i:03d}', unit_name=f'Budget Unit {i}',
+                    user_id=test_user.id, monthly_rate=500, size_sqm=10,
+                    city='Test City', country='Test Country',
+                    address_link='https://maps.google.com/?q=Camps+Bay,Cape+Town',
+                    floor_level='ground', status='OCCUPIED', currency='ZAR',
+                    climate_controlled=False, rental_duration_days=30)
+                db.session.add(unit)
+                # Alternate between the user renting and the user owning
+                rental = RentalModel(
+                    unit_id=unit.unit_id,
+                    tenant_id=test_user.id if i % 2 else other.id,
+                    start_date=datetime(2026, 1, 1), end_date=datetime(2026, 6, 1),
+                    monthly_rate=500, status='active')
+                db.session.add(rental)
+                db.session.flush()
+                db.session.add(RentalShareModel(
+                    rental_id=rental.id, user_id=other.id))
+            db.session.commit()
+            db.session.expire_all()
+
+        add_rentals(0, 2)
+        with query_counter:
+            response = client.get('/api/rentals/', headers=auth_headers)
+        assert response.status_code == 200
+        few = query_counter.count
+
+        add_rentals(2, 18)
+        with query_counter:
+            response = client.get('/api/rentals/', headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json['as_tenant']) == 10
+        assert len(response.json['as_owner']) == 20
+
+        assert query_counter.count == few
+
+    def test_get_shared_with_me(self, app, client, auth_headers, test_user, test_unit):
+        owner = UserModel(name='Other', surname='Tenant',
+                          email='other@example.com', password='x')
+        db.session.add(owner)
+        db.session.flush()
+        rental = RentalModel(
+            unit_id=test_unit.unit_id, tenant_id=owner.id,
+            start_date=datetime(2026, 1, 1), end_date=datetime(2026, 6, 1),
+            monthly_rate=1500, status='active')
+        db.session.add(rental)
+        db.session.flush()
+        db.session.add(RentalShareModel(rental_id=rental.id, user_id=test_user.id))
+        db.session.commit()
+
+        response = client.get('/api/rentals/shared-with-me', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert [r['id'] for r in response.json] == [rental.id]
+        assert response.json[0]['shared_users'] == ['test@example.com']
+
+    def test_list_rentals_cursor_pagination(self, app, client, auth_headers, test_user, test_unit):
+        for month in range(1, 8):
+            db.session.add(RentalModel(
+                unit_id=test_unit.unit_id, tenant_id=test_user.id,
+                start_date=datetime(2025, month, 1),
+                end_date=datetime(2025, month, 20), monthly_rate=1500,
+                status='terminated' if month == 4 else 'expired'))
+        db.session.commit()
+
+        starts, cursor = [], None
+        while True:
+            query = {'limit': 3, 'status': 'expired'}
+            if cursor:
+                query['cursor'] = cursor
+            response = client.get('/api/rentals/', query_string=query,
+                                  headers=auth_headers)
+            assert response.status_code == 200
+            # Own unit: every rental is listed under both roles
+            assert response.json['as_tenant'] == response.json['as_owner']
+            starts += [r['start_date'][:7] for r in response.json['as_tenant']]
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+
+        assert starts == ['2025-07', '2025-06', '2025-05',
+                          '2025-03', '2025-02', '2025-01']
+
+        history = client.get(
+            f'/api/rentals/history/{test_unit.unit_id}',
+            query_string={'from': '2025-02-01', 'to': '2025-05-01', 'limit': 2},
+            headers=auth_headers)
+        assert [r['start_date'][:7] for r in history.json] == ['2025-05', '2025-04']
+        assert 'X-Next-Cursor' in history.headers
+
+        invalid = client.get('/api/rentals/', query_string={'cursor': 'nope'},
+                             headers=auth_headers)
+        assert invalid.status_code == 400
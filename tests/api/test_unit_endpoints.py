@@ -0,0 +1,135 @@
+import pytest
+
+
+class TestUnitEndpoints:
+    def test_get_units_by_ids(self, client, test_unit):
+        response = client.get(
+            f'/api/units/?ids=MISSING-1,{test_unit.unit_id}&ids=MISSING-2')
+        assert response.status_code == 200
+        assert [u['unit_id'] for u in response.json['units']] == [
+            test_unit.unit_id]
+        assert response.json['missing'] == ['MISSING-1', 'MISSING-2']
+
+    def test_get_units_by_ids_limit(self, client):
+        ids = ','.join(f'UNIT-{i}' for i in range(301))
+        response = client.get(f'/api/units/?ids={ids}')
+        assert response.status_code == 400
+
+    def test_get_units_by_availability_requires_both_dates(self, client):
+        response = client.get('/api/units/?available_from=2030-03-01')
+        assert response.status_code == 400
+
+    def test_get_uploaded_image(self, app, client, test_user, test_unit, tmp_path):
+        from io import BytesIO
+        from PIL import Image
+        from app.services.unit_service import UnitService
+        app.config['IMAGE_STORAGE_PATH'] = str(tmp_path)
+        buffer = BytesIO()
+        Image.new('RGB', (64, 64), 'red').save(buffer, 'PNG')
+        unit = UnitService.upload_unit_images(
+            test_unit.unit_id, [buffer.getvalue()], test_user.id)
+        urls = unit['uploaded_images'][0]
+
+        response = client.get(urls['thumbnail_webp'])
+        assert response.status_code == 200
+        assert response.mimetype == 'image/webp'
+        assert response.cache_control.immutable
+
+        response = client.get(urls['original'])
+        assert response.mimetype == 'image/png'
+
+        assert client.get(f"/api/units/images/{'0' * 64}/original").status_code == 404
+
+    def test_update_unit_if_match(self, client, test_unit, user_headers):
+        response = client.get(
+            f'/api/units/{test_unit.unit_id}', headers=user_headers)
+        assert response.headers['ETag'] == '"1"'
+
+        response = client.patch(
+            f'/api/units/{test_unit.unit_id}', json={'floor_level': 'first'},
+            headers={**user_headers, 'If-Match': '"1"'})
+        assert response.status_code == 200
+        assert response.headers['ETag'] == '"2"'
+
+        response = client.patch(
+            f'/api/units/{test_unit.unit_id}', json={'floor_level': 'second'},
+            headers={**user_headers, 'If-Match': '"1"'})
+        assert response.status_code == 412
+        assert response.json['current_version'] == 2
+
+    def test_unit_write_routes_check_owner(self, client, test_unit, user_headers):
+        from app.models.base import db
+        response = client.post(
+            f'/api/units/{test_unit.unit_id}/security',
+            json={'features': ['CCTV']}, headers=user_headers)
+        assert response.status_code == 201
+
+        response = client.delete('/api/units/MISSING-1', headers=user_headers)
+        assert response.status_code == 404
+
+        test_unit.user_id = None
+        db.session.commit()
+        response = client.delete(
+            f'/api/units/{test_unit.unit_id}', headers=user_headers)
+        assert response.status_code == 403
+
+    def test_upload_undecodable_image(self, app, client, test_unit, user_headers, tmp_path):
+        import os
+        import struct
+        import zlib
+        from io import BytesIO
+        from PIL import Image
+        app.config['IMAGE_STORAGE_PATH'] = str(tmp_path)
+        buffer = BytesIO()
+        Image.new('RGB', (64, 64), 'red').save(buffer, 'PNG')
+        data = buffer.getvalue()
+        # Valid chunk CRCs pass verify(), but the pixel data cannot be decoded
+        start = data.index(b'IDAT')
+        length = struct.unpack('>I', data[start - 4:start])[0]
+        chunk = b'IDAT' + b'\x00' * length
+        data = (data[:start] + chunk + struct.pack('>I', zlib.crc32(chunk))
+                + data[start + 8 + length:])
+
+        response = client.post(
+            f'/api/units/{test_unit.unit_id}/images',
+            data={'images': (BytesIO(data), 'broken.png')},
+            headers=user_headers)
+
+        assert response.status_code == 400
+        assert 'error' in response.json
+        assert test_unit.uploaded_images == []
+        assert not any(files for _, _, files in os.walk(tmp_path))
+
+    def test_unit_writes_cost_guard_select_and_writes(self, client, test_unit, user_headers, query_counter):
+        from app.models.base import db
+        url = f'/api/units/{test_unit.unit_id}'
+
+        # Each count starts from an empty session, as a real request does,
+        # and includes the blacklist and user lookups of token validation
+        db.session.expunge_all()
+        with query_counter:
+            response = client.patch(
+                url, json={'floor_level': 'first'}, headers=user_headers)
+        assert response.status_code == 200
+        assert response.json['floor_level'] == 'first'
+        assert response.json['version'] == 2
+        # Guard, UPDATE, then the features, images, owner and active rental
+        # of the full unit payload, loaded before the commit expires them
+        assert query_counter.count == 8
+
+        db.session.expunge_all()
+        with query_counter:
+            response = client.post(
+                f'{url}/security', json={'features': ['CCTV']}, headers=user_headers)
+        assert response.status_code == 201
+        [feature] = response.json['security_features']
+        assert feature['type'] == 'CCTV Surveillance'
+        assert feature['notes'].startswith('Added on')
+        # Plus the existing-features check and the INSERT
+        assert query_counter.count == 10
+
+        # Writes answer with the unit's public payload, as a read does
+        written = response.json
+        assert written['owner']['email'] == 'test@example.com'
+        from app.services.unit_service import UnitService
+        assert set(written) == set(UnitService.get_unit_by_id(test_unit.unit_id))
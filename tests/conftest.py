@@ -1,7 +1,6 @@
 import pytest
 from datetime import datetime, timezone
-from functools import wraps
-from flask import g
+from sqlalchemy import event
 from app import create_app
 from app.models.base import db
 from app.models.user import UserModel
@@ -10,28 +9,12 @@ from app.models.rental import RentalModel
 from app.services.auth_service import AuthService
 
 
-def mock_token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        g.current_user = {
-            'id': 1,
-            'email': 'test@example.com',
-            'name': 'Test User'
-        }
-        return f(*args, **kwargs)
-    return decorated
-
-
 @pytest.fixture
 def app():
     app = create_app('testing')
     app.config['TESTING'] = True
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
 
-    # Mock the token_required decorator
-    from app.api import rentals
-    rentals.token_required = mock_token_required
-
     with app.app_context():
         db.create_all()
         yield app
@@ -45,9 +28,17 @@ def client(app):
 
 
 @pytest.fixture
-def auth_headers():
-    # This is just for consistency, our mock decorator ignores the token
-    return {'Authorization': 'Bearer test-token'}
+def auth_headers(user_headers):
+    return user_headers
+
+
+@pytest.fixture
+def user_headers(test_user, monkeypatch):
+    """Authorization header carrying a real token for test_user"""
+    if not AuthService.SECRET_KEY:
+        monkeypatch.setattr(AuthService, 'SECRET_KEY', 'test-secret')
+    token = AuthService.generate_token(test_user.email)
+    return {'Authorization': f'Bearer {token}'}
 
 
 @pytest.fixture
@@ -62,9 +53,8 @@ def test_user(app):
         )
         db.session.add(user)
         db.session.commit()
+        # Rows are removed by drop_all in the app fixture
         yield user
-        db.session.delete(user)
-        db.session.commit()
 
 
 @pytest.fixture
@@ -102,3 +92,23 @@ def test_rental(app, test_user, test_unit):
     db.session.add(rental)
     db.session.commit()
     return rental
+
+
+@pytest.fixture
+def query_counter(app):
+    """Count the SQL statements executed inside a `with` block"""
+    class Counter:
+        count = 0
+
+        def _on_execute(self, *args):
+            self.count += 1
+
+        def __enter__(self):
+            self.count = 0
+            event.listen(db.engine, 'before_cursor_execute', self._on_execute)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(db.engine, 'before_cursor_execute', self._on_execute)
+
+    return Counter()
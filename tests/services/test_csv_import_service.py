@@ -0,0 +1,201 @@
+import io
+import os
+import pytest
+from app.models.base import db
+from app.models.unit import UnitModel
+from app.models.user import UserModel
+from app.models.securityFeature import SecurityFeatureModel, SecurityFeatureType
+from app.services.csv_import_service import CsvImportService
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'playground', 'data')
+LOCATION = {
+    'city': 'Cape Town',
+    'country': 'South Africa',
+    'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town'
+}
+
+
+class TestCsvImportService:
+    def test_import_units_from_inventory_csv(self, app, test_user):
+        with open(os.path.join(DATA_DIR, 'data.csv'), encoding='utf-8-sig') as stream:
+            stats = CsvImportService.import_units(
+                stream, owner_id=test_user.id, chunk_size=4, **LOCATION)
+
+        assert stats['rows'] == 9
+        assert stats['inserted'] == 9
+        assert stats['errors'] == []
+
+        unit = db.session.execute(
+            db.select(UnitModel).filter_by(unit_name='Unit 103')).scalar_one()
+        assert unit.currency == 'USD'
+        assert float(unit.base_rate) == 140.0
+        # BASIC + CCTV (0.10) + GUARDS (0.15)
+        assert float(unit.monthly_rate) == 175.0
+        assert unit.rental_duration_days == CsvImportService.DEFAULT_DURATION_DAYS
+        assert {f.feature_type for f in unit.security_features} == {
+            SecurityFeatureType.BASIC, SecurityFeatureType.CCTV, SecurityFeatureType.GUARDS}
+
+    def test_import_units_upsert(self, app, test_user):
+        header = 'unit_id,status,size_sqm,monthly_rate,climate_controlled,floor_level,security_features\n'
+        CsvImportService.import_units(
+            io.StringIO(header + '1,Available,5,R100,No,Ground,CCTV\n'),
+            owner_id=test_user.id, **LOCATION)
+
+        changed = io.StringIO(
+            header + '1,Rented,5,R150,yes,Ground,Alarm System\n2,Available,0,R1,No,1st,\n')
+        stats = CsvImportService.import_units(
+            changed, owner_id=test_user.id, **LOCATION)
+        assert stats['skipped'] == 1
+        assert stats['errors'] == [{'line': 3, 'error': 'size_sqm must be positive'}]
+
+        changed.seek(0)
+        stats = CsvImportService.import_units(
+            changed, owner_id=test_user.id, upsert=True, **LOCATION)
+        assert stats['updated'] == 1
+
+        db.session.expire_all()
+        unit = db.session.execute(db.select(UnitModel)).scalar_one()
+        assert float(unit.monthly_rate) == 150.0
+        assert unit.climate_controlled is True
+        assert unit.version == 2
+        assert db.session.query(SecurityFeatureModel).filter_by(
+            unit_id=unit.unit_id, feature_type=SecurityFeatureType.CCTV).count() == 0
+
+    def test_import_units_upsert_notifies_only_new_vacancies(self, app, test_user):
+        from app.services.saved_search_service import SavedSearchService
+        tenant = UserModel(name='Some', surname='Tenant',
+                           email='tenant@example.com', password='x')
+        db.session.add(tenant)
+        db.session.commit()
+        SavedSearchService.create_search(tenant.id, {'city': 'Cape Town'})
+
+        header = 'unit_id,status,size_sqm,monthly_rate,floor_level\n'
+        rows = '1,Available,5,R100,Ground\n2,Rented,5,R100,Ground\n'
+        for _ in range(2):
+            CsvImportService.import_units(
+                io.StringIO(header + rows), owner_id=test_user.id,
+                upsert=True, **LOCATION)
+        assert len(SavedSearchService.get_notifications(tenant.id)) == 1
+
+        CsvImportService.import_units(
+            io.StringIO(header + '1,Available,5,R120,Ground\n2,Available,5,R100,Ground\n'),
+            owner_id=test_user.id, upsert=True, **LOCATION)
+        notifications = SavedSearchService.get_notifications(tenant.id)
+        assert [n['unit']['name'] for n in notifications] == ['Unit 2', 'Unit 1']
+
+    def test_import_units_upsert_leaves_rented_units_status(self, app, test_user):
+        from datetime import datetime, timedelta
+        from app.models.enums import UnitStatus
+        from app.models.rental import RentalModel
+        from app.services.saved_search_service import SavedSearchService
+        tenant = UserModel(name='Some', surname='Tenant',
+                           email='tenant@example.com', password='x')
+        db.session.add(tenant)
+        db.session.commit()
+
+        header = 'unit_id,status,size_sqm,monthly_rate,floor_level\n'
+        CsvImportService.import_units(
+            io.StringIO(header + '1,Rented,5,R100,Ground\n2,Rented,5,R100,Ground\n'
+                        '3,Rented,5,R100,Ground\n'),
+            owner_id=test_user.id, **LOCATION)
+        units = {unit.unit_name: unit for unit in db.session.execute(
+            db.select(UnitModel)).scalars()}
+        # Unit 1 has a tenant, unit 2 a booking that starts next week
+        units['Unit 1'].tenant_id = tenant.id
+        start = datetime.utcnow() + timedelta(days=7)
+        db.session.add(RentalModel(
+            unit_id=units['Unit 2'].unit_id, tenant_id=tenant.id,
+            start_date=start, end_date=start + timedelta(days=30),
+            monthly_rate=100, status='active'))
+        db.session.commit()
+        SavedSearchService.create_search(tenant.id, {'city': 'Cape Town'})
+
+        stats = CsvImportService.import_units(
+            io.StringIO(header + '1,Available,5,R120,Ground\n2,Available,5,R120,Ground\n'
+                        '3,Available,5,R120,Ground\n'),
+            owner_id=test_user.id, upsert=True, **LOCATION)
+
+        assert stats['updated'] == 3
+        db.session.expire_all()
+        units = {unit.unit_name: unit for unit in db.session.execute(
+            db.select(UnitModel)).scalars()}
+        assert units['Unit 1'].status == UnitStatus.OCCUPIED
+        assert units['Unit 2'].status == UnitStatus.OCCUPIED
+        assert units['Unit 3'].status == UnitStatus.VACANT
+        # The rest of the row still applies
+        assert float(units['Unit 1'].monthly_rate) == 120.0
+        notifications = SavedSearchService.get_notifications(tenant.id)
+        assert [n['unit']['name'] for n in notifications] == ['Unit 3']
+
+    def test_import_units_upsert_keeps_unchanged_feature_notes(self, app, test_user):
+        header = 'unit_id,status,size_sqm,monthly_rate,floor_level,security_features\n'
+        CsvImportService.import_units(
+            io.StringIO(header + '1,Available,5,R100,Ground,CCTV\n'),
+            owner_id=test_user.id, **LOCATION)
+        cctv = db.session.execute(
+            db.select(SecurityFeatureModel).filter_by(
+                feature_type=SecurityFeatureType.CCTV)).scalar_one()
+        cctv.notes = 'Covers the loading bay'
+        db.session.commit()
+
+        CsvImportService.import_units(
+            io.StringIO(header + '1,Available,5,R100,Ground,"CCTV,Alarm"\n'),
+            owner_id=test_user.id, upsert=True, **LOCATION)
+
+        db.session.expire_all()
+        notes = dict(db.session.execute(
+            db.select(SecurityFeatureModel.feature_type, SecurityFeatureModel.notes)
+        ).all())
+        assert notes == {
+            SecurityFeatureType.BASIC: 'Imported from CSV',
+            SecurityFeatureType.CCTV: 'Covers the loading bay',
+            SecurityFeatureType.ALARM: 'Imported from CSV'
+        }
+
+    def test_import_units_upsert_refuses_other_owners_units(self, app, test_user):
+        other = UserModel(name='Other', surname='Owner',
+                          email='other@example.com', password='x')
+        db.session.add(other)
+        db.session.commit()
+        header = 'unit_id,status,size_sqm,monthly_rate,floor_level\n'
+        CsvImportService.import_units(
+            io.StringIO(header + '1,Available,5,R100,Ground\n'),
+            owner_id=other.id, **LOCATION)
+
+        stats = CsvImportService.import_units(
+            io.StringIO(header + '1,Available,5,R999,Ground\n2,Available,5,R100,Ground\n'),
+            owner_id=test_user.id, upsert=True, **LOCATION)
+
+        assert stats['inserted'] == 1
+        assert stats['updated'] == 0
+        assert stats['errors'] == [{
+            'line': 2,
+            'error': "Unit 'Unit 1' in Cape Town belongs to another owner"
+        }]
+        db.session.expire_all()
+        unit = db.session.execute(
+            db.select(UnitModel).filter_by(unit_name='Unit 1')).scalar_one()
+        assert unit.user_id == other.id
+        assert float(unit.monthly_rate) == 100.0
+
+    def test_import_users(self, app):
+        with open(os.path.join(DATA_DIR, 'users.csv'), encoding='utf-8-sig') as stream:
+            stats = CsvImportService.import_users(stream)
+        assert stats['inserted'] == 2
+
+        user = db.session.get(UserModel, 2)
+        assert user.email == 'code@gmail.com'
+
+        stats = CsvImportService.import_users(io.StringIO(
+            'name,surname,email,password_hash\nA,B,ab@example.com,plaintext\n'))
+        assert stats['errors'][0]['error'] == 'password_hash must be a bcrypt hash'
+
+    @pytest.mark.parametrize('value, expected', [
+        ('$100', (100.0, 'USD')),
+        ('R1 200.50', (1200.5, 'ZAR')),
+        ('1,000 eur', (1000.0, 'EUR')),
+        ('90', (90.0, None)),
+    ])
+    def test_parse_money(self, value, expected):
+        assert CsvImportService._parse_money(value) == expected
@@ -0,0 +1,61 @@
+import pytest
+from datetime import datetime
+from app.models.base import db
+from app.models.invoice import InvoiceModel, InvoiceLineModel
+from app.models.rental import RentalModel
+from app.services.invoice_service import InvoiceService
+
+
+def _rental(unit, tenant, start, end, status='active'):
+    rental = RentalModel(unit_id=unit.unit_id, tenant_id=tenant.id,
+                         start_date=start, end_date=end,
+                         monthly_rate=1500.00, status=status)
+    db.session.add(rental)
+    return rental
+
+
+class TestInvoiceService:
+    def test_prorates_partial_months(self, app, test_user, test_unit):
+        whole = _rental(test_unit, test_user,
+                        datetime(2025, 12, 15), datetime(2026, 3, 1))
+        # Ends part-way through the 20th, which is billed as a full day
+        partial = _rental(test_unit, test_user,
+                          datetime(2026, 1, 10, 12), datetime(2026, 1, 20, 9),
+                          status='terminated')
+        _rental(test_unit, test_user,
+                datetime(2026, 2, 1), datetime(2026, 3, 1))
+        db.session.commit()
+
+        result = InvoiceService.run_billing(2026, 1, chunk_size=1)
+
+        assert 'error' not in result
+        assert result['invoices'] == 2
+        assert result['amount'] == 1500.00 + 532.26
+        invoices = {invoice['rental_id']: invoice
+                    for invoice in InvoiceService.get_user_invoices(test_user.id)}
+        assert set(invoices) == {whole.id, partial.id}
+        assert invoices[whole.id]['amount'] == 1500.00
+        assert invoices[whole.id]['lines'][0]['quantity'] == 31
+        line = invoices[partial.id]['lines'][0]
+        assert line['quantity'] == 11
+        assert line['amount'] == 532.26
+        assert line['description'] == "Storage rental: Test Unit, 2026-01-10 to 2026-01-20"
+        assert invoices[partial.id]['period_end'] == '2026-02-01'
+
+    def test_rerun_bills_each_rental_once(self, app, test_user, test_unit):
+        _rental(test_unit, test_user,
+                datetime(2026, 1, 1), datetime(2026, 4, 1))
+        db.session.commit()
+
+        first = InvoiceService.run_billing(2026, 2)
+        second = InvoiceService.run_billing(2026, 2)
+        InvoiceService.run_billing(2026, 3)
+
+        assert first['invoices'] == 1
+        assert second['invoices'] == 0
+        assert second['rentals'] == 0
+        assert db.session.query(InvoiceModel).count() == 2
+        assert db.session.query(InvoiceLineModel).count() == 2
+        february = InvoiceService.get_user_invoices(test_user.id, (2026, 2))
+        assert len(february) == 1
+        assert february[0]['amount'] == 1500.00
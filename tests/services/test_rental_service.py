@@ -2,6 +2,12 @@ import pytest
 from datetime import datetime, timedelta, timezone
 from app.services.rental_service import RentalService
 from app.models.rental import RentalModel
+from app.models.enums import UnitStatus
+from app.models.user import UserModel
+from app.models.rental_share import RentalShareModel
+from app.models.base import db
+from app.models.unit import UnitModel
+from app.services.rental_summary_service import RentalSummaryService
 
 
 class TestRentalService:
@@ -19,6 +25,59 @@ class TestRentalService:
         assert result['unit_id'] == data['unit_id']
         assert result['status'] == 'active'
 
+    def test_create_rental_claims_unit_once(self, app, test_user, test_unit):
+        data = {
+            'unit_id': test_unit.unit_id,
+            'tenant_id': test_user.id,
+            'start_date': datetime.now(timezone.utc),
+            'end_date': datetime.now(timezone.utc) + timedelta(days=90)
+        }
+
+        first = RentalService.create_rental(data)
+        second = RentalService.create_rental(data)
+
+        assert 'error' not in first
+        assert second == {"error": "Unit is not available for rent"}
+        rentals = RentalModel.query.filter_by(unit_id=test_unit.unit_id).all()
+        assert len(rentals) == 1
+        assert float(rentals[0].monthly_rate) == 1500.00
+
+    def test_create_future_rentals_without_overlap(self, app, test_user, test_unit):
+        start = datetime.now(timezone.utc) + timedelta(days=30)
+
+        def book(offset_days, length_days):
+            return RentalService.create_rental({
+                'unit_id': test_unit.unit_id,
+                'tenant_id': test_user.id,
+                'start_date': start + timedelta(days=offset_days),
+                'end_date': start + timedelta(days=offset_days + length_days)
+            })
+
+        first = book(0, 30)
+        back_to_back = book(30, 30)
+        overlapping = book(45, 30)
+        inside = book(5, 10)
+
+        assert 'error' not in first
+        assert 'error' not in back_to_back
+        assert overlapping == {"error": "Unit is already booked for these dates"}
+        assert inside == {"error": "Unit is already booked for these dates"}
+        # Future bookings don't occupy the unit yet
+        assert test_unit.status == UnitStatus.VACANT
+
+        extended = RentalService.update_rental(
+            first['id'], {'end_date': start + timedelta(days=40)}, test_user.id)
+        assert extended == {"error": "Unit is already booked for these dates"}
+
+    def test_create_rental_unknown_unit(self, app, test_user):
+        result = RentalService.create_rental({
+            'unit_id': 'UNIT-404',
+            'tenant_id': test_user.id,
+            'start_date': datetime.now(timezone.utc),
+            'end_date': datetime.now(timezone.utc) + timedelta(days=90)
+        })
+        assert result == {"error": "Unit not found"}
+
     def test_get_rental_by_id(self, app, test_rental, test_user):
         result = RentalService.get_rental_by_id(test_rental.id, test_user.id)
         assert result is not None
@@ -32,13 +91,251 @@ class TestRentalService:
         assert 'error' not in result
         assert result['status'] == 'terminated'
 
+    def test_terminate_future_booking_keeps_current_tenant(self, app, test_user, test_unit):
+        tenant = UserModel(name='Next', surname='Tenant',
+                           email='next@example.com', password='x')
+        db.session.add(tenant)
+        db.session.commit()
+        now = datetime.now(timezone.utc)
+        current = RentalService.create_rental({
+            'unit_id': test_unit.unit_id, 'tenant_id': test_user.id,
+            'start_date': now, 'end_date': now + timedelta(days=30)})
+        future = RentalService.create_rental({
+            'unit_id': test_unit.unit_id, 'tenant_id': tenant.id,
+            'start_date': now + timedelta(days=40),
+            'end_date': now + timedelta(days=70)})
+        RentalSummaryService.get_summary(tenant.id)
+
+        result = RentalService.terminate_rental(future['id'], tenant.id)
+
+        assert 'error' not in result
+        db.session.expire_all()
+        unit = db.session.get(UnitModel, test_unit.unit_id)
+        assert unit.status == UnitStatus.OCCUPIED
+        assert unit.tenant_id == test_user.id
+        rental = db.session.get(RentalModel, future['id'])
+        assert rental.status == 'terminated'
+        assert rental.end_date == rental.start_date
+        assert rental.total_cost == 0
+        summary = RentalSummaryService.get_summary(tenant.id)
+        assert summary['tenant_active'] == 0
+        assert summary['tenant_spent'] == 0
+        assert summary['tenant_days'] == 0
+        assert db.session.get(RentalModel, current['id']).status == 'active'
+
+        # Terminating the current rental does free the unit
+        RentalService.update_rental(
+            current['id'], {'status': 'terminated'}, test_user.id)
+        db.session.expire_all()
+        unit = db.session.get(UnitModel, test_unit.unit_id)
+        assert unit.status == UnitStatus.VACANT
+        assert unit.tenant_id is None
+
+    def test_update_rental_status_respects_bookings(self, app, test_user, test_unit):
+        start = datetime.now(timezone.utc) + timedelta(days=30)
+        booking = {
+            'unit_id': test_unit.unit_id, 'tenant_id': test_user.id,
+            'start_date': start, 'end_date': start + timedelta(days=30)}
+        first = RentalService.create_rental(booking)
+        db.session.get(RentalModel, first['id']).status = 'expired'
+        db.session.commit()
+        second = RentalService.create_rental(booking)
+        assert 'error' not in second
+
+        # The freed dates were booked again, so the first can't come back
+        assert RentalService.update_rental(
+            first['id'], {'status': 'active'}, test_user.id) == {
+            "error": "Unit is already booked for these dates"}
+        assert RentalService.update_rental(
+            first['id'], {'status': 'terminated'}, test_user.id) == {
+            "error": "Rental is not active"}
+        db.session.expire_all()
+        assert db.session.get(RentalModel, first['id']).status == 'expired'
+
     def test_get_upcoming_expirations(self, app, test_rental, test_user):
         result = RentalService.get_upcoming_expirations(test_user.id)
         assert 'as_tenant' in result
         assert 'as_owner' in result
 
+    def test_get_upcoming_expirations_window(self, app, test_user, test_unit, query_counter):
+        other = UserModel(name='Other', surname='Tenant',
+                          email='other@example.com', password='x')
+        db.session.add(other)
+        db.session.flush()
+        now = datetime.utcnow()
+        for tenant_id, ends_in in ((test_user.id, 5), (other.id, 10),
+                                   (other.id, 20), (other.id, 45)):
+            db.session.add(RentalModel(
+                unit_id=test_unit.unit_id, tenant_id=tenant_id,
+                start_date=now - timedelta(days=30),
+                end_date=now + timedelta(days=ends_in),
+                monthly_rate=1500.00, status='active'))
+        db.session.commit()
+        user_id = test_user.id
+        db.session.expire_all()
+
+        with query_counter:
+            result = RentalService.get_upcoming_expirations(user_id)
+        # Tagged union, then units, tenants and shares in bulk
+        assert query_counter.count == 4
+        assert len(result['as_tenant']) == 1
+        assert len(result['as_owner']) == 3
+
+        wider = RentalService.get_upcoming_expirations(test_user.id, days=60)
+        assert len(wider['as_owner']) == 4
+
+        limited = RentalService.get_upcoming_expirations(test_user.id, limit=2)
+        assert len(limited['as_tenant']) == 2 - len(limited['as_owner'])
+        assert limited['as_owner'][0]['end_date'] < (now + timedelta(days=6)).isoformat()
+
     def test_rental_statistics(self, app, test_rental, test_user):
         stats = RentalService.get_rental_statistics(test_user.id)
         assert 'as_tenant' in stats
         assert 'as_owner' in stats
         assert stats['as_tenant']['total_rentals'] > 0
+
+    def test_rental_statistics_values(self, app, test_user, test_unit):
+        for days, status in ((30, 'active'), (90, 'terminated')):
+            db.session.add(RentalModel(
+                unit_id=test_unit.unit_id, tenant_id=test_user.id,
+                start_date=datetime(2026, 1, 1),
+                end_date=datetime(2026, 1, 1) + timedelta(days=days),
+                monthly_rate=1500.00, total_cost=days * 50.0, status=status))
+        db.session.commit()
+
+        stats = RentalService.get_rental_statistics(test_user.id)
+        assert stats['as_tenant'] == {
+            'total_rentals': 2,
+            'active_rentals': 1,
+            'total_spent': 6000.0,
+            'average_duration': 60.0
+        }
+        assert stats['as_owner'] == {
+            'total_rentals': 2,
+            'active_rentals': 1,
+            'total_revenue': 6000.0,
+            'units_rented': 1
+        }
+
+        overall = RentalService.get_global_rental_statistics()
+        assert overall['total_active_rentals'] == 1
+        assert overall['total_terminated'] == 1
+        assert overall['expiring_soon'] == 1
+        assert overall['average_duration'] == 60.0
+
+    def test_share_and_unshare_rental(self, app, test_rental, test_user):
+        friend = UserModel(name='Friend', surname='User',
+                           email='friend@example.com', password='x')
+        db.session.add(friend)
+        db.session.commit()
+
+        shared = RentalService.share_rental(
+            test_rental.id, 'friend@example.com', test_user.id)
+        again = RentalService.share_rental(
+            test_rental.id, 'friend@example.com', test_user.id)
+
+        assert shared['shared_users'] == ['friend@example.com']
+        assert again == {"error": "User already has access"}
+        assert [r['id'] for r in RentalService.get_shared_with_me(friend.id)] == [test_rental.id]
+
+        unshared = RentalService.unshare_rental(
+            test_rental.id, 'friend@example.com', test_user.id)
+        assert unshared['shared_users'] == []
+        assert RentalService.get_shared_with_me(friend.id) == []
+        assert RentalService.unshare_rental(
+            test_rental.id, 'friend@example.com', test_user.id
+        ) == {"error": "User does not have access"}
+
+    def test_migrate_shared_emails(self, app, test_rental, test_user):
+        friend = UserModel(name='Friend', surname='User',
+                           email='friend@example.com', password='x')
+        db.session.add(friend)
+        test_rental.shared_user_emails = \
+            '["friend@example.com", "gone@example.com", "friend@example.com"]'
+        db.session.commit()
+
+        first = RentalService.migrate_shared_emails(chunk_size=1)
+        second = RentalService.migrate_shared_emails(chunk_size=1)
+
+        assert first == {'rentals': 1, 'shares': 1, 'unknown_emails': 1}
+        assert second == {'rentals': 0, 'shares': 0, 'unknown_emails': 0}
+        assert db.session.execute(db.select(RentalShareModel.user_id)).scalars().all() == [friend.id]
+        assert test_rental.shared_user_emails is None
+
+    def test_expire_overdue_rentals_starts_bookings_in_batches(self, app, test_user, query_counter):
+        now = datetime.utcnow()
+        for i in range(3):
+            db.session.add(UnitModel(
+                unit_id=f'UNIT-10{i}', unit_name=f'Unit {i}', user_id=test_user.id,
+                monthly_rate=900.00, size_sqm=10.0, city='Test City',
+                country='Test Country', floor_level='ground', status='VACANT',
+                currency='ZAR', climate_controlled=False, rental_duration_days=30,
+                address_link='https://maps.google.com/?q=Camps+Bay,Cape+Town'))
+            db.session.add(RentalModel(
+                unit_id=f'UNIT-10{i}', tenant_id=test_user.id,
+                start_date=now - timedelta(hours=1),
+                end_date=now + timedelta(days=30 + i),
+                monthly_rate=900.00, status='active'))
+        db.session.commit()
+        user_id = test_user.id
+
+        with query_counter:
+            result = RentalService.expire_overdue_rentals(batch_size=2)
+
+        assert result == {'expired': 0, 'freed_units': 0, 'started': 3}
+        # Two handoff batches of a SELECT and an UPDATE, then one empty
+        # probe for each step
+        assert query_counter.count == 6
+        db.session.expire_all()
+        units = UnitModel.query.filter(UnitModel.unit_id.like('UNIT-10%')).all()
+        assert {(unit.status, unit.tenant_id) for unit in units} == {
+            (UnitStatus.OCCUPIED, user_id)}
+
+    def test_expire_overdue_rentals(self, app, test_user, test_unit):
+        other = UserModel(name='Next', surname='Tenant',
+                          email='next@example.com', password='x')
+        second_unit = UnitModel(
+            unit_id='UNIT-002', unit_name='Second Unit', user_id=test_user.id,
+            monthly_rate=900.00, size_sqm=10.0, city='Test City',
+            country='Test Country', floor_level='ground', status='OCCUPIED',
+            tenant_id=test_user.id, currency='ZAR', climate_controlled=False,
+            rental_duration_days=30,
+            address_link='https://maps.google.com/?q=Camps+Bay,Cape+Town')
+        db.session.add_all([other, second_unit])
+        db.session.flush()
+        now = datetime.utcnow()
+        test_unit.status = UnitStatus.OCCUPIED
+        test_unit.tenant_id = test_user.id
+        db.session.add_all([
+            # Ended yesterday, nothing follows: the unit frees up
+            RentalModel(unit_id='UNIT-002', tenant_id=test_user.id,
+                        start_date=now - timedelta(days=30),
+                        end_date=now - timedelta(days=1),
+                        monthly_rate=900.00, status='active'),
+            # Ended yesterday, followed by a booking that started today
+            RentalModel(unit_id=test_unit.unit_id, tenant_id=test_user.id,
+                        start_date=now - timedelta(days=30),
+                        end_date=now - timedelta(days=1),
+                        monthly_rate=1500.00, status='active'),
+            RentalModel(unit_id=test_unit.unit_id, tenant_id=other.id,
+                        start_date=now - timedelta(hours=1),
+                        end_date=now + timedelta(days=30),
+                        monthly_rate=1500.00, status='active')
+        ])
+        db.session.commit()
+        RentalSummaryService.get_summary(test_user.id)
+
+        first = RentalService.expire_overdue_rentals(batch_size=1)
+        second = RentalService.expire_overdue_rentals(batch_size=1)
+
+        assert first == {'expired': 2, 'freed_units': 1, 'started': 1}
+        assert second == {'expired': 0, 'freed_units': 0, 'started': 0}
+        db.session.expire_all()
+        assert second_unit.status == UnitStatus.VACANT
+        assert second_unit.tenant_id is None
+        assert test_unit.status == UnitStatus.OCCUPIED
+        assert test_unit.tenant_id == other.id
+        assert RentalModel.query.filter_by(status='expired').count() == 2
+        summary = RentalSummaryService.get_summary(test_user.id)
+        assert summary['tenant_active'] == 0
+        assert summary['owner_active'] == 1
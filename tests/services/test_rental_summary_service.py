@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.models.base import db
+from app.models.rental import RentalModel
+from app.models.user import UserModel
+from app.models.user_rental_summary import UserRentalSummaryModel
+from app.services.rental_service import RentalService
+from app.services.rental_summary_service import RentalSummaryService
+
+
+class TestRentalSummaryService:
+    def test_deltas_match_rebuild(self, app, test_user, test_unit):
+        tenant = UserModel(name='Some', surname='Tenant',
+                           email='tenant@example.com', password='x')
+        db.session.add(tenant)
+        db.session.commit()
+        # Materialize both rows so the writes below maintain them by delta
+        RentalSummaryService.get_summary(test_user.id)
+        RentalSummaryService.get_summary(tenant.id)
+
+        now = datetime.now(timezone.utc)
+        current = RentalService.create_rental({
+            'unit_id': test_unit.unit_id, 'tenant_id': tenant.id,
+            'start_date': now, 'end_date': now + timedelta(days=60)})
+        future = RentalService.create_rental({
+            'unit_id': test_unit.unit_id, 'tenant_id': tenant.id,
+            'start_date': now + timedelta(days=90),
+            'end_date': now + timedelta(days=120)})
+        RentalService.update_rental(
+            future['id'], {'end_date': now + timedelta(days=150)}, tenant.id)
+        RentalService.terminate_rental(current['id'], tenant.id)
+
+        incremental = {user_id: RentalSummaryService.get_summary(user_id)
+                       for user_id in (test_user.id, tenant.id)}
+        assert incremental[tenant.id]['tenant_rentals'] == 2
+        assert incremental[tenant.id]['tenant_active'] == 1
+        assert incremental[test_user.id]['owner_rentals'] == 2
+
+        assert RentalSummaryService.rebuild() == {"users": 2}
+        for user_id, summary in incremental.items():
+            rebuilt = RentalSummaryService.get_summary(user_id)
+            for column, value in summary.items():
+                if column in ('created_at', 'updated_at'):
+                    continue
+                assert rebuilt[column] == pytest.approx(value), column
+
+    def test_writes_build_missing_rows_from_history(self, app, test_user, test_unit, test_rental):
+        tenant = UserModel(name='Some', surname='Tenant',
+                           email='tenant@example.com', password='x')
+        late = UserModel(name='Late', surname='Tenant',
+                         email='late@example.com', password='x')
+        db.session.add_all([tenant, late])
+        db.session.commit()
+        # Overdue, so the expiry run below drops it from the active count
+        db.session.add(RentalModel(
+            unit_id=test_unit.unit_id, tenant_id=late.id,
+            start_date=datetime(2025, 1, 1), end_date=datetime(2025, 2, 1),
+            monthly_rate=1500.00, total_cost=1550.0, status='active'))
+        db.session.commit()
+
+        # No user has a summary row yet; the owner also rents the unit
+        start = test_rental.end_date + timedelta(days=30)
+        RentalService.create_rental({
+            'unit_id': test_unit.unit_id, 'tenant_id': tenant.id,
+            'start_date': start, 'end_date': start + timedelta(days=30)})
+        RentalService.terminate_rental(test_rental.id, test_user.id)
+        RentalService.expire_overdue_rentals()
+
+        # The writes built the rows, leaving no lazy build to race them
+        for user in (test_user, tenant, late):
+            assert db.session.get(UserRentalSummaryModel, user.id) is not None
+        incremental = {user_id: RentalSummaryService.get_summary(user_id)
+                       for user_id in (test_user.id, tenant.id, late.id)}
+        assert incremental[test_user.id]['owner_rentals'] == 3
+        assert incremental[test_user.id]['tenant_active'] == 0
+        assert incremental[late.id]['tenant_active'] == 0
+
+        RentalSummaryService.rebuild()
+        for user_id, summary in incremental.items():
+            rebuilt = RentalSummaryService.get_summary(user_id)
+            for column, value in summary.items():
+                if column in ('created_at', 'updated_at'):
+                    continue
+                assert rebuilt[column] == pytest.approx(value, abs=1e-6), column
+
+    def test_reconcile_command_repairs_drift(self, app, test_user, test_rental):
+        RentalSummaryService.get_summary(test_user.id)
+        # Written behind the service's back, so the summary misses it
+        db.session.add(RentalModel(
+            unit_id=test_rental.unit_id, tenant_id=test_user.id,
+            start_date=datetime(2025, 1, 1), end_date=datetime(2025, 2, 1),
+            monthly_rate=1500.00, total_cost=1550.0, status='terminated'))
+        db.session.commit()
+        assert RentalSummaryService.get_summary(test_user.id)['tenant_rentals'] == 1
+
+        result = app.test_cli_runner().invoke(args=['rentals', 'reconcile-summary'])
+
+        assert result.exit_code == 0, result.output
+        summary = RentalSummaryService.get_summary(test_user.id)
+        assert summary['tenant_rentals'] == 2
+        assert summary['owner_rentals'] == 2
+        assert summary['tenant_active'] == 1
@@ -0,0 +1,130 @@
+import pytest
+from app.models.base import db
+from app.models.user import UserModel
+from app.models.enums import UnitStatus
+from app.services.auth_service import AuthService
+from app.services.saved_search_service import SavedSearchService
+from app.services.unit_service import UnitService
+
+
+@pytest.fixture
+def tenant(app):
+    user = UserModel(
+        name="Tenant",
+        surname="User",
+        email="tenant@example.com",
+        password=AuthService.hash_password("password123")
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _unit_data(owner_id, **overrides):
+    data = {
+        'unit_name': 'Sea Point Storage',
+        'country': 'South Africa',
+        'city': 'Cape Town',
+        'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town',
+        'status': 'VACANT',
+        'size_sqm': 20.0,
+        'monthly_rate': 1000.0,
+        'floor_level': 'Ground Floor',
+        'rental_duration_days': 30,
+        'security_features': ['BASIC', 'CCTV'],
+        'user_id': owner_id
+    }
+    data.update(overrides)
+    return data
+
+
+class TestSavedSearchService:
+    def test_create_search(self, app, tenant):
+        result = SavedSearchService.create_search(tenant.id, {
+            'city': 'Cape Town',
+            'max_price': 2000.0,
+            'features': ['CCTV']
+        })
+        assert 'error' not in result
+        assert result['features'] == ['CCTV']
+        assert len(SavedSearchService.get_user_searches(tenant.id)) == 1
+
+    def test_new_vacant_unit_notifies_matching_searches(self, app, test_user, tenant):
+        SavedSearchService.create_search(
+            tenant.id, {'city': 'cape town', 'min_size': 10.0, 'features': ['CCTV']})
+        SavedSearchService.create_search(
+            tenant.id, {'city': 'Johannesburg'})
+        SavedSearchService.create_search(
+            tenant.id, {'features': ['BIOMETRIC']})
+        SavedSearchService.create_search(tenant.id, {'max_price': 500.0})
+
+        unit = UnitService.create_unit(_unit_data(test_user.id))
+        assert 'error' not in unit
+
+        notifications = SavedSearchService.get_notifications(tenant.id)
+        assert len(notifications) == 1
+        assert notifications[0]['unit']['id'] == unit['unit_id']
+        assert notifications[0]['read'] is False
+
+    def test_occupied_unit_does_not_notify(self, app, test_user, tenant):
+        SavedSearchService.create_search(tenant.id, {'city': 'Cape Town'})
+
+        UnitService.create_unit(_unit_data(test_user.id, status='OCCUPIED'))
+
+        assert SavedSearchService.get_notifications(tenant.id) == []
+
+    def test_unit_becoming_vacant_notifies(self, app, test_user, tenant):
+        unit = UnitService.create_unit(
+            _unit_data(test_user.id, status='OCCUPIED'))
+        SavedSearchService.create_search(tenant.id, {'city': 'Cape Town'})
+
+        UnitService.update_unit(
+            unit['unit_id'], {'status': UnitStatus.VACANT}, test_user.id)
+
+        assert len(SavedSearchService.get_notifications(tenant.id)) == 1
+
+    def test_mark_notifications_read(self, app, test_user, tenant):
+        SavedSearchService.create_search(tenant.id, {'city': 'Cape Town'})
+        UnitService.create_unit(_unit_data(test_user.id))
+
+        result = SavedSearchService.mark_notifications_read(tenant.id)
+        assert result['updated'] == 1
+        assert SavedSearchService.get_notifications(
+            tenant.id, unread_only=True) == []
+
+    def test_notifications_page_with_after_id(self, app, test_user, tenant):
+        SavedSearchService.create_search(tenant.id, {'city': 'Cape Town'})
+        for i in range(3):
+            UnitService.create_unit(
+                _unit_data(test_user.id, unit_name=f'Unit {i}'))
+
+        first = SavedSearchService.get_notifications(tenant.id, limit=2)
+        rest = SavedSearchService.get_notifications(
+            tenant.id, after_id=first[-1]['id'], limit=2)
+
+        assert [n['unit']['name'] for n in first + rest] == [
+            'Unit 2', 'Unit 1', 'Unit 0']
+
+    def test_bulk_created_units_notify_matching_searches(self, app, test_user, tenant):
+        SavedSearchService.create_search(
+            tenant.id, {'city': 'Cape Town', 'features': ['CCTV']})
+
+        result = UnitService.bulk_create_units([
+            _unit_data(test_user.id, unit_name='With CCTV'),
+            _unit_data(test_user.id, unit_name='Without CCTV',
+                       security_features=['BASIC']),
+        ], test_user.id)
+        assert result['created'] == 2
+
+        notifications = SavedSearchService.get_notifications(tenant.id)
+        assert [n['unit']['name'] for n in notifications] == ['With CCTV']
+        assert notifications[0]['created_at'] is not None
+
+    def test_bulk_match_trims_city(self, app, test_user, tenant):
+        SavedSearchService.create_search(tenant.id, {'city': 'Cape Town'})
+
+        result = UnitService.bulk_create_units(
+            [_unit_data(test_user.id, city=' Cape Town ')], test_user.id)
+        assert result['created'] == 1
+
+        assert len(SavedSearchService.get_notifications(tenant.id)) == 1
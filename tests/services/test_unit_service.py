@@ -0,0 +1,402 @@
+import pytest
+from datetime import date, datetime
+from app.models.base import db
+from app.models.unit import UnitModel
+from app.models.rental import RentalModel
+from app.models.enums import UnitStatus
+from app.services.unit_service import UnitService
+
+
+@pytest.fixture
+def second_unit(app, test_user):
+    unit = UnitModel(
+        unit_id='UNIT-002',
+        unit_name='Second Unit',
+        user_id=test_user.id,
+        monthly_rate=900.00,
+        size_sqm=10.0,
+        city='Test City',
+        country='Test Country',
+        address_link='https://maps.google.com/?q=Sea+Point,Cape+Town',
+        floor_level="1st",
+        status='VACANT',
+        currency='ZAR',
+        climate_controlled=True,
+        rental_duration_days=30
+    )
+    db.session.add(unit)
+    db.session.commit()
+    return unit
+
+
+class TestUnitService:
+    def test_search_units_by_availability_window(self, app, test_user, test_unit, second_unit):
+        db.session.add_all([
+            RentalModel(
+                unit_id=test_unit.unit_id,
+                tenant_id=test_user.id,
+                start_date=datetime(2030, 3, 1),
+                end_date=datetime(2030, 7, 1),
+                monthly_rate=1500.00,
+                status='active'
+            ),
+            # Terminated bookings no longer block the unit
+            RentalModel(
+                unit_id=second_unit.unit_id,
+                tenant_id=test_user.id,
+                start_date=datetime(2030, 3, 1),
+                end_date=datetime(2030, 7, 1),
+                monthly_rate=900.00,
+                status='terminated'
+            )
+        ])
+        db.session.commit()
+
+        overlapping = UnitService.search_units(
+            available_from=date(2030, 6, 30), available_to=date(2030, 8, 1))
+        assert [u['unit_id'] for u in overlapping] == [second_unit.unit_id]
+
+        after = UnitService.search_units(
+            available_from=date(2030, 7, 1), available_to=date(2030, 8, 1))
+        assert {u['unit_id'] for u in after} == {
+            test_unit.unit_id, second_unit.unit_id}
+
+    def test_get_similar_units(self, app, test_user, test_unit, second_unit):
+        far_unit = UnitModel(
+            unit_id='UNIT-003',
+            unit_name='Far Unit',
+            user_id=test_user.id,
+            monthly_rate=9000.00,
+            size_sqm=200.0,
+            city='Other City',
+            country='Test Country',
+            address_link='https://maps.google.com/?q=Sea+Point,Cape+Town',
+            floor_level="Basement",
+            status='VACANT',
+            rental_duration_days=30
+        )
+        db.session.add(far_unit)
+        db.session.commit()
+
+        similar = UnitService.get_similar_units(test_unit.unit_id, limit=5)
+        assert [u['unit_id'] for u in similar] == [
+            second_unit.unit_id, far_unit.unit_id]
+
+        # Units written after the matrix was built are picked up
+        UnitService.update_unit(
+            far_unit.unit_id,
+            {'status': UnitStatus.OCCUPIED},
+            test_user.id
+        )
+        vacant = UnitService.get_similar_units(
+            test_unit.unit_id, vacant_only=True)
+        assert [u['unit_id'] for u in vacant] == [second_unit.unit_id]
+
+    def test_get_similar_units_unknown_unit(self, app):
+        assert UnitService.get_similar_units('NOPE-0000') is None
+
+    def test_autocomplete(self, app, test_user, test_unit, second_unit):
+        from app.services.unit_autocomplete_service import UnitAutocompleteService
+
+        completions = UnitAutocompleteService.complete('te')
+        assert completions[:2] == [
+            {'value': 'Test City', 'kind': 'city', 'count': 2},
+            {'value': 'Test Country', 'kind': 'country', 'count': 2}
+        ]
+        assert UnitAutocompleteService.complete('te', kind='unit_name') == [
+            {'value': 'Test', 'kind': 'unit_name', 'count': 1}
+        ]
+
+        # Writes are applied incrementally to the built index
+        UnitService.update_unit(
+            second_unit.unit_id, {'unit_name': 'Tertiary Unit'}, test_user.id)
+        assert [c['value'] for c in UnitAutocompleteService.complete(
+            'ter', kind='unit_name')] == ['Tertiary']
+        assert UnitAutocompleteService.complete('sec') == []
+
+    def test_generate_unit_ids_are_sequential_per_city(self, app, test_user):
+        year = datetime.now().year
+        data = {
+            'country': 'South Africa',
+            'city': 'Cape Town',
+            'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town',
+            'status': 'VACANT',
+            'size_sqm': 20.0,
+            'monthly_rate': 1000.0,
+            'floor_level': 'Ground Floor',
+            'rental_duration_days': 30,
+            'user_id': test_user.id
+        }
+
+        first = UnitService.create_unit({**data, 'unit_name': 'First'})
+        second = UnitService.create_unit({**data, 'unit_name': 'Second'})
+
+        assert first['unit_id'] == f"CAP-{year}-0001"
+        assert second['unit_id'] == f"CAP-{year}-0002"
+
+    def test_allocate_unit_ids_continues_after_existing_ids(self, app, test_unit):
+        year = datetime.now().year
+        test_unit.unit_id = f"TES-{year}-0007"
+        db.session.commit()
+
+        assert UnitService._allocate_unit_ids('Test City', 2) == [
+            f"TES-{year}-0008", f"TES-{year}-0009"]
+        assert UnitService._generate_unit_id('Test City') == f"TES-{year}-0010"
+
+    def test_create_unit_duplicate_name_in_city(self, app, test_user, test_unit):
+        result = UnitService.create_unit({
+            'unit_name': 'TEST UNIT',
+            'country': 'Test Country',
+            'city': 'test city',
+            'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town',
+            'status': 'VACANT',
+            'size_sqm': 20.0,
+            'monthly_rate': 1000.0,
+            'floor_level': 'Ground Floor',
+            'rental_duration_days': 30,
+            'user_id': test_user.id
+        })
+
+        assert result == {
+            "error": "Unit with name 'TEST UNIT' already exists in test city"}
+
+    def test_bulk_create_units(self, app, test_user, test_unit):
+        from app.models.securityFeature import SecurityFeatureModel
+        year = datetime.now().year
+        base = {
+            'country': 'South Africa',
+            'city': 'Cape Town',
+            'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town',
+            'status': 'VACANT',
+            'size_sqm': 20.0,
+            'monthly_rate': 1000.0,
+            'floor_level': 'Ground Floor',
+            'rental_duration_days': 30
+        }
+        units = [
+            {**base, 'unit_name': 'Bulk 1', 'security_features': ['BASIC', 'CCTV']},
+            {**base, 'unit_name': 'Bulk 2', 'rental_duration_days': 10},
+            {**base, 'unit_name': 'bulk 1'},
+            {**base, 'unit_name': 'Test Unit', 'city': 'Test City'},
+            {**base, 'unit_name': 'Bulk 3', 'city': 'Johannesburg'},
+            {'unit_name': 'Invalid'},
+        ]
+
+        result = UnitService.bulk_create_units(
+            units, test_user.id, errors={5: {'size_sqm': ['Missing']}})
+
+        assert result['created'] == 2
+        assert result['failed'] == 4
+        assert result['results'][5]['error'] == "{'size_sqm': ['Missing']}"
+        assert result['results'][0] == {
+            'index': 0, 'unit_id': f"CAP-{year}-0001"}
+        assert result['results'][1]['error'] == "Minimum rental duration is 30 days"
+        assert 'already exists' in result['results'][2]['error']
+        assert 'already exists' in result['results'][3]['error']
+        assert result['results'][4] == {
+            'index': 4, 'unit_id': f"JOH-{year}-0001"}
+
+        unit = db.session.get(UnitModel, f"CAP-{year}-0001")
+        assert float(unit.monthly_rate) == 1100.0
+        assert db.session.query(SecurityFeatureModel).filter_by(
+            unit_id=unit.unit_id).count() == 2
+
+    def test_bulk_update_rates(self, app, test_user, test_unit, second_unit):
+        UnitService.add_security_features(
+            second_unit.unit_id, ['BIOMETRIC'], test_user.id)
+        second_unit.status = UnitStatus.OCCUPIED
+        db.session.commit()
+
+        preview = UnitService.bulk_update_rates(
+            'test city', test_user.id, 100.0, change_type='absolute', dry_run=True)
+        assert preview['units'] == 2
+        assert preview['new_total_rate'] == 1600.0 + 1150.0
+        assert preview['monthly_revenue_change'] == 115.0
+        assert float(db.session.get(UnitModel, test_unit.unit_id).monthly_rate) == 1500.0
+
+        result = UnitService.bulk_update_rates(
+            'Test City', test_user.id, 10.0)
+        assert result['updated_units'] == 2
+        db.session.expire_all()
+        assert float(db.session.get(UnitModel, test_unit.unit_id).monthly_rate) == 1650.0
+        unit = db.session.get(UnitModel, second_unit.unit_id)
+        assert float(unit.base_rate) == 990.0
+        assert float(unit.monthly_rate) == 1138.5
+
+        assert 'error' in UnitService.bulk_update_rates(
+            'Test City', test_user.id, -100.0)
+        assert 'error' in UnitService.bulk_update_rates(
+            'Test City', test_user.id + 1, 10.0)
+
+    def test_security_feature_changes_do_not_drift(self, app, test_user, test_unit):
+        for _ in range(3):
+            added = UnitService.add_security_features(
+                test_unit.unit_id, ['cctv', 'guards'], test_user.id)
+            assert added['monthly_rate'] == 1875.0
+            assert added['security_premium'] == 0.25
+
+            removed = UnitService.remove_security_features(
+                test_unit.unit_id, ['CCTV', 'GUARDS'], test_user.id)
+            assert removed['monthly_rate'] == 1500.0
+            assert removed['base_rate'] == 1500.0
+
+    def test_update_unit_reprices_from_base_rate(self, app, test_user, test_unit):
+        result = UnitService.update_unit(
+            test_unit.unit_id, {'security_features': ['BIOMETRIC']}, test_user.id)
+        assert result['monthly_rate'] == 1725.0
+
+        result = UnitService.update_unit(
+            test_unit.unit_id, {'monthly_rate': 2000.0}, test_user.id)
+        assert result['base_rate'] == 2000.0
+        assert result['monthly_rate'] == 2300.0
+        unit = UnitService.get_unit_by_id(test_unit.unit_id)
+        assert [f['type'] for f in unit['security_features']] == [
+            'Biometric Access']
+
+    def test_rebuild_pricing(self, app, test_user, test_unit):
+        from app.models.securityFeature import SecurityFeatureModel, SecurityFeatureType
+        db.session.add(SecurityFeatureModel(
+            unit_id=test_unit.unit_id, feature_type=SecurityFeatureType.CCTV))
+        db.session.commit()
+
+        # A legacy unit whose monthly rate already includes the premium
+        assert UnitService.rebuild_pricing() == {'updated_units': 1}
+        db.session.expire_all()
+        unit = db.session.get(UnitModel, test_unit.unit_id)
+        assert float(unit.security_premium) == 0.1
+        assert float(unit.base_rate) == 1363.64
+        assert float(unit.monthly_rate) == 1500.0
+
+        # Rebuilding again is a no-op for the rate
+        UnitService.rebuild_pricing()
+        db.session.expire_all()
+        assert float(db.session.get(UnitModel, test_unit.unit_id).monthly_rate) == 1500.0
+
+    def test_upload_unit_images(self, app, test_user, test_unit, tmp_path, monkeypatch):
+        import os
+        from io import BytesIO
+        from PIL import Image
+        from app.services.image_storage_service import ImageStorageService
+        app.config['IMAGE_STORAGE_PATH'] = str(tmp_path)
+
+        def png(color):
+            buffer = BytesIO()
+            Image.new('RGB', (800, 600), color).save(buffer, 'PNG')
+            return buffer.getvalue()
+
+        result = UnitService.upload_unit_images(
+            test_unit.unit_id, [png('red'), png('red'), png('blue')], test_user.id)
+        assert len(result['uploaded_images']) == 2
+        assert result['thumbnail_url'] == result['uploaded_images'][0]['thumbnail']
+
+        # Same content again is deduplicated
+        result = UnitService.upload_unit_images(
+            test_unit.unit_id, [png('blue')], test_user.id)
+        assert len(result['uploaded_images']) == 2
+
+        content_hash = result['thumbnail_url'].split('/')[-2]
+        path, is_final = ImageStorageService.resolve(content_hash, 'thumbnail')
+        assert is_final
+        with Image.open(path) as thumbnail:
+            assert thumbnail.size == (320, 240)
+        assert len(os.listdir(tmp_path / 'originals' / content_hash[:2])) >= 1
+
+        assert 'error' in UnitService.upload_unit_images(
+            test_unit.unit_id, [b'not an image'], test_user.id)
+
+        # Uploads refused for the image limit leave no files behind
+        originals_before = sum(len(files) for _, _, files in os.walk(tmp_path))
+        monkeypatch.setattr(UnitService, 'MAX_IMAGES_PER_UNIT', 2)
+        assert 'error' in UnitService.upload_unit_images(
+            test_unit.unit_id, [png('green')], test_user.id)
+        assert sum(len(files) for _, _, files in os.walk(tmp_path)) == originals_before
+        assert 'error' in UnitService.upload_unit_images(
+            test_unit.unit_id, [png('green')], test_user.id + 1)
+
+    def test_update_unit_version_check(self, app, test_user, test_unit):
+        assert test_unit.version == 1
+
+        result = UnitService.update_unit(
+            test_unit.unit_id, {'floor_level': 'first'}, test_user.id, expected_version=1)
+        assert result['version'] == 2
+
+        conflict = UnitService.update_unit(
+            test_unit.unit_id, {'floor_level': 'second'}, test_user.id, expected_version=1)
+        assert conflict['code'] == UnitService.VERSION_CONFLICT
+        assert conflict['current_version'] == 2
+        assert db.session.get(UnitModel, test_unit.unit_id).floor_level == 'first'
+
+        UnitService.bulk_update_rates('Test City', test_user.id, 5.0)
+        db.session.expire_all()
+        assert db.session.get(UnitModel, test_unit.unit_id).version == 3
+
+    def test_delete_unit_is_soft(self, app, test_user, test_unit):
+        assert UnitService.delete_unit(test_unit.unit_id, test_user.id) == {
+            "message": "Unit deleted successfully"}
+
+        assert db.session.get(UnitModel, test_unit.unit_id).deleted_at is not None
+        assert UnitService.get_unit_by_id(test_unit.unit_id) is None
+        assert UnitService.get_all_units() == []
+        assert UnitService.get_units_by_ids([test_unit.unit_id])['missing'] == [
+            test_unit.unit_id]
+        assert UnitService.get_unit_statistics()['total_units'] == 0
+        assert UnitService.delete_unit(test_unit.unit_id, test_user.id) == {
+            "error": "Unit not found"}
+
+        # The name is free again once the unit is deleted
+        result = UnitService.create_unit({
+            'unit_name': 'Test Unit',
+            'country': 'Test Country',
+            'city': 'Test City',
+            'address_link': 'https://maps.google.com/?q=Sea+Point,Cape+Town',
+            'status': 'VACANT',
+            'size_sqm': 20.0,
+            'monthly_rate': 1000.0,
+            'floor_level': 'Ground Floor',
+            'rental_duration_days': 30,
+            'user_id': test_user.id
+        })
+        assert 'error' not in result
+
+    def test_delete_unit_refuses_upcoming_booking(self, app, test_user, test_unit):
+        from datetime import timedelta
+        start = datetime.utcnow() + timedelta(days=7)
+        db.session.add(RentalModel(
+            unit_id=test_unit.unit_id, tenant_id=test_user.id,
+            start_date=start, end_date=start + timedelta(days=30),
+            monthly_rate=1500.0, status='active'))
+        db.session.commit()
+
+        assert UnitService.delete_unit(test_unit.unit_id, test_user.id) == {
+            "error": "Cannot delete unit with upcoming bookings"}
+        assert db.session.get(UnitModel, test_unit.unit_id).deleted_at is None
+
+    def test_archive_deleted_units(self, app, test_user, test_unit, second_unit):
+        from datetime import timedelta
+        from app.models.securityFeature import SecurityFeatureModel, SecurityFeatureType
+        from app.models.unit_archive import UnitArchiveModel, SecurityFeatureArchiveModel
+        from app.services.unit_archive_service import UnitArchiveService
+        db.session.add(SecurityFeatureModel(
+            unit_id=test_unit.unit_id, feature_type=SecurityFeatureType.CCTV))
+        db.session.add(RentalModel(
+            unit_id=second_unit.unit_id, tenant_id=test_user.id,
+            start_date=datetime(2020, 1, 1), end_date=datetime(2020, 6, 1),
+            monthly_rate=900.0, status='expired'))
+        long_ago = datetime.utcnow() - timedelta(days=200)
+        test_unit.deleted_at = second_unit.deleted_at = long_ago
+        db.session.commit()
+        unit_id, rented_unit_id = test_unit.unit_id, second_unit.unit_id
+
+        assert UnitArchiveService.archive_deleted_units(retention_days=365) == {
+            'archived_units': 0, 'archived_features': 0}
+        assert UnitArchiveService.archive_deleted_units(chunk_size=1) == {
+            'archived_units': 1, 'archived_features': 1}
+
+        db.session.expunge_all()
+        assert db.session.get(UnitModel, unit_id) is None
+        archived = db.session.get(UnitArchiveModel, unit_id)
+        assert archived.unit_name == 'Test Unit'
+        assert archived.deleted_at == long_ago
+        assert db.session.query(SecurityFeatureArchiveModel).count() == 1
+        # Still referenced by a rental
+        assert db.session.get(UnitModel, rented_unit_id) is not None